@@ -0,0 +1,418 @@
+from shapes import AABB
+
+NULL = -1
+
+# Margen por defecto con el que se agranda cada caja al insertarla
+DEFAULT_MARGIN = 4.0
+
+# Factor con el que se estira la caja en la dirección del desplazamiento
+DISPLACEMENT_FACTOR = 2.0
+
+
+class AABBTree:
+    """Árbol dinámico de cajas (BVH) para fases amplias con cuerpos estáticos
+    y móviles mezclados.
+
+    Cada cuerpo es una hoja con una caja "gorda" (su AABB agrandada en
+    `margin`); mientras el cuerpo se mueva dentro de ella, `move` no toca el
+    árbol. Las hojas se insertan junto al hermano que menos aumenta el
+    perímetro total y el árbol se equilibra con rotaciones al subir, así que
+    su altura se mantiene logarítmica aunque los cuerpos lleguen ordenados.
+
+    Los nodos se guardan como listas paralelas indexadas por id de nodo; los
+    ids de las hojas ("proxies") son estables hasta que se eliminan.
+    Las consultas dejan en `visited` los nodos que recorrieron.
+    """
+
+    def __init__(self, margin=DEFAULT_MARGIN):
+        self.margin = margin
+        self.root = NULL
+
+        self.min_x, self.min_y, self.max_x, self.max_y = [], [], [], []
+        self.parent, self.child1, self.child2, self.heights = [], [], [], []
+        self.user_data = []
+        self.free = []
+
+        # Hojas reinsertadas desde el último `moved_pairs`
+        self.moved = set()
+
+        # Estadística de la última consulta
+        self.visited = 0
+
+    # --- Nodos ---
+    def _allocate(self):
+        if self.free:
+            node = self.free.pop()
+        else:
+            node = len(self.parent)
+            for field in (self.min_x, self.min_y, self.max_x, self.max_y):
+                field.append(0.0)
+            for field in (self.parent, self.child1, self.child2):
+                field.append(NULL)
+            self.heights.append(0)
+            self.user_data.append(None)
+        self.parent[node] = self.child1[node] = self.child2[node] = NULL
+        self.heights[node] = 0
+        self.user_data[node] = None
+        return node
+
+    def _release(self, node):
+        self.heights[node] = -1  # Marca de nodo libre
+        self.user_data[node] = None
+        self.free.append(node)
+
+    def is_leaf(self, node):
+        return self.child1[node] == NULL
+
+    def _perimeter(self, node):
+        return 2.0 * ((self.max_x[node] - self.min_x[node]) + (self.max_y[node] - self.min_y[node]))
+
+    def _union_perimeter(self, node, min_x, min_y, max_x, max_y):
+        return 2.0 * ((max(self.max_x[node], max_x) - min(self.min_x[node], min_x)) +
+                      (max(self.max_y[node], max_y) - min(self.min_y[node], min_y)))
+
+    def _refit(self, node):
+        """Altura y caja de un nodo interno a partir de sus hijos"""
+        a, b = self.child1[node], self.child2[node]
+        self.heights[node] = 1 + max(self.heights[a], self.heights[b])
+        self.min_x[node] = min(self.min_x[a], self.min_x[b])
+        self.min_y[node] = min(self.min_y[a], self.min_y[b])
+        self.max_x[node] = max(self.max_x[a], self.max_x[b])
+        self.max_y[node] = max(self.max_y[a], self.max_y[b])
+
+    def _replace_child(self, parent, old, new):
+        if parent == NULL:
+            self.root = new
+        elif self.child1[parent] == old:
+            self.child1[parent] = new
+        else:
+            self.child2[parent] = new
+
+    # --- Inserción y borrado de hojas ---
+    def _insert_leaf(self, leaf):
+        if self.root == NULL:
+            self.root = leaf
+            self.parent[leaf] = NULL
+            return
+
+        # Bajar eligiendo el hijo con menor coste (aumento de perímetro)
+        box = (self.min_x[leaf], self.min_y[leaf], self.max_x[leaf], self.max_y[leaf])
+        node = self.root
+        while not self.is_leaf(node):
+            perimeter = self._perimeter(node)
+            combined = self._union_perimeter(node, *box)
+            cost = 2.0 * combined
+            inheritance = 2.0 * (combined - perimeter)
+            costs = []
+            for child in (self.child1[node], self.child2[node]):
+                child_cost = self._union_perimeter(child, *box) + inheritance
+                if not self.is_leaf(child):
+                    child_cost -= self._perimeter(child)
+                costs.append(child_cost)
+            if cost < costs[0] and cost < costs[1]:
+                break
+            node = self.child1[node] if costs[0] < costs[1] else self.child2[node]
+
+        # Nuevo padre para la hoja y el hermano elegido
+        sibling = node
+        old_parent = self.parent[sibling]
+        new_parent = self._allocate()
+        self.parent[new_parent] = old_parent
+        self._replace_child(old_parent, sibling, new_parent)
+        self.child1[new_parent], self.child2[new_parent] = sibling, leaf
+        self.parent[sibling] = self.parent[leaf] = new_parent
+
+        self._fix_upwards(new_parent)
+
+    def _remove_leaf(self, leaf):
+        if leaf == self.root:
+            self.root = NULL
+            return
+        parent = self.parent[leaf]
+        grandparent = self.parent[parent]
+        sibling = self.child2[parent] if self.child1[parent] == leaf else self.child1[parent]
+
+        self._replace_child(grandparent, parent, sibling)
+        self.parent[sibling] = grandparent
+        self._release(parent)
+        if grandparent != NULL:
+            self._fix_upwards(grandparent)
+
+    def _fix_upwards(self, node):
+        while node != NULL:
+            node = self._balance(node)
+            self._refit(node)
+            node = self.parent[node]
+
+    def _balance(self, a):
+        """Rotación si los hijos de `a` difieren en más de 1 de altura.
+
+        Devuelve el nodo que queda en la posición de `a`.
+        """
+        if self.is_leaf(a) or self.heights[a] < 2:
+            return a
+        b, c = self.child1[a], self.child2[a]
+        balance = self.heights[c] - self.heights[b]
+        if balance > 1:
+            return self._rotate_up(a, c, 2)
+        if balance < -1:
+            return self._rotate_up(a, b, 1)
+        return a
+
+    def _rotate_up(self, a, up, slot):
+        """Sube el hijo `up` de `a` (en el hueco `slot` 1 o 2) por encima de `a`"""
+        f, g = self.child1[up], self.child2[up]
+
+        # `up` ocupa el sitio de `a` y `a` pasa a ser su primer hijo
+        self.child1[up] = a
+        self.parent[up] = self.parent[a]
+        self.parent[a] = up
+        self._replace_child(self.parent[up], a, up)
+
+        # El nieto más alto se queda en `up`; el otro baja a `a` en lugar de `up`
+        keep, give = (f, g) if self.heights[f] > self.heights[g] else (g, f)
+        self.child2[up] = keep
+        if slot == 2:
+            self.child2[a] = give
+        else:
+            self.child1[a] = give
+        self.parent[give] = a
+        self._refit(a)
+        self._refit(up)
+        return up
+
+    # --- API ---
+    def insert(self, box, data=None):
+        """Añade un cuerpo con caja `box` (un AABB); devuelve su id"""
+        leaf = self._allocate()
+        self._set_fat(leaf, box.bounds(), (0.0, 0.0))
+        self.user_data[leaf] = data
+        self._insert_leaf(leaf)
+        self.moved.add(leaf)
+        return leaf
+
+    def remove(self, proxy):
+        self._remove_leaf(proxy)
+        self._release(proxy)
+        self.moved.discard(proxy)
+
+    def move(self, proxy, box, displacement=(0.0, 0.0)):
+        """Actualiza la caja de un cuerpo.
+
+        Solo se reinserta la hoja si `box` se sale de su caja gorda; en ese
+        caso la nueva caja gorda se estira además en la dirección de
+        `displacement` (el movimiento previsto). Devuelve True si reinsertó.
+        """
+        min_x, min_y, max_x, max_y = box.bounds()
+        if (self.min_x[proxy] <= min_x and self.min_y[proxy] <= min_y and
+                max_x <= self.max_x[proxy] and max_y <= self.max_y[proxy]):
+            return False
+        self._remove_leaf(proxy)
+        self._set_fat(proxy, (min_x, min_y, max_x, max_y), displacement)
+        self._insert_leaf(proxy)
+        self.moved.add(proxy)
+        return True
+
+    def _set_fat(self, leaf, bounds, displacement):
+        min_x, min_y, max_x, max_y = bounds
+        margin = self.margin
+        dx, dy = DISPLACEMENT_FACTOR * displacement[0], DISPLACEMENT_FACTOR * displacement[1]
+        self.min_x[leaf] = min_x - margin + min(dx, 0.0)
+        self.min_y[leaf] = min_y - margin + min(dy, 0.0)
+        self.max_x[leaf] = max_x + margin + max(dx, 0.0)
+        self.max_y[leaf] = max_y + margin + max(dy, 0.0)
+
+    def fat_box(self, proxy):
+        """Caja gorda de un nodo como AABB"""
+        return AABB(self.min_x[proxy], self.min_y[proxy],
+                    self.max_x[proxy] - self.min_x[proxy], self.max_y[proxy] - self.min_y[proxy])
+
+    @property
+    def height(self):
+        return self.heights[self.root] if self.root != NULL else 0
+
+    def __len__(self):
+        return (len(self.parent) - len(self.free) + 1) // 2
+
+    # --- Consultas ---
+    def _query(self, min_x, min_y, max_x, max_y):
+        """Hojas cuya caja gorda se solapa con los límites dados"""
+        result = []
+        if self.root == NULL:
+            self.visited = 0
+            return result
+        stack = [self.root]
+        visited = 0
+        nmin_x, nmin_y, nmax_x, nmax_y = self.min_x, self.min_y, self.max_x, self.max_y
+        child1, child2 = self.child1, self.child2
+        while stack:
+            node = stack.pop()
+            visited += 1
+            # Mismo criterio que AABB.intersects
+            if (nmin_x[node] < max_x and nmax_x[node] > min_x and
+                    nmin_y[node] < max_y and nmax_y[node] > min_y):
+                if child1[node] == NULL:
+                    result.append(node)
+                else:
+                    stack.append(child1[node])
+                    stack.append(child2[node])
+        self.visited = visited
+        return result
+
+    def query(self, box):
+        """Cuerpos cuya caja gorda se solapa con la región `box` (un AABB)"""
+        return self._query(*box.bounds())
+
+    def query_point(self, x, y):
+        """Cuerpos cuya caja gorda contiene el punto (x, y)"""
+        result = []
+        stack = [self.root] if self.root != NULL else []
+        visited = 0
+        while stack:
+            node = stack.pop()
+            visited += 1
+            if (self.min_x[node] <= x <= self.max_x[node] and
+                    self.min_y[node] <= y <= self.max_y[node]):
+                if self.is_leaf(node):
+                    result.append(node)
+                else:
+                    stack.append(self.child1[node])
+                    stack.append(self.child2[node])
+        self.visited = visited
+        return result
+
+    def ray_cast(self, start, end):
+        """Cuerpos cuya caja gorda corta el segmento `start` -> `end`.
+
+        Devuelve pares (t, id) ordenados por la fracción t ∈ [0, 1] del
+        segmento a la que el rayo entra en la caja.
+        """
+        (x0, y0), (x1, y1) = start, end
+        dx, dy = x1 - x0, y1 - y0
+        hits = []
+        stack = [self.root] if self.root != NULL else []
+        visited = 0
+        while stack:
+            node = stack.pop()
+            visited += 1
+            entry = self._slab(node, x0, y0, dx, dy)
+            if entry is None:
+                continue
+            if self.is_leaf(node):
+                hits.append((entry, node))
+            else:
+                stack.append(self.child1[node])
+                stack.append(self.child2[node])
+        self.visited = visited
+        hits.sort()
+        return hits
+
+    def _slab(self, node, x0, y0, dx, dy):
+        """Fracción de entrada del segmento en la caja del nodo, o None"""
+        t_min, t_max = 0.0, 1.0
+        for origin, delta, low, high in ((x0, dx, self.min_x[node], self.max_x[node]),
+                                         (y0, dy, self.min_y[node], self.max_y[node])):
+            if delta == 0:
+                if origin < low or origin > high:
+                    return None
+                continue
+            t1, t2 = (low - origin) / delta, (high - origin) / delta
+            if t1 > t2:
+                t1, t2 = t2, t1
+            t_min, t_max = max(t_min, t1), min(t_max, t2)
+            if t_min > t_max:
+                return None
+        return t_min
+
+    def pairs(self):
+        """Todos los pares (a, b) de cuerpos con cajas gordas solapadas, a < b"""
+        return self._pairs_of(leaf for leaf in range(len(self.parent))
+                              if self.heights[leaf] == 0)
+
+    def moved_pairs(self):
+        """Pares nuevos o posibles desde la última llamada: solo se consultan
+        las hojas insertadas o reinsertadas, así los cuerpos estáticos que
+        siguen en su caja gorda no cuestan nada"""
+        result = self._pairs_of(self.moved)
+        self.moved = set()
+        return result
+
+    def _pairs_of(self, leaves):
+        found = set()
+        visited = 0
+        for leaf in leaves:
+            for other in self._query(self.min_x[leaf], self.min_y[leaf],
+                                     self.max_x[leaf], self.max_y[leaf]):
+                if other != leaf:
+                    found.add((leaf, other) if leaf < other else (other, leaf))
+            visited += self.visited
+        self.visited = visited
+        return sorted(found)
+
+    def validate(self):
+        """Comprueba la estructura (padres, alturas y cajas); para depurar"""
+        if self.root == NULL:
+            return
+        assert self.parent[self.root] == NULL
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if self.is_leaf(node):
+                assert self.heights[node] == 0
+                continue
+            a, b = self.child1[node], self.child2[node]
+            assert self.parent[a] == node and self.parent[b] == node
+            assert self.heights[node] == 1 + max(self.heights[a], self.heights[b])
+            assert self.min_x[node] == min(self.min_x[a], self.min_x[b])
+            assert self.min_y[node] == min(self.min_y[a], self.min_y[b])
+            assert self.max_x[node] == max(self.max_x[a], self.max_x[b])
+            assert self.max_y[node] == max(self.max_y[a], self.max_y[b])
+            stack.extend((a, b))
+
+
+if __name__ == "__main__":
+    # Escena con muchos cuerpos estáticos y pocos en movimiento
+    import random
+    import time
+
+    random.seed(0)
+    tree = AABBTree()
+    boxes = [AABB(random.uniform(0, 8000), random.uniform(0, 6000), 20, 20) for _ in range(10_000)]
+    start = time.perf_counter()
+    proxies = [tree.insert(box, i) for i, box in enumerate(boxes)]
+    build_time = time.perf_counter() - start
+    tree.validate()
+    tree.moved_pairs()
+    print(f"{len(tree)} cuerpos insertados en {build_time:.2f} s, altura {tree.height}")
+
+    moving = random.sample(range(len(boxes)), 100)
+    velocities = {i: (random.uniform(-3, 3), random.uniform(-3, 3)) for i in moving}
+    frames, reinserted, pair_count = 60, 0, 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        for i in moving:
+            box = boxes[i]
+            dx, dy = velocities[i]
+            box.x += dx
+            box.y += dy
+            reinserted += tree.move(proxies[i], box, (dx, dy))
+        pair_count += len(tree.moved_pairs())
+    frame_time = (time.perf_counter() - start) / frames
+    tree.validate()
+    print(f"{len(moving)} en movimiento: {frame_time * 1000:.2f} ms/frame, "
+          f"{reinserted / frames:.1f} reinserciones/frame, {pair_count / frames:.1f} pares/frame")
+
+    # Consultas
+    hits = tree.query(AABB(1000, 1000, 200, 200))
+    print(f"Región 200x200: {len(hits)} cuerpos, {tree.visited} nodos visitados")
+    hits = tree.query_point(4000, 3000)
+    print(f"Punto: {len(hits)} cuerpos, {tree.visited} nodos visitados")
+    hits = tree.ray_cast((0, 0), (8000, 6000))
+    print(f"Rayo diagonal: {len(hits)} cuerpos, {tree.visited} nodos visitados")
+
+    # Comprobación contra la fuerza bruta
+    fat = [tree.fat_box(p) for p in proxies]
+    expected = sorted((proxies[i], proxies[j]) for i in range(2000) for j in range(i + 1, 2000)
+                      if fat[i].intersects(fat[j]))
+    subset = set(proxies[:2000])
+    assert [p for p in tree.pairs() if p[0] in subset and p[1] in subset] == expected
@@ -1,6 +1,7 @@
 import matplotlib.pyplot as plt
 import numpy as np
-import heapq
+
+from pathfinding import a_star
 
 # Colores
 WHITE = 1
@@ -19,72 +20,15 @@ END = (14, 5)
 
 # Funciones de A* y visualización
 
-def heuristica(a, b):
-    """Heurística de Manhattan"""
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-def a_star(start, end, grid):
-    """Algoritmo A*"""
-    open_list = []
-    closed_list = set()
-    came_from = {}
-
-    # Celdas de inicio
-    g_score = {start: 0}
-    f_score = {start: heuristica(start, end)}
-
-    # Poner el punto inicial en la lista abierta
-    heapq.heappush(open_list, (f_score[start], start))
-
-    while open_list:
-        _, current = heapq.heappop(open_list)
-
-        # Si llegamos al final, reconstruir el camino
-        if current == end:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            return path[::-1]  # Devuelve el camino invertido
-
-        closed_list.add(current)
-
-        # Revisamos las celdas vecinas
-        neighbors = [(0, -1), (0, 1), (-1, 0), (1, 0)]  # 4 direcciones
-        for dx, dy in neighbors:
-            neighbor = (current[0] + dx, current[1] + dy)
-
-            # Verifica si la vecina está dentro de los límites y no es un obstáculo
-            if 0 <= neighbor[0] < WIDTH and 0 <= neighbor[1] < HEIGHT and grid[neighbor[1]][neighbor[0]] != 1:
-                if neighbor in closed_list:
-                    continue
-
-                tentative_g_score = g_score.get(current, float('inf')) + 1
-
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = g_score[neighbor] + heuristica(neighbor, end)
-
-                    if neighbor not in [i[1] for i in open_list]:
-                        heapq.heappush(open_list, (f_score[neighbor], neighbor))
-
-    return None  # Si no hay camino
-
 def draw_grid(grid, path=None):
     """Dibuja el mapa"""
-    grid_display = np.ones((HEIGHT, WIDTH)) * WHITE  # Inicializa el mapa con celdas blancas
-
-    # Obstáculos
-    for y in range(HEIGHT):
-        for x in range(WIDTH):
-            if grid[y][x] == 1:
-                grid_display[y][x] = BLACK
+    # Celdas blancas y obstáculos en negro
+    grid_display = np.where(np.asarray(grid) == 1, BLACK, WHITE)
 
-    # Dibuja el camino
+    # Dibuja el camino (posiciones (x, y))
     if path:
-        for p in path:
-            grid_display[p[1]][p[0]] = YELLOW
+        xs, ys = np.asarray(path).T
+        grid_display[ys, xs] = YELLOW
 
     # Dibuja el inicio y el final
     grid_display[START[1]][START[0]] = GREEN
@@ -0,0 +1,371 @@
+"""Benchmarks sin ventana de los módulos del núcleo.
+
+Cada caso usa semillas fijas, así que dos ejecuciones sobre el mismo código
+hacen exactamente el mismo trabajo. Para cada uno se mide el mejor tiempo de
+`--repeat` repeticiones (ops/s) y el pico de memoria de una ejecución aparte
+con tracemalloc (NumPy registra ahí sus arrays). El resultado se escribe en
+JSON para compararlo con una ejecución anterior:
+
+    python benchmarks.py -o base.json
+    python benchmarks.py --compare base.json   # sale con 1 si algo empeora
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+# Importar pygame (vía shapes) sin el mensaje de bienvenida en stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from broad_phase import SpatialHash
+from connectivity import label_components
+from dstar_lite import DStarLite
+from landmarks import LandmarkAStar
+from pathfinding import GridAStar, WeightedGridAStar
+from polygon_batch import PolygonBatch
+from sat import pad_polygons, sat_pairs
+from shapes import Polygon, check_aabb_collision, check_sat_collision
+from terrain import fbm
+from world_chunks import WATER_LEVEL, generate_map, terrain_costs
+
+SEED = 1234
+
+# Tamaños de mapa para A* y el ruido; `--quick` usa solo los primeros
+MAP_SIZES = (64, 128, 256, 512)
+QUICK_SIZES = 2
+
+# Caída de ops/s que `--compare` considera una regresión
+DEFAULT_TOLERANCE = 0.2
+
+
+# --- Casos ---
+# Cada caso prepara sus datos y devuelve (run, ops): `run()` hace el trabajo
+# medido y `ops` es cuántas operaciones cuenta una llamada.
+
+def _endpoints(passable, count, rng):
+    """Pares (inicio, meta) de casillas transitables al azar"""
+    free = np.argwhere(passable)
+    picks = free[rng.integers(0, len(free), (count, 2))]
+    return [(tuple(map(int, a)), tuple(map(int, b))) for a, b in picks]
+
+
+def _astar_case(passable, searches=20):
+    rng = np.random.default_rng(SEED)
+    finder = GridAStar(passable)
+    endpoints = _endpoints(passable, searches, rng)
+
+    def run():
+        for start, goal in endpoints:
+            finder.find_path(start, goal)
+    return run, searches
+
+
+def astar_random(size):
+    rng = np.random.default_rng(SEED)
+    return _astar_case(rng.random((size, size)) >= 0.3)  # 30% de obstáculos
+
+
+def astar_perlin(size):
+    return _astar_case(generate_map(size, size, seed=SEED) >= WATER_LEVEL)
+
+
+def _alt_case(size, bidirectional, searches=20):
+    # Mismas consultas que astar_perlin; el precálculo de las marcas no se mide
+    passable = generate_map(size, size, seed=SEED) >= WATER_LEVEL
+    finder = LandmarkAStar(passable)
+    endpoints = _endpoints(passable, searches, np.random.default_rng(SEED))
+
+    def run():
+        for start, goal in endpoints:
+            finder.find_path(start, goal, bidirectional)
+    return run, searches
+
+
+def alt_perlin(size):
+    return _alt_case(size, False)
+
+
+def alt_bidirectional(size):
+    return _alt_case(size, True)
+
+
+def _chase_walk(passable, steps, rng):
+    """Salida del perseguidor y recorrido del objetivo (una casilla por paso,
+    por caminos mínimos entre puntos al azar de la isla más grande). El
+    perseguidor sale de la casilla de la isla más lejana al objetivo."""
+    labels, _ = label_components(passable)
+    sizes = np.bincount(labels.ravel())
+    sizes[0] = 0
+    island = np.argwhere(labels == sizes.argmax())
+    finder = GridAStar(passable)
+    goal = tuple(map(int, island[rng.integers(len(island))]))
+    dist = WeightedGridAStar(passable).distance_field(goal)
+    start = tuple(map(int, np.unravel_index(dist.argmax(), dist.shape)))
+    walk = []
+    while len(walk) < steps:
+        waypoint = tuple(map(int, island[rng.integers(len(island))]))
+        walk += finder.find_path(goal, waypoint)
+        goal = walk[-1] if walk else goal
+    return start, walk[:steps]
+
+
+def _chase_case(size, incremental, steps=100):
+    # Un perseguidor que replanifica en cada paso hacia un objetivo que se
+    # mueve: D* Lite reparando su búsqueda frente a A* desde cero
+    passable = generate_map(size, size, seed=SEED) >= WATER_LEVEL
+    start, walk = _chase_walk(passable, steps, np.random.default_rng(SEED))
+
+    def run():
+        agent = start
+        if incremental:
+            planner = DStarLite(passable)
+            for goal in walk:
+                planner.plan(agent, goal)
+                agent = planner.next_step() or agent
+        else:
+            finder = GridAStar(passable)
+            for goal in walk:
+                path = finder.find_path(agent, goal)
+                if path:
+                    agent = path[0]
+    return run, steps
+
+
+def chase_dstar(size):
+    return _chase_case(size, True)
+
+
+def chase_replan(size):
+    return _chase_case(size, False)
+
+
+def _weighted_case(size, queue, searches=20):
+    costs = terrain_costs(generate_map(size, size, seed=SEED))
+    finder = WeightedGridAStar(costs)
+    endpoints = _endpoints(costs > 0, searches, np.random.default_rng(SEED))
+
+    def run():
+        for start, goal in endpoints:
+            finder.find_path(start, goal, queue)
+    return run, searches
+
+
+def weighted_bucket(size):
+    return _weighted_case(size, "bucket")
+
+
+def weighted_heap(size):
+    return _weighted_case(size, "heap")
+
+
+def _distance_field_case(size, queue):
+    costs = terrain_costs(generate_map(size, size, seed=SEED))
+    finder = WeightedGridAStar(costs)
+    (goal, _), = _endpoints(costs > 0, 1, np.random.default_rng(SEED))
+
+    def run():
+        finder.distance_field(goal, queue)
+    return run, int((costs > 0).sum())  # Casillas transitables por llamada
+
+
+def distance_field_bucket(size):
+    return _distance_field_case(size, "bucket")
+
+
+def distance_field_heap(size):
+    return _distance_field_case(size, "heap")
+
+
+def noise_fbm(size):
+    def run():
+        fbm(size, size, 20.0, seed=SEED)
+    return run, size * size  # Celdas por llamada
+
+
+def _random_polygons(count, extent, rng):
+    """Polígonos convexos al azar (vértices ordenados sobre un círculo)"""
+    polygons = []
+    for center, k in zip(rng.random((count, 2)) * extent, rng.integers(3, 9, count)):
+        angles = np.sort(rng.random(k)) * 2 * np.pi
+        radius = rng.random() * 10 + 2
+        polygons.append(center + radius * np.stack([np.cos(angles), np.sin(angles)], axis=1))
+    return polygons
+
+
+def aabb_pairs(count):
+    rng = np.random.default_rng(SEED)
+    boxes = [tuple(b) for b in np.concatenate([rng.random((count, 2)) * 100, rng.random((count, 2)) * 10 + 1], axis=1)]
+    pairs = rng.integers(0, count, (count, 2))
+
+    def run():
+        for i, j in pairs:
+            check_aabb_collision(boxes[i], boxes[j])
+    return run, len(pairs)
+
+
+def sat_scalar(count):
+    rng = np.random.default_rng(SEED)
+    polygons = _random_polygons(count, 100, rng)
+    pairs = rng.integers(0, count, (count, 2))
+
+    def run():
+        for i, j in pairs:
+            check_sat_collision(polygons[i], polygons[j])
+    return run, len(pairs)
+
+
+def sat_broad_phase(count):
+    rng = np.random.default_rng(SEED)
+    vertices, counts = pad_polygons(_random_polygons(count, 1000, rng))
+    bounds = np.concatenate([vertices.min(axis=1), vertices.max(axis=1)], axis=1)
+    grid = SpatialHash(cell_size=32)
+
+    def run():
+        sat_pairs(vertices, counts, grid.pairs(bounds))
+    return run, count  # Polígonos por llamada
+
+
+def rotate_polygon_objects(count):
+    rng = np.random.default_rng(SEED)
+    polygons = [Polygon(p.mean(axis=0), p) for p in _random_polygons(count, 1000, rng)]
+
+    def run():
+        for polygon in polygons:
+            polygon.rotate(3)
+            polygon.vertices
+    return run, count
+
+
+def rotate_polygon_batch(count):
+    rng = np.random.default_rng(SEED)
+    polygons = _random_polygons(count, 1000, rng)
+    batch = PolygonBatch([p - p.mean(axis=0) for p in polygons],
+                         positions=[p.mean(axis=0) for p in polygons])
+
+    def run():
+        batch.rotate(3)
+        batch.update()
+    return run, count
+
+
+def suite(quick=False):
+    """Lista de (nombre, función del caso, parámetro, unidad de `ops`)"""
+    sizes = MAP_SIZES[:QUICK_SIZES] if quick else MAP_SIZES
+    bodies = 1000 if quick else 10_000
+    cases = []
+    for size in sizes:
+        cases.append((f"astar_random_{size}", astar_random, size, "searches"))
+    for size in sizes:
+        cases.append((f"astar_perlin_{size}", astar_perlin, size, "searches"))
+    # Heurística ALT (marcas) sobre las mismas consultas que astar_perlin
+    for size in sizes:
+        cases.append((f"alt_perlin_{size}", alt_perlin, size, "searches"))
+        cases.append((f"alt_bidirectional_{size}", alt_bidirectional, size, "searches"))
+    # Persecución de un objetivo móvil: D* Lite incremental frente a A* en cada paso
+    for size in sizes:
+        cases.append((f"chase_dstar_{size}", chase_dstar, size, "steps"))
+        cases.append((f"chase_replan_{size}", chase_replan, size, "steps"))
+    # Costes de terreno: cola de cubetas frente a heapq sobre los mismos mapas
+    for size in sizes:
+        cases.append((f"weighted_bucket_{size}", weighted_bucket, size, "searches"))
+        cases.append((f"weighted_heap_{size}", weighted_heap, size, "searches"))
+    for size in sizes:
+        cases.append((f"distance_field_bucket_{size}", distance_field_bucket, size, "cells"))
+        cases.append((f"distance_field_heap_{size}", distance_field_heap, size, "cells"))
+    for size in sizes:
+        cases.append((f"noise_fbm_{size}", noise_fbm, size, "cells"))
+    cases += [
+        ("aabb_pairs", aabb_pairs, bodies, "pairs"),
+        ("sat_scalar", sat_scalar, bodies // 10, "pairs"),
+        ("sat_broad_phase", sat_broad_phase, bodies, "polygons"),
+        ("rotate_polygon", rotate_polygon_objects, bodies, "polygons"),
+        ("rotate_polygon_batch", rotate_polygon_batch, bodies, "polygons"),
+    ]
+    return cases
+
+
+# --- Medición ---
+def measure(case, param, unit, repeat):
+    run, ops = case(param)
+    run()  # Calentamiento (cachés, buffers reutilizables)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+
+    # Memoria en una ejecución aparte: tracemalloc ralentiza las asignaciones
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"param": param, "ops": ops, "unit": unit, "seconds": best,
+            "ops_per_sec": ops / best if best > 0 else float("inf"), "peak_bytes": peak}
+
+
+def run_suite(quick=False, repeat=3, only=None, log=sys.stderr):
+    results = {}
+    for name, case, param, unit in suite(quick):
+        if only and not any(pattern in name for pattern in only):
+            continue
+        results[name] = result = measure(case, param, unit, repeat)
+        print(f"{name:28} {result['ops_per_sec']:>14,.0f} ops/s {result['peak_bytes'] / 2**20:>9.2f} MiB",
+              file=log)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "seed": SEED,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Casos cuyo ops/s cayó más de `tolerance` respecto a `baseline`"""
+    regressions = []
+    for name, result in report["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        ratio = result["ops_per_sec"] / old["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="fichero JSON de salida (por defecto, stdout)")
+    parser.add_argument("--quick", action="store_true", help="solo los tamaños pequeños")
+    parser.add_argument("--repeat", type=int, default=3, help="repeticiones por caso (se toma la mejor)")
+    parser.add_argument("-k", dest="only", action="append", help="ejecutar solo los casos que contienen este texto")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior con la que comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="caída de ops/s admitida al comparar (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.quick, args.repeat, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for name, ratio in regressions:
+            print(f"Regresión: {name} a {ratio:.0%} de la referencia", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+from array import array
+
+import numpy as np
+
+# Componentes conexas (4 vecinos) de una cuadrícula de transitabilidad. Con
+# las etiquetas, saber si una meta es alcanzable es O(1): los buscadores
+# rechazan enseguida las consultas entre islas en vez de inundar toda la
+# región de la salida antes de devolver "sin camino".
+
+
+def label_components(passable):
+    """Etiquetas (rows, cols) int32 de las componentes (0 = bloqueada) y su número.
+
+    Trabaja por tramos horizontales de casillas libres: se unen los tramos
+    de filas consecutivas que se solapan, así que el bucle de Python recorre
+    tramos y no casillas.
+    """
+    passable = np.asarray(passable, dtype=bool)
+    rows, cols = passable.shape
+    labels = np.zeros((rows, cols), dtype=np.int32)
+    if not passable.any():
+        return labels, 0
+
+    # Tramos: inicio y fin (inclusive) de cada racha de casillas libres
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = passable
+    edges = np.diff(padded, axis=1)
+    run_row, run_start = np.nonzero(edges == 1)
+    _, run_end = np.nonzero(edges == -1)
+    run_end -= 1
+    count = len(run_start)
+    row_first = np.searchsorted(run_row, np.arange(rows + 1))
+
+    # Unión de tramos solapados entre cada fila y la siguiente
+    parent = list(range(count))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for r in range(rows - 1):
+        a0, a1 = row_first[r], row_first[r + 1]
+        b0, b1 = row_first[r + 1], row_first[r + 2]
+        if a0 == a1 or b0 == b1:
+            continue
+        # Para cada tramo de abajo, los de arriba con fin >= su inicio e inicio <= su fin
+        lo = a0 + np.searchsorted(run_end[a0:a1], run_start[b0:b1])
+        hi = a0 + np.searchsorted(run_start[a0:a1], run_end[b0:b1], side="right")
+        for b, first, last in zip(range(b0, b1), lo.tolist(), hi.tolist()):
+            for a in range(first, last):
+                ra, rb = find(a), find(b)
+                if ra != rb:
+                    parent[rb] = ra
+
+    roots = np.array([find(x) for x in range(count)])
+    _, run_label = np.unique(roots, return_inverse=True)
+    run_label = run_label.astype(np.int32) + 1
+    lengths = run_end - run_start + 1
+    cells = np.repeat(run_row * cols + run_start, lengths) + _ramps(lengths)
+    labels.ravel()[cells] = np.repeat(run_label, lengths)
+    return labels, int(run_label.max())
+
+
+def _ramps(lengths):
+    """Concatenación de arange(n) para cada n de `lengths`"""
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.arange(total) - offsets
+
+
+class Connectivity:
+    """Máscara de transitabilidad compacta (uint8) con componentes conexas.
+
+    Las posiciones son (i, j) sobre `passable[i][j]`, como en GridAStar, con
+    un borde bloqueado alrededor. `labels` evita el etiquetado inicial si ya
+    se tienen las de `label_components`. Cada casilla libre guarda la etiqueta de su
+    componente; las etiquetas forman un union-find, así que abrir una casilla
+    que une dos islas solo une sus raíces. Cerrar una casilla puede partir su
+    componente: primero se mira el anillo de 8 vecinos (si los vecinos siguen
+    unidos alrededor no hay corte) y si no, se hacen búsquedas intercaladas
+    desde cada vecino que terminan en cuanto todas menos una se encuentran o
+    se agotan; solo se reetiquetan las partes que se separan.
+    """
+
+    def __init__(self, passable, labels=None):
+        passable = np.asarray(passable, dtype=bool)
+        self.rows, self.cols = passable.shape
+        self.width = self.cols + 2
+
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = passable
+        self.passable = bytearray(padded.tobytes())
+        self.size = len(self.passable)
+
+        if labels is None:
+            labels, count = label_components(passable)
+        else:
+            # Etiquetas ya calculadas (p. ej. de una instantánea del mundo)
+            labels = np.asarray(labels, dtype=np.int32)
+            count = int(labels.max(initial=0))
+        padded_labels = np.zeros((self.rows + 2, self.cols + 2), dtype=np.int32)
+        padded_labels[1:-1, 1:-1] = labels
+        self.labels = array('i', padded_labels.tobytes())
+        # Union-find sobre las etiquetas (la 0 es "bloqueada")
+        self.parent = list(range(count + 1))
+        self.sizes = np.bincount(labels.ravel(), minlength=count + 1).tolist()
+        self.sizes[0] = 0
+
+        w = self.width
+        self.offsets = (-w, w, -1, 1)
+        # Anillo de 8 vecinos en orden, empezando por el de arriba
+        self.ring = (-w, -w + 1, 1, w + 1, w, w - 1, -1, -w - 1)
+
+        # Estadística: casillas visitadas por el último set_passable
+        self.visited = 0
+
+    def cell(self, pos):
+        """Id plano de la celda (i, j)"""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, cell):
+        i, j = divmod(cell, self.width)
+        return (i - 1, j - 1)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def is_passable(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols and self.passable[self.cell(pos)] == 1
+
+    # --- Componentes ---
+    def _find(self, label):
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def component(self, pos):
+        """Etiqueta de la componente de `pos` (0 si está bloqueada o fuera)"""
+        if not self.in_bounds(pos):
+            return 0
+        label = self.labels[self.cell(pos)]
+        return self._find(label) if label else 0
+
+    def connected(self, a, b):
+        """True si hay camino entre `a` y `b` (ambas libres y en la misma componente)"""
+        ca = self.component(a)
+        return ca != 0 and ca == self.component(b)
+
+    def component_size(self, pos):
+        return self.sizes[self.component(pos)]
+
+    def label_grid(self):
+        """Etiquetas (rows, cols) resueltas a su raíz, 0 en las bloqueadas"""
+        roots = np.array([self._find(label) for label in range(len(self.parent))], dtype=np.int32)
+        labels = np.frombuffer(self.labels, dtype=np.int32).reshape(self.rows + 2, self.width)
+        return roots[labels[1:-1, 1:-1]]
+
+    def cells(self, label):
+        """Array (N, 2) de las casillas de la componente `label` (ver `component`)"""
+        if not label:
+            return np.empty((0, 2), dtype=np.int64)
+        return np.argwhere(self.label_grid() == label)
+
+    def largest(self):
+        """Etiqueta de la componente más grande (0 si no hay casillas libres)"""
+        return int(np.argmax(self.sizes)) if max(self.sizes) else 0
+
+    # --- Cambios ---
+    def set_passable(self, pos, value):
+        """Abre o cierra una casilla actualizando las etiquetas"""
+        c = self.cell(pos)
+        value = 1 if value else 0
+        self.visited = 0
+        if self.passable[c] == value:
+            return
+        self.passable[c] = value
+        if value:
+            self._open(c)
+        else:
+            self._close(c)
+
+    def _union(self, a, b):
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return a
+        if self.sizes[a] < self.sizes[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.sizes[a] += self.sizes[b]
+        self.sizes[b] = 0
+        return a
+
+    def _new_label(self, size):
+        self.parent.append(len(self.parent))
+        self.sizes.append(size)
+        return len(self.parent) - 1
+
+    def _open(self, c):
+        labels = self.labels
+        neighbors = [labels[c + o] for o in self.offsets if self.passable[c + o]]
+        if not neighbors:
+            labels[c] = self._new_label(1)
+            return
+        root = self._find(neighbors[0])
+        for label in neighbors[1:]:
+            root = self._union(root, label)
+        labels[c] = root
+        self.sizes[root] += 1
+
+    def _ring_connected(self, c):
+        """True si los vecinos libres de `c` siguen unidos por su anillo de 8"""
+        passable = self.passable
+        ring = [passable[c + o] for o in self.ring]
+        # Tramos de casillas libres consecutivas en el anillo (circular)
+        if all(ring):
+            return True
+        start = ring.index(0)
+        segments = 0
+        in_segment = False
+        for k in range(1, 9):
+            free = ring[(start + k) % 8]
+            if free and not in_segment:
+                in_segment = True
+                touches = False
+            if free and (start + k) % 2 == 0:
+                touches = True  # Posiciones pares del anillo: vecinos en cruz
+            if not free and in_segment:
+                in_segment = False
+                segments += touches
+        return segments <= 1
+
+    def _close(self, c):
+        labels, passable, offsets = self.labels, self.passable, self.offsets
+        root = self._find(labels[c])
+        labels[c] = 0
+        self.sizes[root] -= 1
+        starts = [c + o for o in offsets if passable[c + o]]
+        if len(starts) <= 1 or self._ring_connected(c):
+            return
+
+        # Búsquedas intercaladas desde cada vecino: `owner` dice qué búsqueda
+        # visitó cada casilla y `group` une las búsquedas que se encontraron
+        owner = {s: k for k, s in enumerate(starts)}
+        frontiers = [[s] for s in starts]
+        group = list(range(len(starts)))
+
+        def find(k):
+            while group[k] != k:
+                k = group[k]
+            return k
+
+        while True:
+            open_groups = {find(k) for k, f in enumerate(frontiers) if f}
+            closed_groups = {find(k) for k in range(len(starts))} - open_groups
+            # Terminado cuando queda como mucho una parte sin cerrar
+            if len(open_groups) <= 1:
+                break
+            for k, frontier in enumerate(frontiers):
+                if not frontier:
+                    continue
+                current = frontier.pop()
+                for o in offsets:
+                    n = current + o
+                    if not passable[n]:
+                        continue
+                    other = owner.get(n)
+                    if other is None:
+                        owner[n] = k
+                        frontier.append(n)
+                    else:
+                        a, b = find(k), find(other)
+                        if a != b:
+                            group[b] = a
+        self.visited = len(owner)
+
+        # Cada parte cerrada (agotó su búsqueda) es una componente nueva; si
+        # no quedó ninguna abierta, la última conserva la etiqueta
+        if not open_groups:
+            closed_groups.pop()
+        for part in closed_groups:
+            members = [n for n, k in owner.items() if find(k) == part]
+            label = self._new_label(len(members))
+            for n in members:
+                labels[n] = label
+            self.sizes[root] -= len(members)
+
+    def validate(self):
+        """Comprueba que las etiquetas coinciden con un etiquetado desde cero"""
+        passable = np.frombuffer(self.passable, dtype=np.uint8).reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+        expected, count = label_components(passable)
+        labels = self.label_grid()
+        # Misma partición: la correspondencia entre etiquetas es biyectiva
+        pairs = np.unique(np.stack([expected.ravel(), labels.ravel()]), axis=1)
+        assert len(np.unique(pairs[0])) == len(pairs[0]) == len(np.unique(pairs[1])) == count + (0 in expected)
+        for label in np.unique(labels[labels > 0]):
+            assert self.sizes[label] == (labels == label).sum()
+
+
+if __name__ == "__main__":
+    # Etiquetado de un mapa grande y cambios incrementales frente a reetiquetar
+    import time
+
+    from world_chunks import WATER_LEVEL, generate_map
+
+    size = 1024
+    passable = generate_map(size, size, seed=1) >= WATER_LEVEL
+    start = time.perf_counter()
+    components = Connectivity(passable)
+    label_time = time.perf_counter() - start
+
+    rng = np.random.default_rng(0)
+    changes = 2000
+    cells = rng.integers(0, size, (changes, 2))
+    visited = 0
+    start = time.perf_counter()
+    for i, j in cells:
+        components.set_passable((i, j), not components.is_passable((i, j)))
+        visited += components.visited
+    update_time = time.perf_counter() - start
+    components.validate()
+
+    print(f"{size}x{size}: etiquetado {label_time * 1000:.0f} ms, {len(components.parent) - 1} etiquetas; "
+          f"{changes} cambios {update_time / changes * 1e6:.0f} us de media "
+          f"({visited / changes:.0f} casillas visitadas por cambio)")
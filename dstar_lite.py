@@ -0,0 +1,291 @@
+import heapq
+from array import array
+from collections import deque
+
+from pathfinding import GridAStar
+
+INFINITY = 2**30
+# Segunda componente de la clave de los nodos sobreconsistentes: OVER_KEY - rhs
+# (ver `_calc_key`); cabe en los arrays 'i' de las claves
+OVER_KEY = 2**31 - 1
+
+# Se recoloca la raíz de la búsqueda cuando el agente ha recorrido más de esta
+# fracción del camino desde ella (la región de búsqueda crecería sin motivo)
+REROOT_RATIO = 0.5
+# Si el objetivo salta más casillas que esto (Manhattan) entre dos llamadas,
+# p. ej. al reaparecer, se empieza una búsqueda nueva en vez de corregir las
+# claves: todas las de la lista abierta quedarían cortas y habría que
+# reinsertarlas una a una
+RESTART_JUMP = 8
+
+
+class DStarLite:
+    """Planificador incremental para un objetivo móvil (Moving Target D* Lite).
+
+    La búsqueda crece hacia delante desde una raíz (la posición del agente al
+    planificar) sobre una cuadrícula de 4 direcciones y coste unitario, y se
+    conserva entre llamadas a `plan`:
+
+    - Si el objetivo se mueve, solo se corrigen las claves con `km` (como en
+      D* Lite) y se procesan los nodos necesarios para la nueva meta.
+    - Si cambian casillas (`set_passable`), se reparan solo los nodos afectados.
+    - Mientras el agente avanza por el camino, la raíz no cambia: el resto del
+      camino óptimo desde la raíz también es óptimo desde el agente. Si el
+      agente se sale del árbol o se aleja demasiado, la búsqueda vuelve a
+      empezar desde él: todos los g se miden desde la raíz, así que
+      repararlos con la raíz nueva invalidaría casi todo el árbol y costaría
+      bastante más que una búsqueda nueva.
+
+    El camino queda en `path` (un deque); `next_step` lo consume en O(1).
+    """
+
+    def __init__(self, passable, reroot_ratio=REROOT_RATIO, components=None):
+        self.grid = GridAStar(passable)
+        if components is not None:
+            # Componentes compartidas (connectivity.Connectivity del mismo mapa)
+            self.grid.label_components(components)
+        self.reroot_ratio = reroot_ratio
+        size = self.grid.size
+        self.g = array('i', [INFINITY]) * size
+        self.rhs = array('i', [INFINITY]) * size
+        self.parent = array('i', [-1]) * size
+        # Clave vigente de cada nodo en la lista abierta (borrado perezoso)
+        self.key1 = array('i', [0]) * size
+        self.key2 = array('i', [0]) * size
+        self.in_open = bytearray(size)
+        self.open = []
+        self.km = 0
+        self.root = None
+        self.goal = None
+        self.goal_i = self.goal_j = 0  # Fila y columna de `goal` (para la heurística)
+
+        self.path = deque()
+        self.position = None  # Casilla en la que el camino asume al agente
+        self.dirty = True
+
+        # Estadística de la última llamada a `plan`
+        self.expanded = 0
+
+    # --- Núcleo de LPA*/D* Lite ---
+    def _set_goal(self, goal):
+        self.goal = goal
+        self.goal_i, self.goal_j = divmod(goal, self.grid.width)
+
+    def _heuristic(self, cell):
+        ci, cj = divmod(cell, self.grid.width)
+        di, dj = ci - self.goal_i, cj - self.goal_j
+        return (di if di > 0 else -di) + (dj if dj > 0 else -dj)
+
+    def _calc_key(self, cell):
+        """(k1, k2) con k1 = min(g, rhs) + h + km, como en D* Lite.
+
+        A igual k1 van primero los subconsistentes (k2 = g, como en LPA*: de
+        su g dependen los rhs de otros) y luego los sobreconsistentes de
+        mayor rhs (k2 = OVER_KEY - rhs), el desempate de GridAStar. Con la
+        heurística consistente, un sobreconsistente de k1 mínimo ya tiene su
+        rhs definitivo, así que entre ellos el orden es libre, y preferir los
+        más cercanos a la meta evita expandir franjas enteras de empates.
+        """
+        g, rhs = self.g[cell], self.rhs[cell]
+        if g < rhs:
+            return (g + self._heuristic(cell) + self.km, g)
+        return (rhs + self._heuristic(cell) + self.km, OVER_KEY - rhs)
+
+    def _update_state(self, cell):
+        if self.g[cell] != self.rhs[cell]:
+            k1, k2 = self._calc_key(cell)
+            if not (self.in_open[cell] and self.key1[cell] == k1 and self.key2[cell] == k2):
+                self.in_open[cell] = 1
+                self.key1[cell], self.key2[cell] = k1, k2
+                heapq.heappush(self.open, (k1, k2, cell))
+        else:
+            self.in_open[cell] = 0
+
+    def _neighbors(self, cell):
+        passable, w = self.grid.passable, self.grid.width
+        for n in (cell - w, cell + w, cell - 1, cell + 1):
+            if passable[n]:
+                yield n
+
+    def _recompute_rhs(self, cell):
+        """rhs = mejor g de un vecino + 1 (la raíz siempre vale 0)"""
+        if cell == self.root:
+            self.rhs[cell] = 0
+            self.parent[cell] = -1
+            return
+        best, best_parent = INFINITY, -1
+        if self.grid.passable[cell]:
+            g = self.g
+            for n in self._neighbors(cell):
+                if g[n] + 1 < best:
+                    best, best_parent = g[n] + 1, n
+        self.rhs[cell] = best
+        self.parent[cell] = best_parent
+
+    def _compute(self):
+        g, rhs, parent, root, goal = self.g, self.rhs, self.parent, self.root, self.goal
+        key1, key2, in_open, open_list = self.key1, self.key2, self.in_open, self.open
+        passable, w = self.grid.passable, self.grid.width
+        gi, gj, km = self.goal_i, self.goal_j, self.km
+        heappush, heappop, heapreplace = heapq.heappush, heapq.heappop, heapq.heapreplace
+        update_state = self._update_state
+        expanded = 0
+        while open_list:
+            k1, k2, u = open_list[0]
+            if not (in_open[u] and key1[u] == k1 and key2[u] == k2):
+                heappop(open_list)  # Entrada obsoleta
+                continue
+            # Con la meta consistente su clave es (g + km, OVER_KEY - g): h(meta) = 0
+            if g[goal] == rhs[goal]:
+                m = g[goal] + km
+                if k1 > m or (k1 == m and k2 >= OVER_KEY - g[goal]):
+                    break
+
+            # Las claves guardadas se quedan cortas cuando crece km: reinsertar
+            ui, uj = divmod(u, w)
+            di, dj = ui - gi, uj - gj
+            new1 = (g[u] if g[u] < rhs[u] else rhs[u]) + (di if di > 0 else -di) + (dj if dj > 0 else -dj) + km
+            if k1 < new1:
+                key1[u] = new1
+                heapreplace(open_list, (new1, k2, u))
+                continue
+
+            heappop(open_list)
+            in_open[u] = 0
+            expanded += 1
+            if g[u] > rhs[u]:
+                # Sobreconsistente: fijar g y relajar los vecinos (con
+                # `_update_state` en línea: es el bucle más caliente)
+                gu = g[u] = rhs[u]
+                rs = gu + 1
+                for s in (u - w, u + w, u - 1, u + 1):
+                    if passable[s] and s != root and rhs[s] > rs:
+                        rhs[s] = rs
+                        parent[s] = u
+                        gs = g[s]
+                        if gs == rs:
+                            in_open[s] = 0
+                            continue
+                        si, sj = divmod(s, w)
+                        di, dj = si - gi, sj - gj
+                        h = (di if di > 0 else -di) + (dj if dj > 0 else -dj) + km
+                        if gs < rs:
+                            n1, n2 = gs + h, gs
+                        else:
+                            n1, n2 = rs + h, OVER_KEY - rs
+                        if not (in_open[s] and key1[s] == n1 and key2[s] == n2):
+                            in_open[s] = 1
+                            key1[s], key2[s] = n1, n2
+                            heappush(open_list, (n1, n2, s))
+            else:
+                # Subconsistente: invalidar u y recalcular los hijos que colgaban de él
+                g[u] = INFINITY
+                update_state(u)
+                for s in (u - w, u + w, u - 1, u + 1):
+                    if passable[s] and s != root and parent[s] == u:
+                        self._recompute_rhs(s)
+                        update_state(s)
+        self.expanded += expanded
+
+    # --- Gestión de la raíz y del objetivo ---
+    def _initialize(self, start, goal):
+        size = self.grid.size
+        self.g = array('i', [INFINITY]) * size
+        self.rhs = array('i', [INFINITY]) * size
+        self.parent = array('i', [-1]) * size
+        self.in_open = bytearray(size)
+        self.open = []
+        self.km = 0
+        self.root = start
+        self._set_goal(goal)
+        self.rhs[start] = 0
+        self._update_state(start)
+        self.dirty = True
+
+    def _extract(self, start):
+        """Camino de `start` a la meta siguiendo los padres desde la meta.
+
+        Devuelve None si `start` no está en el camino de la raíz a la meta.
+        """
+        cell = self.goal
+        if self.g[cell] >= INFINITY:
+            return None
+        parent = self.parent
+        cells = []
+        for _ in range(self.g[cell] + 1):
+            if cell == start:
+                cells.reverse()
+                return [self.grid.position(c) for c in cells]
+            cells.append(cell)
+            cell = parent[cell]
+            if cell < 0:
+                break
+        return None
+
+    # --- API ---
+    def set_passable(self, pos, value):
+        """Cambia una casilla; la búsqueda se repara en el siguiente `plan`"""
+        self.grid.set_passable(pos, value)
+        if self.root is None:
+            return
+        cell = self.grid.cell(pos)
+        self._recompute_rhs(cell)
+        self._update_state(cell)
+        for n in self._neighbors(cell):
+            if n != self.root:
+                self._recompute_rhs(n)
+                self._update_state(n)
+        self.dirty = True
+
+    def plan(self, start, goal):
+        """Actualiza el camino del agente en `start` hacia `goal`.
+
+        Devuelve True si hay camino. Si nada cambió desde la última llamada y el
+        agente sigue el camino, no se hace ningún trabajo de búsqueda.
+        """
+        self.expanded = 0
+        if not (self.grid.is_passable(start) and self.grid.is_passable(goal)):
+            self.path = deque()
+            return False
+        components = self.grid.components
+        if components is not None and not components.connected(start, goal):
+            self.path = deque()  # Meta en otra isla: ni siquiera se busca
+            return False
+        s, t = self.grid.cell(start), self.grid.cell(goal)
+
+        # Búsqueda nueva si no hay ninguna, si el objetivo saltó lejos o si el
+        # agente ya recorrió demasiado de su camino (no merece la pena
+        # repararla para después descartarla)
+        walked = self.g[s] if s == self.position and self.g[s] < INFINITY else 0
+        if (self.root is None or (t != self.goal and self._heuristic(t) > RESTART_JUMP)
+                or walked > self.reroot_ratio * (walked + len(self.path))):
+            self._initialize(s, t)
+        elif t != self.goal:
+            # El objetivo se movió: corregir las claves en vez de reiniciar
+            self.km += self._heuristic(t)
+            self._set_goal(t)
+            self.dirty = True
+
+        if not self.dirty and s == self.position:
+            return bool(self.path) or s == t
+
+        self._compute()
+        path = self._extract(s)
+        too_far = self.g[s] < INFINITY and self.g[s] > self.reroot_ratio * self.g[t]
+        if (path is None or too_far) and s != self.root:
+            self._initialize(s, t)
+            self._compute()
+            path = self._extract(s)
+
+        self.dirty = False
+        self.position = s
+        self.path = deque(path or ())
+        return path is not None
+
+    def next_step(self):
+        """Siguiente casilla del camino (y avanza el cursor), o None"""
+        if not self.path:
+            return None
+        step = self.path.popleft()
+        self.position = self.grid.cell(step)
+        return step
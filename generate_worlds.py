@@ -0,0 +1,176 @@
+"""Generación en lote de mundos con semilla, repartida entre procesos.
+
+Cada mundo se guarda como instantánea de world_snapshot (.snap, se abre con
+memmap) o como .npz con las mismas tablas. El trabajo se reparte por mundos
+y, si hay menos mundos que procesos, cada mundo se parte además en franjas
+de columnas que se generan por separado (`fbm` con `origin`) y se juntan
+antes de calcular las tablas derivadas:
+
+    python generate_worlds.py 0 999 --size 512 -o worlds/
+    python generate_worlds.py 42 42 --size 4096 --format npz -o worlds/
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from terrain import fbm
+from world_snapshot import build_tables, derive_tables, save_snapshot, snapshot_key, snapshot_path
+
+FORMATS = ("snapshot", "npz")
+
+# Columnas mínimas por franja: con menos, repartir no compensa el envío
+MIN_BAND_COLUMNS = 64
+# Mundos en curso por proceso (limita la memoria con franjas)
+WORLDS_IN_FLIGHT = 2
+
+
+def world_path(directory, key, fmt="snapshot"):
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    path = snapshot_path(directory, key)
+    return path if fmt == "snapshot" else os.path.splitext(path)[0] + ".npz"
+
+
+def _write_world(directory, key, tables, fmt):
+    path = world_path(directory, key, fmt)
+    if fmt == "snapshot":
+        save_snapshot(path, key, tables)
+    else:
+        # Escritura atómica, como las instantáneas
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, **tables)
+        os.replace(tmp, path)
+    return path
+
+
+# --- Tareas del pool ---
+def _build_world(directory, key, fmt):
+    """Mundo entero en un proceso"""
+    return _write_world(directory, key, build_tables(key), fmt)
+
+
+def _generate_band(key, x0, x1):
+    """Alturas de las columnas [x0, x1) de un mundo"""
+    return fbm(x1 - x0, key["height"], key["scale"], key["octaves"],
+               seed=key["seed"], origin=(x0, 0), dtype=np.float32)
+
+
+def _finish_world(directory, key, heights, fmt):
+    """Tablas derivadas y escritura de un mundo generado por franjas"""
+    return _write_world(directory, key, derive_tables(heights), fmt)
+
+
+def band_edges(width, bands):
+    """Límites [x0, x1) de `bands` franjas de columnas lo más iguales posible"""
+    bands = max(1, min(bands, width // MIN_BAND_COLUMNS))
+    edges = np.linspace(0, width, bands + 1).astype(int).tolist()
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def generate_worlds(seeds, width, height, directory, scale=20.0, octaves=6, fmt="snapshot",
+                    workers=None, bands=None, log=sys.stderr):
+    """Genera y guarda un mundo por semilla; devuelve estadísticas de la ejecución.
+
+    `bands` es el número de franjas por mundo (por defecto, las justas para
+    ocupar todos los procesos cuando hay menos mundos que procesos).
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Formato desconocido: {fmt}")
+    seeds = list(seeds)
+    workers = workers or os.cpu_count() or 1
+    if bands is None:
+        bands = -(-workers // max(1, len(seeds)))
+    edges = band_edges(width, bands)
+    os.makedirs(directory, exist_ok=True)
+
+    keys = iter(snapshot_key(seed, scale, octaves, width, height) for seed in seeds)
+    report_every = max(1, len(seeds) // 20)
+    done = 0
+    tasks = {}     # future -> (tipo, clave, franja)
+    partial = {}   # semilla -> [alturas, franjas pendientes]
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(workers) as pool:
+        def start_world():
+            key = next(keys, None)
+            if key is None:
+                return False
+            if len(edges) == 1:
+                tasks[pool.submit(_build_world, directory, key, fmt)] = ("world", key, None)
+                return True
+            partial[key["seed"]] = [np.empty((width, height), dtype=np.float32), len(edges)]
+            for x0, x1 in edges:
+                tasks[pool.submit(_generate_band, key, x0, x1)] = ("band", key, (x0, x1))
+            return True
+
+        in_flight = 0
+        while in_flight < workers * WORLDS_IN_FLIGHT and start_world():
+            in_flight += 1
+
+        while tasks:
+            finished, _ = wait(tasks, return_when=FIRST_COMPLETED)
+            for future in finished:
+                kind, key, band = tasks.pop(future)
+                result = future.result()
+                if kind == "band":
+                    entry = partial[key["seed"]]
+                    entry[0][band[0]:band[1]] = result
+                    entry[1] -= 1
+                    if entry[1] == 0:
+                        del partial[key["seed"]]
+                        tasks[pool.submit(_finish_world, directory, key, entry[0], fmt)] = ("world", key, None)
+                    continue
+
+                done += 1
+                in_flight -= 1
+                if start_world():
+                    in_flight += 1
+                if log is not None and (done % report_every == 0 or done == len(seeds)):
+                    elapsed = time.perf_counter() - start
+                    rate = done * width * height / elapsed
+                    print(f"[{done}/{len(seeds)}] semilla {key['seed']}: {rate / 1e6:.2f} Mceldas/s "
+                          f"({rate / workers / 1e6:.2f} por proceso)", file=log)
+
+    elapsed = time.perf_counter() - start
+    cells = len(seeds) * width * height
+    return {
+        "worlds": len(seeds), "width": width, "height": height, "format": fmt,
+        "workers": workers, "bands": len(edges), "seconds": elapsed, "cells": cells,
+        "cells_per_sec": cells / elapsed, "cells_per_sec_per_core": cells / elapsed / workers,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("first", type=int, help="primera semilla")
+    parser.add_argument("last", type=int, help="última semilla (incluida)")
+    parser.add_argument("-o", "--output", default="worlds", help="directorio de salida")
+    parser.add_argument("--size", type=int, default=256, help="ancho y alto del mapa")
+    parser.add_argument("--width", type=int, help="ancho del mapa (por defecto, --size)")
+    parser.add_argument("--height", type=int, help="alto del mapa (por defecto, --size)")
+    parser.add_argument("--scale", type=float, default=20.0)
+    parser.add_argument("--octaves", type=int, default=6)
+    parser.add_argument("--format", choices=FORMATS, default="snapshot")
+    parser.add_argument("--workers", type=int, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("--bands", type=int, help="franjas por mundo (por defecto, automático)")
+    args = parser.parse_args(argv)
+    if args.last < args.first:
+        parser.error("la última semilla no puede ser menor que la primera")
+
+    stats = generate_worlds(range(args.first, args.last + 1), args.width or args.size,
+                            args.height or args.size, args.output, args.scale, args.octaves,
+                            args.format, args.workers, args.bands)
+    print(f"{stats['worlds']} mundos {stats['width']}x{stats['height']} en {stats['seconds']:.2f} s "
+          f"con {stats['workers']} procesos ({stats['bands']} franjas por mundo): "
+          f"{stats['cells_per_sec'] / 1e6:.2f} Mceldas/s, "
+          f"{stats['cells_per_sec_per_core'] / 1e6:.2f} Mceldas/s por núcleo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,453 @@
+import math
+
+# GJK (distancia / intersección) y EPA (profundidad de penetración) entre
+# polígonos convexos dados como secuencias de vértices (x, y) en orden.
+# Se trabaja sobre la diferencia de Minkowski B - A: los polígonos se
+# solapan si y solo si contiene el origen.
+
+MAX_GJK_ITERATIONS = 32
+MAX_EPA_ITERATIONS = 64
+EPA_TOLERANCE = 1e-9
+EPSILON = 1e-12
+
+
+class SimplexCache:
+    """Estado que se conserva entre frames para un par persistente.
+
+    Guarda los índices de vértices del último símplice (para empezar GJK
+    desde él) y el último vértice de soporte de cada polígono (para que la
+    búsqueda del soporte empiece junto al anterior y avance muy pocos pasos).
+    """
+
+    def __init__(self):
+        self.indices = []  # [(índice en A, índice en B)] del último símplice
+        self.support_a = 0
+        self.support_b = 0
+        self.iterations = 0  # Iteraciones de GJK de la última llamada
+
+
+class Contact:
+    """Resultado de `contact`.
+
+    - `hit`: si los polígonos se solapan (tocarse cuenta, como en SAT).
+    - `normal`: unitaria, de A hacia B. Desplazar A por -normal * depth los separa.
+    - `depth`: profundidad de penetración (0 si no se solapan).
+    - `distance`: distancia entre ambos (0 si se solapan).
+    - `point_a`, `point_b`: puntos más cercanos (o más profundos) de A y B.
+    - `points`: manifold de contacto, lista de (punto, profundidad) (1 o 2).
+    """
+
+    def __init__(self, hit, normal, depth, distance, point_a, point_b, points=()):
+        self.hit = hit
+        self.normal = normal
+        self.depth = depth
+        self.distance = distance
+        self.point_a = point_a
+        self.point_b = point_b
+        self.points = list(points)
+
+
+def _support(vertices, dx, dy, start):
+    """Índice del vértice más lejano en la dirección (dx, dy).
+
+    En un polígono convexo el producto escalar es unimodal a lo largo del
+    contorno, así que basta con subir desde `start` hacia el vecino mejor.
+    """
+    n = len(vertices)
+    i = start % n
+    x, y = vertices[i]
+    best = x * dx + y * dy
+    while True:
+        x, y = vertices[(i + 1) % n]
+        value = x * dx + y * dy
+        if value > best:
+            i, best = (i + 1) % n, value
+            continue
+        x, y = vertices[i - 1]
+        value = x * dx + y * dy
+        if value > best:
+            i, best = (i - 1) % n, value
+            continue
+        return i
+
+
+class _Vertex:
+    """Vértice del símplice: w = b - a con sus índices y su peso baricéntrico"""
+    __slots__ = ('ia', 'ib', 'ax', 'ay', 'bx', 'by', 'wx', 'wy', 'weight')
+
+    def __init__(self, a, b, ia, ib):
+        self.ia, self.ib = ia, ib
+        self.ax, self.ay = a[ia]
+        self.bx, self.by = b[ib]
+        self.wx, self.wy = self.bx - self.ax, self.by - self.ay
+        self.weight = 1.0
+
+
+def _solve2(simplex):
+    """Punto del segmento más cercano al origen (reduce el símplice si toca)"""
+    v1, v2 = simplex
+    ex, ey = v2.wx - v1.wx, v2.wy - v1.wy
+    d2 = -(v1.wx * ex + v1.wy * ey)
+    if d2 <= 0:
+        v1.weight = 1.0
+        return [v1]
+    d1 = v2.wx * ex + v2.wy * ey
+    if d1 <= 0:
+        v2.weight = 1.0
+        return [v2]
+    inv = 1.0 / (d1 + d2)
+    v1.weight, v2.weight = d1 * inv, d2 * inv
+    return [v1, v2]
+
+
+def _solve3(simplex):
+    """Región de Voronoi del triángulo que contiene el origen más cercano"""
+    v1, v2, v3 = simplex
+    w1x, w1y, w2x, w2y, w3x, w3y = v1.wx, v1.wy, v2.wx, v2.wy, v3.wx, v3.wy
+
+    e12x, e12y = w2x - w1x, w2y - w1y
+    d12_1 = w2x * e12x + w2y * e12y
+    d12_2 = -(w1x * e12x + w1y * e12y)
+    e13x, e13y = w3x - w1x, w3y - w1y
+    d13_1 = w3x * e13x + w3y * e13y
+    d13_2 = -(w1x * e13x + w1y * e13y)
+    e23x, e23y = w3x - w2x, w3y - w2y
+    d23_1 = w3x * e23x + w3y * e23y
+    d23_2 = -(w2x * e23x + w2y * e23y)
+
+    n123 = e12x * e13y - e12y * e13x
+    d123_1 = n123 * (w2x * w3y - w2y * w3x)
+    d123_2 = n123 * (w3x * w1y - w3y * w1x)
+    d123_3 = n123 * (w1x * w2y - w1y * w2x)
+
+    if d12_2 <= 0 and d13_2 <= 0:
+        v1.weight = 1.0
+        return [v1]
+    if d12_1 > 0 and d12_2 > 0 and d123_3 <= 0:
+        inv = 1.0 / (d12_1 + d12_2)
+        v1.weight, v2.weight = d12_1 * inv, d12_2 * inv
+        return [v1, v2]
+    if d13_1 > 0 and d13_2 > 0 and d123_2 <= 0:
+        inv = 1.0 / (d13_1 + d13_2)
+        v1.weight, v3.weight = d13_1 * inv, d13_2 * inv
+        return [v1, v3]
+    if d12_1 <= 0 and d23_2 <= 0:
+        v2.weight = 1.0
+        return [v2]
+    if d13_1 <= 0 and d23_1 <= 0:
+        v3.weight = 1.0
+        return [v3]
+    if d23_1 > 0 and d23_2 > 0 and d123_1 <= 0:
+        inv = 1.0 / (d23_1 + d23_2)
+        v2.weight, v3.weight = d23_1 * inv, d23_2 * inv
+        return [v2, v3]
+    inv = 1.0 / (d123_1 + d123_2 + d123_3)
+    v1.weight, v2.weight, v3.weight = d123_1 * inv, d123_2 * inv, d123_3 * inv
+    return [v1, v2, v3]
+
+
+def _search_direction(simplex):
+    if len(simplex) == 1:
+        return -simplex[0].wx, -simplex[0].wy
+    v1, v2 = simplex
+    ex, ey = v2.wx - v1.wx, v2.wy - v1.wy
+    # Perpendicular al segmento hacia el lado del origen
+    if ex * -v1.wy - ey * -v1.wx > 0:
+        return -ey, ex
+    return ey, -ex
+
+
+def _closest_points(simplex):
+    ax = sum(v.weight * v.ax for v in simplex)
+    ay = sum(v.weight * v.ay for v in simplex)
+    bx = sum(v.weight * v.bx for v in simplex)
+    by = sum(v.weight * v.by for v in simplex)
+    return (ax, ay), (bx, by)
+
+
+def gjk(a, b, cache=None):
+    """Distancia entre los polígonos convexos `a` y `b`.
+
+    Devuelve (distancia, punto de A, punto de B, símplice); distancia 0 si se
+    solapan. Con `cache` (un SimplexCache por par) arranca desde el símplice
+    y los soportes del frame anterior y los actualiza al terminar.
+    """
+    if cache is None:
+        cache = SimplexCache()
+    n_a, n_b = len(a), len(b)
+    simplex = [_Vertex(a, b, ia, ib) for ia, ib in cache.indices if ia < n_a and ib < n_b]
+    if not simplex:
+        simplex = [_Vertex(a, b, cache.support_a % n_a, cache.support_b % n_b)]
+
+    iterations = 0
+    overlap = False
+    while iterations < MAX_GJK_ITERATIONS:
+        # Índices antes de reducir el símplice, para detectar que no avanza
+        saved = [(v.ia, v.ib) for v in simplex]
+        if len(simplex) == 2:
+            simplex = _solve2(simplex)
+        elif len(simplex) == 3:
+            simplex = _solve3(simplex)
+            if len(simplex) == 3:
+                overlap = True
+                break
+
+        dx, dy = _search_direction(simplex)
+        if dx * dx + dy * dy < EPSILON * EPSILON:
+            # El origen está sobre el símplice: se tocan
+            overlap = True
+            break
+
+        # Soporte de B - A en d = soporte de B en d menos soporte de A en -d
+        cache.support_a = _support(a, -dx, -dy, cache.support_a)
+        cache.support_b = _support(b, dx, dy, cache.support_b)
+        iterations += 1
+        if (cache.support_a, cache.support_b) in saved:
+            break  # Ningún punto nuevo: convergió
+        simplex.append(_Vertex(a, b, cache.support_a, cache.support_b))
+
+    cache.iterations = iterations
+    cache.indices = [(v.ia, v.ib) for v in simplex]
+    point_a, point_b = _closest_points(simplex)
+    if overlap:
+        return 0.0, point_a, point_b, simplex
+    distance = math.hypot(point_b[0] - point_a[0], point_b[1] - point_a[1])
+    return distance, point_a, point_b, simplex
+
+
+def _is_convex(u, v, w):
+    return (v.wx - u.wx) * (w.wy - v.wy) - (v.wy - u.wy) * (w.wx - v.wx) > EPSILON
+
+
+def _remove_reflex(polytope, k):
+    """Quita los vecinos del vértice recién insertado en `k` que dejan de
+    estar en la envolvente (el símplice de GJK puede empezar con puntos
+    interiores de la diferencia de Minkowski)"""
+    while len(polytope) > 3:
+        prev = (k - 1) % len(polytope)
+        if _is_convex(polytope[prev - 1], polytope[prev], polytope[k]):
+            break
+        del polytope[prev]
+        k = (k - 1) % len(polytope) if prev < k else k
+    while len(polytope) > 3:
+        nxt = (k + 1) % len(polytope)
+        if _is_convex(polytope[k], polytope[nxt], polytope[(nxt + 1) % len(polytope)]):
+            break
+        del polytope[nxt]
+        if nxt < k:
+            k -= 1
+
+
+def epa(a, b, simplex, cache=None):
+    """Profundidad de penetración a partir del símplice final de GJK.
+
+    Devuelve (normal de A hacia B, profundidad, punto de A, punto de B).
+    """
+    start_a = cache.support_a if cache is not None else 0
+    start_b = cache.support_b if cache is not None else 0
+
+    def support(dx, dy):
+        ia = _support(a, -dx, -dy, start_a)
+        ib = _support(b, dx, dy, start_b)
+        return _Vertex(a, b, ia, ib)
+
+    polytope = list(simplex)
+    # Completar hasta un triángulo si GJK acabó con los polígonos tocándose
+    if len(polytope) == 1:
+        polytope.append(support(1.0, 0.0))
+        if (polytope[1].wx, polytope[1].wy) == (polytope[0].wx, polytope[0].wy):
+            polytope[1] = support(-1.0, 0.0)
+    if len(polytope) == 2:
+        v1, v2 = polytope
+        ex, ey = v2.wx - v1.wx, v2.wy - v1.wy
+        for dx, dy in ((-ey, ex), (ey, -ex)):
+            v3 = support(dx, dy)
+            if abs(ex * (v3.wy - v1.wy) - ey * (v3.wx - v1.wx)) > EPSILON:
+                polytope.append(v3)
+                break
+        else:
+            # Diferencia de Minkowski degenerada (segmentos): contacto rasante
+            length = math.hypot(ex, ey) or 1.0
+            return (ey / length, -ex / length), 0.0, *_closest_points([v1])
+
+    # Orientación antihoraria para que (ey, -ex) sea la normal exterior
+    v1, v2, v3 = polytope
+    if (v2.wx - v1.wx) * (v3.wy - v1.wy) - (v2.wy - v1.wy) * (v3.wx - v1.wx) < 0:
+        polytope = [v1, v3, v2]
+
+    for _ in range(MAX_EPA_ITERATIONS):
+        # Arista más cercana al origen
+        best, best_distance, best_normal = 0, math.inf, (0.0, 0.0)
+        for i, p in enumerate(polytope):
+            q = polytope[(i + 1) % len(polytope)]
+            ex, ey = q.wx - p.wx, q.wy - p.wy
+            length = math.hypot(ex, ey)
+            if length < EPSILON:
+                continue
+            nx, ny = ey / length, -ex / length
+            distance = nx * p.wx + ny * p.wy
+            if distance < best_distance:
+                best, best_distance, best_normal = i, distance, (nx, ny)
+
+        nx, ny = best_normal
+        vertex = support(nx, ny)
+        if nx * vertex.wx + ny * vertex.wy - best_distance < EPA_TOLERANCE:
+            break
+        polytope.insert(best + 1, vertex)
+        _remove_reflex(polytope, best + 1)
+
+    # Punto de la arista más cercana que proyecta el origen
+    p, q = polytope[best], polytope[(best + 1) % len(polytope)]
+    ex, ey = q.wx - p.wx, q.wy - p.wy
+    length2 = ex * ex + ey * ey
+    t = min(max(-(p.wx * ex + p.wy * ey) / length2, 0.0), 1.0) if length2 > 0 else 0.0
+    p.weight, q.weight = 1.0 - t, t
+    point_a, point_b = _closest_points([p, q])
+    # La arista está en B - A: mover A por +n * d los separa, así que de A hacia B es -n
+    return (-nx, -ny), max(best_distance, 0.0), point_a, point_b
+
+
+def _best_edge(vertices, dx, dy):
+    """Arista de `vertices` más perpendicular a (dx, dy) que contiene su soporte"""
+    n = len(vertices)
+    i = _support(vertices, dx, dy, 0)
+    v, nxt, prv = vertices[i], vertices[(i + 1) % n], vertices[i - 1]
+
+    def slope(p, q):
+        ex, ey = q[0] - p[0], q[1] - p[1]
+        length = math.hypot(ex, ey) or 1.0
+        return abs(ex * dx + ey * dy) / length
+
+    if slope(prv, v) <= slope(v, nxt):
+        return v, prv, v
+    return v, v, nxt
+
+
+def _clip(points, nx, ny, offset):
+    """Recorta un segmento conservando los puntos con n·p >= offset"""
+    (p1, p2) = points
+    d1 = nx * p1[0] + ny * p1[1] - offset
+    d2 = nx * p2[0] + ny * p2[1] - offset
+    out = [p for p, d in ((p1, d1), (p2, d2)) if d >= 0]
+    if d1 * d2 < 0:
+        u = d1 / (d1 - d2)
+        out.append((p1[0] + u * (p2[0] - p1[0]), p1[1] + u * (p2[1] - p1[1])))
+    return out
+
+
+def manifold(a, b, normal):
+    """Puntos de contacto (1 o 2) de dos polígonos que se solapan.
+
+    Recorta la arista "incidente" contra los lados de la arista de
+    "referencia" (la más perpendicular a `normal`, de A hacia B). Devuelve
+    una lista de (punto, profundidad).
+    """
+    nx, ny = normal
+    edge_a = _best_edge(a, nx, ny)
+    edge_b = _best_edge(b, -nx, -ny)
+
+    def alignment(edge):
+        _, (x1, y1), (x2, y2) = edge
+        length = math.hypot(x2 - x1, y2 - y1) or 1.0
+        return abs((x2 - x1) * nx + (y2 - y1) * ny) / length
+
+    if alignment(edge_a) <= alignment(edge_b):
+        reference, incident, (fx, fy) = edge_a, edge_b, (nx, ny)
+    else:
+        reference, incident, (fx, fy) = edge_b, edge_a, (-nx, -ny)
+
+    top, r1, r2 = reference
+    ex, ey = r2[0] - r1[0], r2[1] - r1[1]
+    length = math.hypot(ex, ey)
+    if length < EPSILON:
+        return [(top, 0.0)]
+    ex, ey = ex / length, ey / length
+
+    points = _clip(incident[1:], ex, ey, ex * r1[0] + ey * r1[1])
+    if len(points) < 2:
+        return [(incident[0], 0.0)]
+    points = _clip(points, -ex, -ey, -(ex * r2[0] + ey * r2[1]))
+    if len(points) < 2:
+        return [(incident[0], 0.0)]
+
+    # Normal de la cara de referencia orientada hacia el otro polígono
+    face_x, face_y = -ey, ex
+    if face_x * fx + face_y * fy < 0:
+        face_x, face_y = -face_x, -face_y
+    face = face_x * top[0] + face_y * top[1]
+    result = []
+    for p in points:
+        depth = face - (face_x * p[0] + face_y * p[1])
+        if depth >= 0:
+            result.append((p, depth))
+    return result or [(incident[0], 0.0)]
+
+
+def contact(a, b, cache=None):
+    """GJK + EPA entre dos polígonos convexos (arrays o listas de vértices)"""
+    if hasattr(a, 'tolist'):
+        a = a.tolist()
+    if hasattr(b, 'tolist'):
+        b = b.tolist()
+    distance, point_a, point_b, simplex = gjk(a, b, cache)
+    if distance > EPSILON:
+        normal = ((point_b[0] - point_a[0]) / distance, (point_b[1] - point_a[1]) / distance)
+        return Contact(False, normal, 0.0, distance, point_a, point_b)
+    normal, depth, point_a, point_b = epa(a, b, simplex, cache)
+    return Contact(True, normal, depth, 0.0, point_a, point_b, manifold(a, b, normal))
+
+
+def intersects(a, b, cache=None):
+    """Solo la prueba de intersección (GJK sin EPA)"""
+    if hasattr(a, 'tolist'):
+        a = a.tolist()
+    if hasattr(b, 'tolist'):
+        b = b.tolist()
+    return gjk(a, b, cache)[0] <= EPSILON
+
+
+if __name__ == "__main__":
+    # GJK frente a SAT (Polygon.check_collision) al crecer el número de vértices
+    import time
+
+    import numpy as np
+
+    from shapes import Polygon
+
+    def regular(center, radius, sides, angle=0.0):
+        t = np.radians(angle) + np.arange(sides) * (2 * np.pi / sides)
+        return np.asarray(center) + radius * np.stack([np.cos(t), np.sin(t)], axis=1)
+
+    frames = 200
+    print("vértices  SAT (ms/par)  GJK frío  GJK con caché")
+    for sides in (4, 8, 16, 32, 64, 128):
+        a = Polygon((0.0, 0.0), regular((0, 0), 50, sides))
+        b = Polygon((90.0, 10.0), regular((90, 10), 50, sides, 7))
+        poses = [(90 - 0.2 * f, 10.0, 0.5 * f) for f in range(frames)]
+
+        timings = []
+        for method in ("sat", "gjk", "gjk-cache"):
+            cache = SimplexCache()
+            hits = []
+            start = time.perf_counter()
+            for x, y, angle in poses:
+                b.center, b.rotation = (x, y), angle
+                if method == "sat":
+                    hits.append(a.check_collision(b))
+                else:
+                    hits.append(intersects(a.vertices, b.vertices, cache if method == "gjk-cache" else None))
+            timings.append((time.perf_counter() - start) / frames * 1000)
+            if method == "sat":
+                expected = hits
+            assert hits == expected, method
+        print(f"{sides:8d}  {timings[0]:12.3f}  {timings[1]:8.3f}  {timings[2]:13.3f}")
+
+    # Profundidad de EPA frente al MTV de SAT
+    from sat import sat_batch
+
+    a = regular((0, 0), 50, 12)
+    b = regular((80, 5), 40, 9, 3)
+    result = contact(a, b)
+    _, mtv = sat_batch(a[None], [12], b[None], [9], return_mtv=True)
+    print(f"EPA: profundidad {result.depth:.6f}, SAT: {np.hypot(*mtv[0]):.6f}, "
+          f"{len(result.points)} puntos de contacto")
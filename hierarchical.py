@@ -0,0 +1,433 @@
+import heapq
+
+import numpy as np
+
+from pathfinding import GridAStar, manhattan
+
+# Entradas más largas que esto se representan con dos transiciones (extremos)
+MAX_SINGLE_ENTRANCE = 6
+
+# Clusters por lote en el BFS vectorizado (acota la memoria temporal)
+CLUSTER_BATCH = 256
+
+
+def _runs(mask):
+    """Tramos (inicio, fin) consecutivos de valores True"""
+    runs = []
+    start = None
+    for k, value in enumerate(mask):
+        if value and start is None:
+            start = k
+        elif not value and start is not None:
+            runs.append((start, k - 1))
+            start = None
+    if start is not None:
+        runs.append((start, len(mask) - 1))
+    return runs
+
+
+def _cluster_distances(blocks, owner, sources, targets):
+    """BFS simultáneo dentro de muchos clusters, con cada fila como máscara de bits.
+
+    `blocks` es (B, h, w) con las casillas transitables de cada cluster (w <= 64),
+    `owner` (S,) el cluster de cada origen, `sources` (S, 2) las posiciones
+    locales de origen y `targets` (S, T, 2) las posiciones cuya distancia
+    interesa (-1 = hueco). Devuelve (S, T) distancias, -1 si inalcanzable.
+    """
+    h, w = blocks.shape[1:]
+    bits = np.uint64(1) << np.arange(w, dtype=np.uint64)
+    free = (blocks.astype(np.uint64) * bits).sum(axis=2, dtype=np.uint64)[owner]
+
+    count = len(sources)
+    frontier = np.zeros((count, h), dtype=np.uint64)
+    frontier[np.arange(count), sources[:, 0]] = np.uint64(1) << sources[:, 1].astype(np.uint64)
+    visited = frontier.copy()
+
+    valid = targets[..., 0] >= 0
+    target_row = np.where(valid, targets[..., 0], 0)
+    target_bit = np.uint64(1) << np.where(valid, targets[..., 1], 0).astype(np.uint64)
+    dist = np.full(targets.shape[:2], -1, dtype=np.int32)
+
+    # Índices de las búsquedas que siguen activas (se compactan cada pocos pasos)
+    active = np.arange(count)
+    d = 0
+    while True:
+        rows = np.arange(len(active))[:, None]
+        hit = (dist[active] < 0) & valid[active] & ((frontier[rows, target_row[active]] & target_bit[active]) != 0)
+        if hit.any():
+            found = dist[active]
+            found[hit] = d
+            dist[active] = found
+
+        d += 1
+        grown = frontier | (frontier << np.uint64(1)) | (frontier >> np.uint64(1))
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        frontier = grown & free[active] & ~visited
+        visited |= frontier
+
+        if d % 8 == 0:
+            pending = ((dist[active] < 0) & valid[active]).any(axis=1) & frontier.any(axis=1)
+            if not pending.all():
+                active, frontier, visited = active[pending], frontier[pending], visited[pending]
+        if not frontier.any():
+            return dist
+
+
+class HierarchicalPathfinder:
+    """HPA*: búsqueda jerárquica sobre clusters de la cuadrícula (4 direcciones).
+
+    El mapa se divide en clusters de `cluster_size` casillas de lado. En cada
+    borde entre clusters vecinos se colocan transiciones (pares de casillas
+    enfrentadas) y dentro de cada cluster se precalculan las distancias entre
+    sus entradas. Las consultas buscan primero en ese grafo abstracto y solo
+    después refinan, con A* sobre la cuadrícula, los tramos del camino elegido.
+
+    `set_passable` marca los clusters afectados; la abstracción se reconstruye
+    solo para ellos en la siguiente consulta (o al llamar a `update`).
+    """
+
+    def __init__(self, passable, cluster_size=32):
+        if not 1 < cluster_size <= 64:
+            raise ValueError("cluster_size debe estar entre 2 y 64")
+        self.passable = np.array(passable, dtype=bool)
+        self.rows, self.cols = self.passable.shape
+        self.cluster_size = cluster_size
+        self.cluster_rows = -(-self.rows // cluster_size)
+        self.cluster_cols = -(-self.cols // cluster_size)
+        self.grid = GridAStar(self.passable)
+
+        # Grafo abstracto: nodo (i, j) -> {vecino: coste}
+        self.edges = {}
+        # Nodos de cada cluster y bordes que sostienen a cada nodo
+        self.cluster_nodes = {}
+        self.node_borders = {}
+        # Transiciones por borde: (cluster, eje) -> [(celda_a, celda_b), ...]
+        self.transitions = {}
+        self.dirty = set()
+
+        # Estadística de la última consulta (nodos abstractos expandidos)
+        self.expanded = 0
+
+        clusters = [(ci, cj) for ci in range(self.cluster_rows) for cj in range(self.cluster_cols)]
+        self._rebuild(clusters)
+
+    # --- Clusters ---
+    def cluster_of(self, pos):
+        return (pos[0] // self.cluster_size, pos[1] // self.cluster_size)
+
+    def _cluster_bounds(self, cluster):
+        cs = self.cluster_size
+        i0, j0 = cluster[0] * cs, cluster[1] * cs
+        return i0, min(i0 + cs, self.rows), j0, min(j0 + cs, self.cols)
+
+    def _borders_of(self, cluster):
+        """Bordes (cluster, eje) que tocan a `cluster`; eje 0 = abajo, 1 = derecha"""
+        ci, cj = cluster
+        borders = []
+        if ci + 1 < self.cluster_rows:
+            borders.append(((ci, cj), 0))
+        if ci > 0:
+            borders.append(((ci - 1, cj), 0))
+        if cj + 1 < self.cluster_cols:
+            borders.append(((ci, cj), 1))
+        if cj > 0:
+            borders.append(((ci, cj - 1), 1))
+        return borders
+
+    # --- Construcción de la abstracción ---
+    def _border_transitions(self, border):
+        """Calcula los pares de casillas de transición de un borde"""
+        (ci, cj), axis = border
+        i0, i1, j0, j1 = self._cluster_bounds((ci, cj))
+        if axis == 0:
+            a, b = i1 - 1, i1
+            open_cells = self.passable[a, j0:j1] & self.passable[b, j0:j1]
+            cell = lambda k: ((a, j0 + k), (b, j0 + k))
+        else:
+            a, b = j1 - 1, j1
+            open_cells = self.passable[i0:i1, a] & self.passable[i0:i1, b]
+            cell = lambda k: ((i0 + k, a), (i0 + k, b))
+
+        pairs = []
+        for first, last in _runs(open_cells):
+            if last - first + 1 < MAX_SINGLE_ENTRANCE:
+                pairs.append(cell((first + last) // 2))
+            else:
+                pairs.append(cell(first))
+                pairs.append(cell(last))
+        return pairs
+
+    def _add_node(self, node, border):
+        if node not in self.edges:
+            self.edges[node] = {}
+            self.cluster_nodes.setdefault(self.cluster_of(node), set()).add(node)
+        self.node_borders.setdefault(node, set()).add(border)
+
+    def _drop_node_border(self, node, border):
+        borders = self.node_borders[node]
+        borders.discard(border)
+        if borders:
+            return
+        del self.node_borders[node]
+        for neighbor in self.edges.pop(node):
+            self.edges[neighbor].pop(node, None)
+        self.cluster_nodes[self.cluster_of(node)].discard(node)
+
+    def _rebuild(self, clusters):
+        """Recalcula entradas y distancias internas alrededor de `clusters`"""
+        borders = set()
+        for cluster in clusters:
+            borders.update(self._borders_of(cluster))
+
+        # 1. Transiciones de los bordes afectados (y aristas entre clusters)
+        for border in borders:
+            for a, b in self.transitions.pop(border, ()):
+                self._drop_node_border(a, border)
+                self._drop_node_border(b, border)
+            pairs = self._border_transitions(border)
+            self.transitions[border] = pairs
+            for a, b in pairs:
+                self._add_node(a, border)
+                self._add_node(b, border)
+                self.edges[a][b] = 1
+                self.edges[b][a] = 1
+
+        # 2. Distancias internas de todos los clusters que tocan esos bordes
+        touched = set(clusters)
+        for (ci, cj), axis in borders:
+            touched.add((ci, cj))
+            touched.add((ci + 1, cj) if axis == 0 else (ci, cj + 1))
+        touched = sorted(touched)
+        for k in range(0, len(touched), CLUSTER_BATCH):
+            self._link_clusters(touched[k:k + CLUSTER_BATCH])
+
+    def _link_clusters(self, clusters):
+        """Aristas internas (distancias BFS entre entradas) de un lote de clusters"""
+        cs = self.cluster_size
+        nodes = [sorted(self.cluster_nodes.get(c, ())) for c in clusters]
+        # Quitar aristas internas antiguas
+        for cluster, members in zip(clusters, nodes):
+            for node in members:
+                adjacency = self.edges[node]
+                for other in [n for n in adjacency if self.cluster_of(n) == cluster]:
+                    del adjacency[other]
+
+        width = max((len(m) for m in nodes), default=0)
+        if width < 2:
+            return
+        blocks = np.zeros((len(clusters), cs, cs), dtype=bool)
+        owner, sources, targets = [], [], []
+        for k, (cluster, members) in enumerate(zip(clusters, nodes)):
+            i0, i1, j0, j1 = self._cluster_bounds(cluster)
+            blocks[k, :i1 - i0, :j1 - j0] = self.passable[i0:i1, j0:j1]
+            local = [(i - i0, j - j0) for i, j in members]
+            padded = local + [(-1, -1)] * (width - len(local))
+            for source in local:
+                owner.append(k)
+                sources.append(source)
+                targets.append(padded)
+
+        dist = _cluster_distances(blocks, np.array(owner), np.array(sources), np.array(targets))
+        row = 0
+        for members in nodes:
+            for e, a in enumerate(members):
+                for f in range(e + 1, len(members)):
+                    d = int(dist[row, f])
+                    if d > 0:
+                        b = members[f]
+                        self.edges[a][b] = d
+                        self.edges[b][a] = d
+                row += 1
+
+    # --- Cambios en el mapa ---
+    def set_passable(self, pos, value):
+        """Cambia una casilla y marca para reconstruir los clusters afectados"""
+        self.passable[pos[0], pos[1]] = bool(value)
+        self.grid.set_passable(pos, value)
+        cluster = self.cluster_of(pos)
+        self.dirty.add(cluster)
+        # Una casilla de borde también altera las entradas del cluster vecino
+        i, j = pos
+        cs = self.cluster_size
+        for ni, nj in ((i - 1, j), (i + 1, j), (i, j - 1), (i, j + 1)):
+            if 0 <= ni < self.rows and 0 <= nj < self.cols and (ni // cs, nj // cs) != cluster:
+                self.dirty.add((ni // cs, nj // cs))
+
+    def update(self):
+        """Aplica de forma incremental los cambios pendientes"""
+        if self.dirty:
+            dirty, self.dirty = self.dirty, set()
+            self._rebuild(dirty)
+
+    # --- Consultas ---
+    def _local_links(self, pos, extra=None):
+        """Distancias dentro de su cluster desde `pos` a las entradas (y a `extra`)"""
+        cluster = self.cluster_of(pos)
+        i0, i1, j0, j1 = self._cluster_bounds(cluster)
+        cs = self.cluster_size
+        block = np.zeros((1, cs, cs), dtype=bool)
+        block[0, :i1 - i0, :j1 - j0] = self.passable[i0:i1, j0:j1]
+        nodes = list(self.cluster_nodes.get(cluster, ()))
+        if extra is not None:
+            nodes.append(extra)
+        if not nodes:
+            return {}
+        targets = np.array([[(i - i0, j - j0) for i, j in nodes]])
+        dist = _cluster_distances(block, np.zeros(1, dtype=np.int64),
+                                  np.array([(pos[0] - i0, pos[1] - j0)]), targets)[0]
+        return {node: int(d) for node, d in zip(nodes, dist) if d >= 0}
+
+    def find_abstract_path(self, start, goal):
+        """Camino en el grafo abstracto: lista de nodos de `start` a `goal`"""
+        self.update()
+        self.expanded = 0
+        if not (self.grid.is_passable(start) and self.grid.is_passable(goal)):
+            return None
+        start, goal = tuple(start), tuple(goal)
+        if start == goal:
+            return [start]
+
+        # Conexiones temporales de start/goal con las entradas de su cluster;
+        # si comparten cluster, también el camino directo entre ambos
+        same_cluster = self.cluster_of(start) == self.cluster_of(goal)
+        start_links = self._local_links(start, goal if same_cluster else None)
+        goal_links = self._local_links(goal)
+
+        g = {start: 0}
+        parent = {start: None}
+        closed = set()
+        edges, heappush, heappop = self.edges, heapq.heappush, heapq.heappop
+        ti, tj = goal
+        heap = [(manhattan(start, goal), 0, start)]
+        expanded = 0
+        while heap:
+            _, gc, node = heappop(heap)
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+            if node == goal:
+                self.expanded = expanded
+                path = []
+                while node is not None:
+                    path.append(node)
+                    node = parent[node]
+                return path[::-1]
+
+            links = [edges.get(node, {}).items()]
+            if node == start:
+                links.append(start_links.items())
+            if node in goal_links:
+                links.append(((goal, goal_links[node]),))
+            for neighbors in links:
+                for neighbor, cost in neighbors:
+                    ng = gc + cost
+                    if ng < g.get(neighbor, ng + 1) and neighbor not in closed:
+                        g[neighbor] = ng
+                        parent[neighbor] = node
+                        ni, nj = neighbor
+                        heappush(heap, (ng + abs(ni - ti) + abs(nj - tj), ng, neighbor))
+        self.expanded = expanded
+        return None
+
+    def refine(self, abstract_path):
+        """Genera las casillas del camino refinando cada tramo solo al pedirlo.
+
+        Lanza ValueError si un tramo ya no tiene camino en la cuadrícula (un
+        camino abstracto calculado antes de un `set_passable` sin `update`):
+        saltárselo dejaría un hueco que atraviesa paredes.
+        """
+        for a, b in zip(abstract_path, abstract_path[1:]):
+            segment = self.grid.find_path(a, b)
+            if segment is None:
+                raise ValueError(f"Tramo sin camino de {a} a {b}: la abstracción está desactualizada")
+            yield from segment
+
+    def find_path(self, start, goal):
+        """Camino sin incluir `start`, como iterador de casillas; None si no hay camino.
+
+        Solo se hace al momento la búsqueda abstracta (tras actualizar la
+        abstracción); cada tramo se refina con A* cuando el iterador llega a
+        él, así que el primer paso cuesta un tramo y no el camino entero. Si
+        el mapa cambia mientras se recorre, un tramo sin camino lanza
+        ValueError (ver `refine`): hay que volver a pedir el camino.
+        """
+        abstract = self.find_abstract_path(start, goal)
+        if abstract is None:
+            return None
+        return self.refine(abstract)
+
+
+if __name__ == "__main__":
+    # Consultas largas en un mapa Perlin de 2048x2048: tiempo hasta el primer
+    # paso (búsqueda abstracta + primer tramo) frente a A* sobre la
+    # cuadrícula, y validez de los caminos antes y después de cambiar el mapa
+    import time
+
+    from connectivity import label_components
+    from world_chunks import WATER_LEVEL, generate_map
+
+    size, queries = 2048, 20
+    passable = generate_map(size, size, seed=7) >= WATER_LEVEL
+    start = time.perf_counter()
+    finder = HierarchicalPathfinder(passable)
+    build_time = time.perf_counter() - start
+    nodes = len(finder.edges)
+
+    labels, _ = label_components(passable)
+    sizes = np.bincount(labels.ravel())
+    sizes[0] = 0
+    free = np.argwhere(labels == sizes.argmax())
+    rng = np.random.default_rng(0)
+    pairs = []
+    while len(pairs) < queries:
+        a, b = (tuple(map(int, free[k])) for k in rng.integers(len(free), size=2))
+        if manhattan(a, b) > size // 2:
+            pairs.append((a, b))
+
+    def check(a, b, path):
+        """Casillas contiguas y transitables de `a` a `b`"""
+        previous = a
+        for cell in path:
+            assert manhattan(previous, cell) == 1 and finder.passable[cell], (previous, cell)
+            previous = cell
+        assert previous == b
+
+    first_times, full_times = [], []
+    for a, b in pairs:
+        start = time.perf_counter()
+        path = finder.find_path(a, b)
+        first = next(path)
+        first_times.append(time.perf_counter() - start)
+        rest = list(path)
+        full_times.append(time.perf_counter() - start)
+        check(a, b, [first] + rest)
+
+    # A* sobre la cuadrícula (óptimo) en unas pocas consultas, para comparar
+    grid = GridAStar(passable)
+    optimal, hpa, grid_times = 0, 0, []
+    for a, b in pairs[:5]:
+        start = time.perf_counter()
+        optimal += len(grid.find_path(a, b))
+        grid_times.append(time.perf_counter() - start)
+        hpa += len(list(finder.find_path(a, b)))
+
+    # Un muro que corta el mapa por la mitad (con un hueco): la abstracción se
+    # actualiza solo en los clusters tocados y los caminos siguen siendo válidos
+    for col in range(size - 1):
+        finder.set_passable((size // 2, col), False)
+    start = time.perf_counter()
+    finder.update()
+    update_time = time.perf_counter() - start
+    for a, b in pairs[:5]:
+        path = finder.find_path(a, b)
+        if path is not None:
+            check(a, b, path)
+
+    print(f"{size}x{size}: abstracción en {build_time:.2f} s ({nodes} nodos), "
+          f"muro de {size - 1} casillas actualizado en {update_time:.2f} s")
+    print(f"{queries} consultas (Manhattan > {size // 2}): primer paso {np.median(first_times) * 1000:.1f} ms "
+          f"(mediana; objetivo: < 1 ms), camino entero {np.median(full_times) * 1000:.1f} ms, "
+          f"A* en la cuadrícula {np.median(grid_times) * 1000:.0f} ms; "
+          f"caminos un {100 * (hpa / optimal - 1):.1f}% más largos que el óptimo")
@@ -1,8 +1,18 @@
 import pygame
-import noise
 import numpy as np
-import heapq  
 import random  # Importar la librería para posiciones aleatorias
+import time
+from collections import deque
+
+from ccd import sweep_grid
+from connectivity import Connectivity
+from dstar_lite import DStarLite
+from pathfinding import CostField, FlowField
+from planner_service import PlannerService
+from profiler import PROFILER
+from shapes import AABB
+from world_chunks import ChunkedWorld
+from world_snapshot import derive_tables, open_snapshot
 
 # Configuración del mapa
 WIDTH, HEIGHT = 800, 600
@@ -17,166 +27,475 @@ MOUNTAIN = (139, 69, 19)
 PLAYER_COLOR = (255, 0, 0)
 ENEMY_COLOR = (255, 255, 0)
 
-# Generar el mapa con Perlin Noise
-def generate_map(scale=20.0):
-    world = np.zeros((MAP_WIDTH, MAP_HEIGHT))
-    for x in range(MAP_WIDTH):
-        for y in range(MAP_HEIGHT):
-            nx, ny = x / scale, y / scale
-            value = noise.pnoise2(nx, ny, octaves=6, persistence=0.5, lacunarity=2.0)
-            world[x][y] = value
-    return world
-
-# Algoritmo A* para encontrar el mejor camino
-def a_star(start, goal, map_data):
-    def heuristic(a, b):
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])  
-
-    open_set = []
-    heapq.heappush(open_set, (0, start))
-    came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
-
-    while open_set:
-        _, current = heapq.heappop(open_set)
-
-        if current == goal:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            return path[::-1]  
-
-        neighbors = [(0, -1), (0, 1), (-1, 0), (1, 0)]
-        for dx, dy in neighbors:
-            neighbor = (current[0] + dx, current[1] + dy)
-
-            if 0 <= neighbor[0] < MAP_WIDTH and 0 <= neighbor[1] < MAP_HEIGHT:
-                if map_data[neighbor[0]][neighbor[1]] < -0.1:
-                    continue
-
-                tentative_g_score = g_score[current] + 1
-
-                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-
-    return []
+# Modo de persecución:
+# - "flow": un campo de flujo compartido por todos los enemigos (una
+#   búsqueda por tick)
+# - "weighted": como "flow", pero con el coste del terreno (las montañas
+#   cuestan más que el llano; Dijkstra con cola de cubetas)
+# - "dstar": un planificador incremental (D* Lite) por enemigo que repara
+#   su búsqueda cuando el jugador se mueve
+# - "pool": A* en un pool de procesos (planner_service); el bucle no espera
+#   a ninguna búsqueda y cada enemigo sigue su camino viejo hasta tener el nuevo
+PLANNER = "flow"
+PLANNERS = ("flow", "weighted", "dstar", "pool")
+
+# Casillas que avanza el jugador por tick (puede ser más de 1: el movimiento
+# se resuelve con un barrido continuo y no atraviesa el agua)
+PLAYER_SPEED = 1
+
+# Directorio donde se guardan los chunks y las instantáneas ya generados
+WORLD_STORE_DIR = ".world_cache"
+# Parámetros del terreno del mundo
+WORLD_SCALE = 20.0
+WORLD_OCTAVES = 6
+
+# Enemigos por partida
+NUM_ENEMIES = 5  # Cambia este número para más enemigos
 
 # Clase del Jugador
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, blocked):
         self.x = x
         self.y = y
+        self.blocked = blocked  # blocked(x, y): casilla sólida para el movimiento
 
     def move(self, dx, dy):
-        new_x = self.x + dx
-        new_y = self.y + dy
-
-        if 0 <= new_x < MAP_WIDTH and 0 <= new_y < MAP_HEIGHT:
-            if map_data[new_x][new_y] >= -0.1:
-                self.x = new_x
-                self.y = new_y
+        # Avanzar hasta el primer obstáculo del barrido, aunque el paso
+        # cruce varias casillas
+        hit = sweep_grid(AABB(self.x, self.y, 1, 1), (dx, dy), self.blocked)
+        toi = hit[0] if hit else 1.0
+        self.x += round(dx * toi)
+        self.y += round(dy * toi)
 
     def draw(self, screen):
-        pygame.draw.rect(screen, PLAYER_COLOR, (self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+        return pygame.draw.rect(screen, PLAYER_COLOR, (self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
 
 # Clase del Enemigo
 class Enemy:
-    def __init__(self, x, y):
+    def __init__(self, x, y, passable_map, flow_field=None, service=None, components=None):
         self.x = x
         self.y = y
-        self.path = []
+        self.service = None
+        self.request = None
+        self.set_map(passable_map, flow_field, service, components)
+
+    def set_map(self, passable_map, flow_field=None, service=None, components=None):
+        # Mapa de la zona activa y sus planificadores. Se llama también cuando
+        # la zona se desplaza: todo lo planificado sobre la anterior se descarta
+        if self.request is not None:
+            self.service.cancel(self.request)
+        self.passable_map = passable_map
+        # Compartidos por todos los enemigos; sin ninguno de los dos, D* Lite
+        self.flow_field = flow_field
+        self.service = service
+        self.components = components
+        self.planner = None  # Se crea en el primer update
+
+        # Búsqueda asíncrona: petición en curso, desde dónde y hacia dónde se
+        # pidió, y el camino que se sigue mientras tanto
+        self.request = None
+        self.origin = None
+        self.goal = None
+        self.path = deque()
 
     def update(self, player_pos):
-        if not self.path or (self.x, self.y) == self.path[-1]:
-            self.path = a_star((self.x, self.y), player_pos, map_data)
+        if self.service is not None:
+            self._update_async(tuple(player_pos))
+            return
+
+        if self.flow_field is not None:
+            # El campo solo se reconstruye cuando el jugador cambia de casilla
+            if self.flow_field.update(player_pos):
+                PROFILER.count("flow_builds")
+            step = self.flow_field.next_step((self.x, self.y))
+            if step:
+                self.x, self.y = step
+            return
+
+        if self.planner is None:
+            self.planner = DStarLite(self.passable_map, components=self.components)
+        self.planner.plan((self.x, self.y), player_pos)
+        PROFILER.count("expanded", self.planner.expanded)
+        step = self.planner.next_step()
+        if step:
+            self.x, self.y = step
+
+    def _update_async(self, player_pos):
+        # Recoger la búsqueda si ya terminó (sin esperar nunca a que termine)
+        request = self.request
+        if request is not None and request.done():
+            self.request = None
+            if not request.cancelled():
+                path, expanded = request.result()
+                PROFILER.count("expanded", expanded)
+                self._adopt(path)
+
+        # Si el jugador se movió, la petición pendiente ya no sirve: se cancela
+        # si aún no empezó (si ya empezó, se usa su camino al llegar)
+        if self.request is not None and self.goal != player_pos and self.service.cancel(self.request):
+            self.request = None
+        if self.request is None and self.goal != player_pos:
+            self.origin = (self.x, self.y)
+            self.goal = player_pos
+            self.request = self.service.submit(self.origin, player_pos)
 
         if self.path:
-            self.x, self.y = self.path.pop(0)
+            self.x, self.y = self.path.popleft()
+
+    def _adopt(self, path):
+        if path is None:
+            self.path = deque()  # Jugador inalcanzable: quieto hasta que se mueva
+            return
+        # El camino parte de donde estaba el enemigo al pedirlo; mientras tanto
+        # pudo avanzar por el camino viejo
+        position = (self.x, self.y)
+        if position == self.origin:
+            self.path = deque(path)
+        elif position in path:
+            self.path = deque(path[path.index(position) + 1:])
+        else:
+            self.goal = None  # Se salió del camino nuevo: volver a pedirlo
 
     def draw(self, screen):
-        pygame.draw.rect(screen, ENEMY_COLOR, (self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-
-# Inicializar Pygame
-pygame.init()
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("Juego de Supervivencia - Game Over")
-
-# Generar el mapa y las entidades
-map_data = generate_map()
-player = Player(MAP_WIDTH // 2, MAP_HEIGHT // 2)
-
-# Crear múltiples enemigos en posiciones aleatorias
-num_enemies = 5  # Cambia este número para más enemigos
-enemies = []
-
-for _ in range(num_enemies):
-    while True:
-        ex, ey = random.randint(0, MAP_WIDTH - 1), random.randint(0, MAP_HEIGHT - 1)
-        if map_data[ex][ey] >= -0.1 and (ex, ey) != (player.x, player.y):
-            enemies.append(Enemy(ex, ey))
-            break
-
-# Fuente para el mensaje de Game Over
-font = pygame.font.Font(None, 50)
-
-# Función para dibujar el mapa
-def draw_map():
-    for x in range(MAP_WIDTH):
-        for y in range(MAP_HEIGHT):
-            value = map_data[x][y]
-            if value < -0.1:
-                color = WATER
-            elif value < 0.2:
-                color = GRASS
-            else:
-                color = MOUNTAIN
-            pygame.draw.rect(screen, color, (x * TILE_SIZE, y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
-
-# Bucle principal del juego
-running = True
-clock = pygame.time.Clock()
-
-while running:
-    screen.fill((0, 0, 0))
-    draw_map()
-    player.draw(screen)
-    
-    # Dibujar y actualizar todos los enemigos
-    for enemy in enemies:
-        enemy.draw(screen)
-        enemy.update((player.x, player.y))
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-    # Movimiento del jugador
-    keys = pygame.key.get_pressed()
+        return pygame.draw.rect(screen, ENEMY_COLOR, (self.x * TILE_SIZE, self.y * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+
+# Estado de una partida, sin ventana: se puede crear y avanzar desde otros
+# módulos (benchmarks, servidor) sin abrir pygame.
+# El mundo es infinito y se genera por chunks (world_chunks.ChunkedWorld);
+# solo se simula una zona activa de width × height casillas que se desplaza
+# con el jugador. Las posiciones del jugador y los enemigos son relativas a
+# la zona, cuya esquina en el mundo es `origin`
+class Game:
+    # `seed` fija el terreno y la posición de los enemigos (None: el mapa de
+    # referencia y enemigos al azar)
+    def __init__(self, num_enemies=NUM_ENEMIES, seed=None, store_dir=WORLD_STORE_DIR,
+                 width=MAP_WIDTH, height=MAP_HEIGHT, planner=PLANNER, workers=None):
+        if planner not in PLANNERS:
+            raise ValueError(f"Planificador desconocido: {planner}")
+        self.width, self.height = width, height
+        self.planner = planner
+        # Chunks en una caché LRU acotada y, con directorio, también en disco:
+        # la memoria no depende de cuánto mundo se haya recorrido
+        self.world = ChunkedWorld(scale=WORLD_SCALE, octaves=WORLD_OCTAVES, seed=seed,
+                                  store_dir=store_dir)
+        self.origin = (0, 0)
+        self.service = None
+        self.enemies = []
+        # Zona inicial: de la instantánea en disco (memmap, sin regenerar nada;
+        # son las mismas alturas que las de los chunks) o leída de los chunks
+        if store_dir is not None:
+            tables = open_snapshot(store_dir, seed, WORLD_SCALE, WORLD_OCTAVES, width, height).tables
+        else:
+            tables = self.window_tables(self.origin)
+        self.set_window(tables)
+        self.rng = random.Random(seed)
+        self.ticks = 0
+
+        # El jugador empieza en el centro, o en la isla más grande si el
+        # centro es agua o una isla sin sitio para los enemigos
+        self.player = Player(width // 2, height // 2, self.is_blocked)
+        if self.components.component_size((self.player.x, self.player.y)) <= num_enemies:
+            cells = self.components.cells(self.components.largest())
+            if not len(cells):
+                raise ValueError("El mapa no tiene ninguna casilla transitable")
+            self.player.x, self.player.y = map(int, cells[self.rng.randrange(len(cells))])
+
+        # Crear múltiples enemigos en posiciones aleatorias
+        spawns = [self.random_free_tile() for _ in range(num_enemies)]
+        # El pool y la memoria compartida se crean lo último: si algo de lo
+        # anterior falla, no queda nada sin liberar
+        if planner == "pool":
+            self.service = PlannerService(self.passable_map, workers)
+        self.enemies = [Enemy(ex, ey, self.passable_map, self.flow_field, self.service, self.components)
+                        for ex, ey in spawns]
+
+    def window_tables(self, origin):
+        """Tablas de la zona activa con esquina `origin`, leídas de los chunks"""
+        return derive_tables(self.world.region(origin[0], origin[1], self.width, self.height))
+
+    def set_window(self, tables):
+        """Rehace los planificadores y la conectividad con las tablas de la zona"""
+        self.map_data = tables["heights"]
+        self.terrain = tables["terrain"]
+        self.passable_map = tables["passable"]
+        self.flow_field = None
+        if self.planner == "flow":
+            self.flow_field = FlowField(self.passable_map)
+        elif self.planner == "weighted":
+            self.flow_field = CostField(tables["costs"])
+        # Componentes conexas: los enemigos solo aparecen donde pueden llegar
+        # hasta el jugador, y D* Lite descarta al momento las metas aisladas
+        self.components = Connectivity(self.passable_map, tables["components"])
+        if self.service is not None:
+            self.service.load(self.passable_map, tables["components"])
+        for enemy in self.enemies:
+            enemy.set_map(self.passable_map, self.flow_field, self.service, self.components)
+
+    def recenter(self):
+        """Si el jugador se acerca al borde de la zona activa (a menos de un
+        cuarto de su tamaño), la desplaza para que vuelva a quedar en el
+        centro. Devuelve True si la desplazó."""
+        player = self.player
+        margin_x, margin_y = self.width // 4, self.height // 4
+        if margin_x <= player.x < self.width - margin_x and margin_y <= player.y < self.height - margin_y:
+            return False
+        dx, dy = player.x - self.width // 2, player.y - self.height // 2
+        self.origin = (self.origin[0] + dx, self.origin[1] + dy)
+        self.set_window(self.window_tables(self.origin))
+        player.x -= dx
+        player.y -= dy
+        for enemy in self.enemies:
+            enemy.x -= dx
+            enemy.y -= dy
+            # Los que se quedan fuera de la zona nueva reaparecen dentro
+            if not (0 <= enemy.x < self.width and 0 <= enemy.y < self.height):
+                enemy.x, enemy.y = self.random_free_tile()
+        PROFILER.count("window_shifts")
+        return True
+
+    def close(self):
+        """Libera el pool de procesos y la memoria compartida (modo "pool")"""
+        if self.service is not None:
+            self.service.close()
+            self.service = None
+
+    def random_free_tile(self):
+        """Casilla al azar alcanzable desde la del jugador (y distinta de ella).
+
+        Lanza ValueError si la isla del jugador no tiene otra casilla libre
+        (en mapas diminutos incluso la isla más grande puede ser de una).
+        """
+        player = (self.player.x, self.player.y)
+        cells = self.components.cells(self.components.component(player))
+        others = cells[(cells != player).any(axis=1)]
+        if not len(others):
+            raise ValueError(f"No hay casillas libres alcanzables desde {player}")
+        return tuple(map(int, others[self.rng.randrange(len(others))]))
+
+    # Casillas sólidas para el movimiento: el agua, leída del mundo por
+    # chunks. El borde de la zona activa no bloquea: la zona se desplaza con
+    # el jugador
+    def is_blocked(self, x, y):
+        ox, oy = self.origin
+        return not self.world.is_passable(ox + x, oy + y)
+
+    def step(self, moves=()):
+        """Avanza un tick: los enemigos persiguen y el jugador hace `moves`
+        (lista de (dx, dy)). Devuelve True si algún enemigo atrapa al jugador."""
+        player = self.player
+        with PROFILER.phase("enemies"):
+            for enemy in self.enemies:
+                enemy.update((player.x, player.y))
+
+        # Movimiento del jugador
+        with PROFILER.phase("player"):
+            for dx, dy in moves:
+                player.move(dx, dy)
+
+        with PROFILER.phase("chunks"):
+            # Chunks alrededor del jugador y de los enemigos: cuando la zona
+            # se desplace, los que entren ya estarán en la caché
+            ox, oy = self.origin
+            self.world.prefetch([(ox + entity.x, oy + entity.y) for entity in [player, *self.enemies]])
+            self.recenter()
+
+        self.ticks += 1
+        with PROFILER.phase("collision"):
+            return self.caught()
+
+    def caught(self):
+        return any((self.player.x, self.player.y) == (enemy.x, enemy.y) for enemy in self.enemies)
+
+# Clasificar el terreno una sola vez en un array de colores (x, y, rgb)
+def terrain_colors(terrain):
+    palette = np.array([WATER, GRASS, MOUNTAIN], dtype=np.uint8)
+    return palette[terrain]  # Índices TERRAIN_WATER, TERRAIN_GRASS, TERRAIN_MOUNTAIN
+
+# Superficie de fondo con el mapa ya dibujado; el terreno no cambia, así que
+# cada frame solo se restaura el fondo bajo las entidades que se movieron
+def build_background(terrain):
+    tiles = terrain_colors(terrain)
+    tiles = np.repeat(np.repeat(tiles, TILE_SIZE, axis=0), TILE_SIZE, axis=1)
+    terrain = pygame.Surface(tiles.shape[:2])
+    pygame.surfarray.blit_array(terrain, tiles)
+    background = pygame.Surface((WIDTH, HEIGHT))
+    background.fill((0, 0, 0))
+    background.blit(terrain, (0, 0))
+    return background.convert()
+
+# Movimientos del jugador según las teclas pulsadas
+def key_moves(keys):
+    moves = []
     if keys[pygame.K_UP]:
-        player.move(0, -1)
+        moves.append((0, -PLAYER_SPEED))
     if keys[pygame.K_DOWN]:
-        player.move(0, 1)
+        moves.append((0, PLAYER_SPEED))
     if keys[pygame.K_LEFT]:
-        player.move(-1, 0)
+        moves.append((-PLAYER_SPEED, 0))
     if keys[pygame.K_RIGHT]:
-        player.move(1, 0)
+        moves.append((PLAYER_SPEED, 0))
+    return moves
+
+# --- Simulación sin ventana (pruebas de carga) ---
+# Políticas del jugador: devuelven los movimientos de un tick, como key_moves
+DIRECTIONS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
+def random_policy(game, tick):
+    dx, dy = game.rng.choice(DIRECTIONS)
+    return [(dx * PLAYER_SPEED, dy * PLAYER_SPEED)]
 
-    # Verificar colisión con cualquier enemigo (Game Over)
-    for enemy in enemies:
-        if (player.x, player.y) == (enemy.x, enemy.y):
+def scripted_policy(game, tick):
+    # Recorre un cuadrado de 20 casillas de lado (deteniéndose en el agua)
+    dx, dy = [(1, 0), (0, 1), (-1, 0), (0, -1)][tick // 20 % 4]
+    return [(dx * PLAYER_SPEED, dy * PLAYER_SPEED)]
+
+def idle_policy(game, tick):
+    return []
+
+POLICIES = {"random": random_policy, "scripted": scripted_policy, "idle": idle_policy}
+
+def simulate(ticks=1000, num_enemies=NUM_ENEMIES, seed=0, width=MAP_WIDTH, height=MAP_HEIGHT,
+             policy="random", planner=PLANNER, workers=None):
+    """Ejecuta `ticks` ticks sin pygame ni límite de FPS y mide cada uno.
+
+    Cuando atrapan al jugador reaparece en una casilla libre al azar, así
+    que siempre se simulan todos los ticks. Devuelve un diccionario con la
+    configuración, las capturas y los percentiles del tiempo por tick (ms).
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política de jugador desconocida: {policy}")
+    choose = POLICIES[policy]
+    game = Game(num_enemies, seed=seed, store_dir=None, width=width, height=height,
+                planner=planner, workers=workers)
+
+    times = np.empty(ticks)
+    catches = 0
+    try:
+        for tick in range(ticks):
+            moves = choose(game, tick)
+            start = time.perf_counter()
+            caught = game.step(moves)
+            times[tick] = time.perf_counter() - start
+            PROFILER.end_frame()
+            if caught:
+                catches += 1
+                game.player.x, game.player.y = game.random_free_tile()
+    finally:
+        game.close()
+
+    tick_ms = times * 1000
+    p50, p90, p99 = np.percentile(tick_ms, [50, 90, 99])
+    return {
+        "ticks": ticks, "enemies": num_enemies, "width": width, "height": height,
+        "seed": seed, "policy": policy, "planner": planner,
+        "catches": catches, "seconds": float(times.sum()),
+        "ticks_per_sec": ticks / float(times.sum()),
+        "tick_ms": {"mean": float(tick_ms.mean()), "p50": float(p50), "p90": float(p90),
+                    "p99": float(p99), "max": float(tick_ms.max())},
+    }
+
+def main(planner=PLANNER, workers=None):
+    # Inicializar Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("Juego de Supervivencia - Game Over")
+
+    game = Game(planner=planner, workers=workers)
+
+    # Fuente para el mensaje de Game Over y para el overlay del perfilador (F3)
+    font = pygame.font.Font(None, 50)
+    overlay_font = pygame.font.Font(None, 22)
+    background = build_background(game.terrain)
+
+    # Bucle principal del juego
+    running = True
+    clock = pygame.time.Clock()
+
+    screen.blit(background, (0, 0))
+    pygame.display.flip()
+    previous_rects = []  # Zonas ocupadas por las entidades en el frame anterior
+
+    while running:
+        with PROFILER.phase("draw"):
+            # Borrar las entidades del frame anterior restaurando el fondo
+            for rect in previous_rects:
+                screen.blit(background, rect, rect)
+            drawn_rects = [game.player.draw(screen)]
+
+            # Dibujar todos los enemigos (se actualizan en game.step)
+            for enemy in game.enemies:
+                drawn_rects.append(enemy.draw(screen))
+        PROFILER.count("rects", len(previous_rects) + len(drawn_rects))
+
+        with PROFILER.phase("events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    PROFILER.toggle()  # Mostrar/ocultar el overlay (y medir solo mientras se ve)
+
+        # Verificar colisión con cualquier enemigo (Game Over)
+        origin = game.origin
+        if game.step(key_moves(pygame.key.get_pressed())):
             text = font.render("GAME OVER", True, (255, 0, 0))
             screen.blit(text, (WIDTH // 2 - 100, HEIGHT // 2))
             pygame.display.flip()
             pygame.time.delay(2000)  # Esperar 2 segundos antes de salir
             running = False
-            break  # Salir del loop de enemigos
-
-    pygame.display.flip()
-    clock.tick(10)  
 
-pygame.quit()
+        if game.origin != origin:
+            # La zona activa se desplazó: fondo nuevo y pantalla entera
+            background = build_background(game.terrain)
+            screen.blit(background, (0, 0))
+            drawn_rects = [game.player.draw(screen)] + [enemy.draw(screen) for enemy in game.enemies]
+            previous_rects = [screen.get_rect()]
+
+        if PROFILER.enabled:
+            drawn_rects.append(PROFILER.draw(screen, overlay_font))
+
+        # Solo se envían a pantalla las zonas que cambiaron
+        with PROFILER.phase("display"):
+            pygame.display.update(previous_rects + drawn_rects)
+        previous_rects = drawn_rects
+        PROFILER.end_frame()
+        clock.tick(10)
+
+    game.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Juego de supervivencia")
+    parser.add_argument("--headless", action="store_true",
+                        help="simular sin ventana ni límite de FPS y medir el tiempo por tick")
+    parser.add_argument("--ticks", type=int, default=1000)
+    parser.add_argument("--enemies", type=int, default=NUM_ENEMIES)
+    parser.add_argument("--size", default=f"{MAP_WIDTH}x{MAP_HEIGHT}", help="tamaño de la zona activa, ANCHOxALTO")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="random")
+    parser.add_argument("--planner", choices=PLANNERS, default=PLANNER)
+    parser.add_argument("--workers", type=int, help='procesos del planificador "pool" (por defecto, uno por núcleo)')
+    parser.add_argument("-o", "--output", help="fichero JSON para el informe de la simulación")
+    parser.add_argument("--profile", action="store_true", help="empezar con el perfilador activo (F3)")
+    parser.add_argument("--profile-out", help="exportar las fases medidas a .csv o .json (trazas de Chrome) al salir")
+    args = parser.parse_args()
+
+    PROFILER.enabled = args.profile or args.profile_out is not None
+    if not args.headless:
+        main(args.planner, args.workers)
+    else:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        report = simulate(args.ticks, args.enemies, args.seed, width, height, args.policy,
+                          args.planner, args.workers)
+        ms = report["tick_ms"]
+        print(f"{report['ticks']} ticks, {report['enemies']} enemigos, mapa {width}x{height}: "
+              f"{report['ticks_per_sec']:.0f} ticks/s, {report['catches']} capturas")
+        print(f"ms por tick: media {ms['mean']:.3f}  p50 {ms['p50']:.3f}  p90 {ms['p90']:.3f}  "
+              f"p99 {ms['p99']:.3f}  máx {ms['max']:.3f}")
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+    if args.profile_out:
+        PROFILER.export(args.profile_out)
@@ -0,0 +1,363 @@
+import heapq
+import time
+from array import array
+
+import numpy as np
+
+from connectivity import label_components
+from pathfinding import _MAX_GENERATION, WeightedGridAStar
+
+# Heurística ALT (A*, Landmarks, Triangle inequality): se precalculan los
+# campos de distancia a K casillas "marca" y, por la desigualdad triangular,
+# |d(n, L) - d(t, L)| acota por debajo d(n, t). En mapas donde el agua obliga
+# a rodeos largos, Manhattan subestima mucho la distancia real y A* acaba
+# expandiendo casi todo el mapa; la cota de las marcas sí ve los rodeos.
+
+DEFAULT_LANDMARKS = 16
+# Marcas que se usan en cada consulta (las que mejor acotan inicio -> meta)
+ACTIVE_LANDMARKS = 8
+
+
+class LandmarkAStar(WeightedGridAStar):
+    """A* con heurística ALT sobre una cuadrícula de costes (4 vecinos).
+
+    `costs` es como en WeightedGridAStar (0 = bloqueada; un mapa de
+    booleanos sirve como costes unitarios). Las `landmarks` marcas se eligen
+    en la componente más grande, cada una lo más lejos posible de las
+    anteriores, y sus campos de distancia se guardan en `array('H')` (o
+    `'I'` si alguna distancia no cabe en 16 bits), con el mismo relleno que
+    los buffers de la búsqueda para leerlos por id plano de celda.
+
+    `find_path(..., bidirectional=True)` busca a la vez desde la salida y
+    desde la meta, cada lado con su propia cota. En los mapas Perlin
+    expande más que la búsqueda en un sentido (ver el benchmark del
+    módulo), pero sirve como referencia y con K = 0. Las consultas en
+    islas sin marcas usan Manhattan × coste mínimo, como WeightedGridAStar.
+    """
+
+    def __init__(self, costs, landmarks=DEFAULT_LANDMARKS, active=ACTIVE_LANDMARKS, seed=0):
+        super().__init__(np.asarray(costs).astype(np.uint8))
+        self.count = landmarks
+        self.active = active
+        self.rng = np.random.default_rng(seed)
+
+        # Buffers de la búsqueda hacia atrás (bidireccional)
+        self.g_back = array('i', [0]) * self.size
+        self.parent_back = array('i', [-1]) * self.size
+        self.stamp_back = array('I', [0]) * self.size
+        self.closed_back = array('I', [0]) * self.size
+
+        self.landmarks = []
+        self.fields = []
+        self.unreachable = 0
+        self.h_span = 0
+        # Estadística: segundos del último precálculo
+        self.build_time = 0.0
+        self.build_landmarks()
+
+    def _next_generation(self):
+        if self.generation >= _MAX_GENERATION:
+            self.stamp_back = array('I', [0]) * self.size
+            self.closed_back = array('I', [0]) * self.size
+        return WeightedGridAStar._next_generation(self)
+
+    @property
+    def nbytes(self):
+        """Memoria de los campos de distancia de las marcas"""
+        return sum(field.itemsize * len(field) for field in self.fields)
+
+    # --- Precálculo ---
+    def build_landmarks(self):
+        """Elige las marcas (la más lejana a las anteriores) y calcula sus campos"""
+        start = time.perf_counter()
+        grid = np.frombuffer(self.costs, dtype=np.uint8).reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+        labels, count = label_components(grid > 0)
+        self.landmarks, self.fields = [], []
+        # Rango de h para empaquetar (f, h, celda) en un entero
+        self.h_span = self.max_cost * (self.rows + self.cols) + 1
+        if not count or not self.count:
+            self.build_time = time.perf_counter() - start
+            return
+        sizes = np.bincount(labels.ravel())
+        sizes[0] = 0
+        candidates = np.argwhere(labels == sizes.argmax())
+
+        # La primera marca es la más lejana a una casilla al azar
+        pick = tuple(map(int, candidates[self.rng.integers(len(candidates))]))
+        nearest = np.where(labels > 0, self.distance_field(pick), -1)
+        dists = []
+        for _ in range(min(self.count, len(candidates))):
+            flat = int(np.argmax(nearest))
+            pick = divmod(flat, self.cols)
+            if pick in self.landmarks:
+                break  # Componente más pequeña que el número de marcas
+            dist = self.distance_field(pick)
+            self.landmarks.append(pick)
+            dists.append(dist)
+            nearest = dist if len(dists) == 1 else np.minimum(nearest, dist)
+
+        # Campos compactos con el relleno del mapa; `unreachable` marca las
+        # casillas que no llegan a la marca
+        largest = max(int(d.max()) for d in dists)
+        typecode, dtype = ('H', np.uint16) if largest < 0xFFFF else ('I', np.uint32)
+        self.unreachable = int(np.iinfo(dtype).max)
+        # Los campos miden la distancia hacia la marca y los costes no son
+        # simétricos: d(t, L) - d(n, L) + c(t) - c(n) llega a `largest` +
+        # max_cost - min_cost, y h tiene que quedar por debajo de h_span
+        self.h_span = max(self.h_span, largest + self.max_cost)
+        for dist in dists:
+            padded = np.full((self.rows + 2, self.width), self.unreachable, dtype=dtype)
+            padded[1:-1, 1:-1] = np.where(dist < 0, self.unreachable, dist)
+            self.fields.append(array(typecode, padded.tobytes()))
+        self.build_time = time.perf_counter() - start
+
+    def set_cost(self, pos, cost):
+        """Cambia el coste de una casilla y recalcula las marcas"""
+        super().set_cost(pos, cost)
+        self.build_landmarks()
+
+    # --- Cotas ---
+    def _active_landmarks(self, s, t, limit=None):
+        """Campos (campo, d(s, L), d(t, L)) de las `limit` marcas (por defecto,
+        `active`) que mejor acotan d(s, t)"""
+        unreachable, costs = self.unreachable, self.costs
+        scored = []
+        for field in self.fields:
+            fs, ft = field[s], field[t]
+            if fs == unreachable or ft == unreachable:
+                continue
+            bound = max(fs - ft, ft - fs + costs[t] - costs[s])
+            scored.append((bound, field, fs, ft))
+        scored.sort(key=lambda entry: -entry[0])
+        return [(field, fs, ft) for _, field, fs, ft in scored[:limit or self.active]]
+
+    def lower_bound(self, a, b):
+        """Cota inferior de d(a, b) con todas las marcas"""
+        s, t = self.cell(a), self.cell(b)
+        return self._bound(s, t, self._active_landmarks(s, t, len(self.fields)))
+
+    def _bound(self, n, t, active):
+        """Cota de d(n, t): Manhattan × coste mínimo y, por cada marca L,
+        d(n, L) - d(t, L) y d(L, t) - d(L, n). Como se paga el coste al
+        entrar, d(L, x) = d(x, L) + c(x) - c(L)."""
+        width, costs = self.width, self.costs
+        ni, nj = divmod(n, width)
+        ti, tj = divmod(t, width)
+        h = self.min_cost * (abs(ni - ti) + abs(nj - tj))
+        ct, cn = costs[t], costs[n]
+        for field, _, ft in active:
+            fn = field[n]
+            if fn - ft > h:
+                h = fn - ft
+            if ft - fn + ct - cn > h:
+                h = ft - fn + ct - cn
+        return h
+
+    # --- Búsqueda ---
+    def find_path(self, start, goal, bidirectional=False):
+        """Camino de menor coste de `start` a `goal` (sin incluir `start`).
+
+        Deja el coste total en `cost` y los nodos expandidos (de las dos
+        búsquedas, si es bidireccional) en `expanded`. Devuelve [] si
+        start == goal y None si no hay camino.
+        """
+        self.expanded = 0
+        self.cost = None
+        if not (self.is_passable(start) and self.is_passable(goal)):
+            return None
+        s, t = self.cell(start), self.cell(goal)
+        if s == t:
+            self.cost = 0
+            return []
+        active = self._active_landmarks(s, t)
+        if bidirectional:
+            return self._bidirectional(s, t, active)
+        return self._alt_search(s, t, active)
+
+    def _alt_search(self, s, t, active):
+        gen = self._next_generation()
+        costs, g, parent = self.costs, self.g, self.parent
+        stamp, closed, offsets = self.stamp, self.closed, self.offsets
+        size, bound, h_span = self.size, self._bound, self.h_span
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        stamp[s] = gen
+        g[s] = 0
+        parent[s] = -1
+        h = bound(s, t, active)
+        # (f, h, celda) empaquetados como en GridAStar: a igual f, menor h
+        heap = [(h * h_span + h) * size + s]
+        expanded = 0
+
+        while heap:
+            current = heappop(heap) % size
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            expanded += 1
+            if current == t:
+                self.expanded = expanded
+                self.cost = g[t]
+                return self.reconstruct(t, s)
+
+            gc = g[current]
+            for offset in offsets:
+                n = current + offset
+                cost = costs[n]
+                if not cost or closed[n] == gen:
+                    continue
+                ng = gc + cost
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    h = bound(n, t, active)
+                    heappush(heap, ((ng + h) * h_span + h) * size + n)
+
+        self.expanded = expanded
+        return None
+
+    def _bidirectional(self, s, t, active):
+        """A* bidireccional simétrico: hacia delante con la cota de d(n, t) y
+        hacia atrás con la de d(s, n), alternando por el lado con menos
+        abiertos. No se expanden las casillas que ya cerró el otro lado ni se
+        encolan las que no pueden mejorar μ, el mejor camino encontrado al
+        cruzarse; se para cuando la clave mínima del lado que toca alcanza μ.
+        """
+        gen = self._next_generation()
+        costs, offsets, size = self.costs, self.offsets, self.size
+        bound, bound_from = self._bound, self._bound_from
+        sides = (
+            (self.g, self.parent, self.stamp, self.closed),
+            (self.g_back, self.parent_back, self.stamp_back, self.closed_back),
+        )
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        heaps = ([bound(s, t, active) * size + s], [bound_from(s, t, active) * size + t])
+        for side, start in enumerate((s, t)):
+            g, parent, stamp, _ = sides[side]
+            stamp[start] = gen
+            g[start] = 0
+            parent[start] = -1
+
+        best, meet = None, -1
+        expanded = 0
+        while heaps[0] and heaps[1]:
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            g, parent, stamp, closed = sides[side]
+            other_g, _, other_stamp, other_closed = sides[1 - side]
+            heap = heaps[side]
+            if best is not None and heap[0] // size >= best:
+                break
+            current = heappop(heap) % size
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            if other_closed[current] == gen:
+                continue
+            expanded += 1
+
+            gc = g[current]
+            leave = costs[current]
+            for offset in offsets:
+                n = current + offset
+                cost = costs[n]
+                if not cost or closed[n] == gen:
+                    continue
+                # Hacia delante se paga al entrar en n; hacia atrás, al salir
+                # de n hacia `current` (entrar en `current`)
+                ng = gc + (cost if side == 0 else leave)
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    h = bound(n, t, active) if side == 0 else bound_from(s, n, active)
+                    if best is not None and ng + h >= best:
+                        continue
+                    heappush(heap, (ng + h) * size + n)
+                    if other_stamp[n] == gen and (best is None or ng + other_g[n] < best):
+                        best, meet = ng + other_g[n], n
+
+        self.expanded = expanded
+        if best is None:
+            return None
+        self.cost = best
+        path = self.reconstruct(meet, s) if meet != s else []
+        n = self.parent_back[meet]
+        while n != -1:
+            path.append(self.position(n))
+            n = self.parent_back[n]
+        return path
+
+    def _bound_from(self, s, n, active):
+        """Cota de d(s, n), simétrica a `_bound`: d(s, L) - d(n, L) y d(L, n) - d(L, s)"""
+        width, costs = self.width, self.costs
+        ni, nj = divmod(n, width)
+        si, sj = divmod(s, width)
+        h = self.min_cost * (abs(ni - si) + abs(nj - sj))
+        cs, cn = costs[s], costs[n]
+        for field, fs, _ in active:
+            fn = field[n]
+            if fs - fn > h:
+                h = fs - fn
+            if fn - fs + cn - cs > h:
+                h = fn - fs + cn - cs
+        return h
+
+
+if __name__ == "__main__":
+    # Consultas con rodeo (coste real más del doble de la distancia de
+    # Manhattan) en un mapa Perlin: expansiones, tiempo, memoria y precálculo
+    # según K, frente a GridAStar con Manhattan
+    from pathfinding import GridAStar
+    from world_chunks import WATER_LEVEL, generate_map
+
+    size, queries = 512, 20
+    passable = generate_map(size, size, seed=7) >= WATER_LEVEL
+    rng = np.random.default_rng(0)
+    free = np.argwhere(passable)
+
+    # Metas con rodeo a partir del campo de distancias de cada salida
+    reference = WeightedGridAStar(passable.astype(np.uint8))
+    rows, cols = np.indices(passable.shape)
+    detours = []
+    while len(detours) < queries:
+        goal = tuple(map(int, free[rng.integers(len(free))]))
+        dist = reference.distance_field(goal)
+        distance = np.abs(rows - goal[0]) + np.abs(cols - goal[1])
+        candidates = np.argwhere((dist > 2 * distance) & (distance > size // 4))
+        if len(candidates):
+            start = tuple(map(int, candidates[rng.integers(len(candidates))]))
+            detours.append((start, goal, int(dist[start])))
+
+    grid = GridAStar(passable)
+    expanded = 0
+    start = time.perf_counter()
+    for a, b, cost in detours:
+        grid.find_path(a, b)
+        expanded += grid.expanded
+    elapsed = time.perf_counter() - start
+
+    print(f"{queries} consultas con rodeo en {size}x{size}")
+    print(f"{'K':>3} {'modo':>14} {'expandidos':>11} {'reducción':>10} {'ms/consulta':>12} "
+          f"{'memoria':>10} {'precálculo':>11}")
+    print(f"{'-':>3} {'GridAStar':>14} {expanded / queries:>11.0f} {'':>10} {elapsed / queries * 1000:>12.2f}")
+    baseline = expanded
+    for landmarks in (2, 4, 8, 16, 32):
+        finder = LandmarkAStar(passable, landmarks=landmarks)
+        for bidirectional in (False, True):
+            expanded = 0
+            start = time.perf_counter()
+            for a, b, cost in detours:
+                finder.find_path(a, b, bidirectional)
+                assert finder.cost == cost
+                expanded += finder.expanded
+            elapsed = time.perf_counter() - start
+            mode = "bidireccional" if bidirectional else "unidireccional"
+            print(f"{landmarks:>3} {mode:>14} {expanded / queries:>11.0f} {baseline / expanded:>9.1f}x "
+                  f"{elapsed / queries * 1000:>12.2f} {finder.nbytes / 2**10:>8.0f} KiB "
+                  f"{finder.build_time * 1000:>8.0f} ms")
+    # Objetivo: 10x menos expansiones. En este mapa no se alcanza: con K = 16
+    # y 32 la búsqueda en un sentido se queda en unas 4-5x y la bidireccional
+    # en unas 2x
+    print("objetivo: 10x menos expansiones que GridAStar")
@@ -0,0 +1,888 @@
+import heapq
+from array import array
+
+import numpy as np
+
+from connectivity import Connectivity
+
+# Costes de movimiento. Con diagonales se usan enteros (10 recto, 14 diagonal)
+# para que la cola de prioridad siga trabajando solo con enteros.
+STRAIGHT_COST = 1
+OCTILE_STRAIGHT = 10
+OCTILE_DIAGONAL = 14
+
+# Límite del contador de generación antes de limpiar los buffers
+_MAX_GENERATION = 2**32 - 1
+
+
+def manhattan(a, b):
+    """Heurística de Manhattan"""
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def octile(a, b):
+    """Heurística octil (8 direcciones, costes 10/14)"""
+    di, dj = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return OCTILE_STRAIGHT * max(di, dj) + (OCTILE_DIAGONAL - OCTILE_STRAIGHT) * min(di, dj)
+
+
+class GridAStar:
+    """A* sobre una cuadrícula con buffers planos reutilizables.
+
+    `passable` es un array 2D de booleanos; las posiciones son tuplas (i, j)
+    que indexan `passable[i][j]`. El mapa se guarda con un borde de una celda
+    bloqueada para que los vecinos de una celda sean simples desplazamientos
+    sobre el id plano, sin comprobar límites.
+    """
+
+    def __init__(self, passable, diagonal=False):
+        passable = np.asarray(passable, dtype=bool)
+        self.rows, self.cols = passable.shape
+        self.diagonal = diagonal
+        self.width = self.cols + 2
+
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = passable
+        self.passable = bytearray(padded.tobytes())
+        self.size = len(self.passable)
+
+        # Estado de la búsqueda, indexado por id plano de celda.
+        # `stamp[c] == generation` indica que g/parent de `c` son válidos en la
+        # consulta actual, y `closed[c] == generation` que ya se expandió.
+        self.g = array('i', [0]) * self.size
+        self.parent = array('i', [-1]) * self.size
+        self.stamp = array('I', [0]) * self.size
+        self.closed = array('I', [0]) * self.size
+        self.generation = 0
+
+        w = self.width
+        if diagonal:
+            self.steps = ((-w, OCTILE_STRAIGHT), (w, OCTILE_STRAIGHT),
+                          (-1, OCTILE_STRAIGHT), (1, OCTILE_STRAIGHT))
+            self.diagonal_steps = ((-w - 1, -w, -1), (-w + 1, -w, 1),
+                                   (w - 1, w, -1), (w + 1, w, 1))
+        else:
+            self.steps = ((-w, STRAIGHT_COST), (w, STRAIGHT_COST),
+                          (-1, STRAIGHT_COST), (1, STRAIGHT_COST))
+            self.diagonal_steps = ()
+
+        # Rango de h, usado para empaquetar (f, h, celda) en un único entero
+        max_step = OCTILE_DIAGONAL if diagonal else STRAIGHT_COST
+        self.h_span = max_step * (self.rows + self.cols) + 1
+
+        # Tabla JPS+ opcional (ver precompute_jump_table)
+        self.jump_table = None
+        # Componentes conexas opcionales (ver label_components)
+        self.components = None
+        # Traza opcional: si es un array('i'), cada búsqueda añade en orden el
+        # id plano de cada celda que expande (ver search_trace.py)
+        self.trace = None
+
+        # Estadísticas de la última consulta
+        self.expanded = 0
+        self.cost = None
+
+    # --- Conversión de coordenadas ---
+    def cell(self, pos):
+        """Id plano de la celda (i, j)"""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, cell):
+        """Posición (i, j) de un id plano"""
+        i, j = divmod(cell, self.width)
+        return (i - 1, j - 1)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def is_passable(self, pos):
+        return self.in_bounds(pos) and self.passable[self.cell(pos)] == 1
+
+    def set_passable(self, pos, value):
+        """Cambia la transitabilidad de una celda (invalida la tabla JPS+)"""
+        self.passable[self.cell(pos)] = 1 if value else 0
+        self.jump_table = None
+        if self.components is not None:
+            self.components.set_passable(pos, value)
+
+    def label_components(self, components=None):
+        """Etiqueta las componentes conexas para rechazar en O(1) las metas
+        inalcanzables (`components`: un `Connectivity` ya hecho del mismo mapa)"""
+        if components is None:
+            rows = np.frombuffer(self.passable, dtype=np.uint8).reshape(self.rows + 2, self.width)
+            components = Connectivity(rows[1:-1, 1:-1])
+        self.components = components
+        return components
+
+    def heuristic(self, cell, goal):
+        ci, cj = divmod(cell, self.width)
+        gi, gj = divmod(goal, self.width)
+        if self.diagonal:
+            return octile((ci, cj), (gi, gj))
+        return abs(ci - gi) + abs(cj - gj)
+
+    # --- Búsqueda ---
+    def _next_generation(self):
+        """Avanza el contador de generación, invalidando la consulta anterior"""
+        if self.generation >= _MAX_GENERATION:
+            self.stamp = array('I', [0]) * self.size
+            self.closed = array('I', [0]) * self.size
+            self.generation = 0
+        self.generation += 1
+        return self.generation
+
+    def reconstruct(self, cell, start):
+        """Reconstruye el camino desde `start` (excluido) hasta `cell`"""
+        parent = self.parent
+        path = []
+        while cell != start:
+            path.append(self.position(cell))
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    def find_path(self, start, goal, method="astar"):
+        """Devuelve el camino de `start` a `goal` (sin incluir `start`).
+
+        `method` es "astar" (A* clásico) o "jps" (Jump Point Search, que usa la
+        tabla JPS+ si se precalculó con `precompute_jump_table`). Devuelve una
+        lista vacía si start == goal y None si no hay camino.
+        """
+        if method not in ("astar", "jps"):
+            raise ValueError(f"Método de búsqueda desconocido: {method}")
+        self.expanded = 0
+        self.cost = None
+        if not (self.is_passable(start) and self.is_passable(goal)):
+            return None
+        if self.components is not None and not self.components.connected(start, goal):
+            return None  # Islas distintas: no hace falta buscar
+
+        s = self.cell(start)
+        t = self.cell(goal)
+        if s == t:
+            self.cost = 0
+            return []
+
+        if method == "jps":
+            return self._jump_point_search(s, t)
+        return self._astar(s, t)
+
+    def _astar(self, s, t):
+        gen = self._next_generation()
+        passable, g, parent = self.passable, self.g, self.parent
+        stamp, closed = self.stamp, self.closed
+        steps, diagonal_steps = self.steps, self.diagonal_steps
+        width, size, h_span = self.width, self.size, self.h_span
+        diagonal = self.diagonal
+        ti, tj = divmod(t, width)
+        dd = OCTILE_DIAGONAL - OCTILE_STRAIGHT
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        stamp[s] = gen
+        g[s] = 0
+        parent[s] = -1
+        h = self.heuristic(s, t)
+        # Cada entrada del heap es un entero: (f, h, celda) empaquetados.
+        # A igual f se expande primero la de menor h (mayor g).
+        heap = [(h * h_span + h) * size + s]
+        expanded = 0
+        record = self.trace.append if self.trace is not None else None
+
+        while heap:
+            current = heappop(heap) % size
+            if closed[current] == gen:
+                continue  # Entrada obsoleta (borrado perezoso)
+            closed[current] = gen
+            expanded += 1
+            if record is not None:
+                record(current)
+
+            if current == t:
+                self.expanded = expanded
+                self.cost = g[t]
+                return self.reconstruct(t, s)
+
+            gc = g[current]
+            for offset, cost in steps:
+                n = current + offset
+                if not passable[n] or closed[n] == gen:
+                    continue
+                ng = gc + cost
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    ni, nj = divmod(n, width)
+                    di = ni - ti if ni > ti else ti - ni
+                    dj = nj - tj if nj > tj else tj - nj
+                    if diagonal:
+                        h = OCTILE_STRAIGHT * (di if di > dj else dj) + dd * (dj if di > dj else di)
+                    else:
+                        h = di + dj
+                    heappush(heap, ((ng + h) * h_span + h) * size + n)
+
+            # Diagonales: no se permite cortar esquinas
+            for offset, side_a, side_b in diagonal_steps:
+                n = current + offset
+                if (not passable[n] or closed[n] == gen
+                        or not passable[current + side_a] or not passable[current + side_b]):
+                    continue
+                ng = gc + OCTILE_DIAGONAL
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    ni, nj = divmod(n, width)
+                    di = ni - ti if ni > ti else ti - ni
+                    dj = nj - tj if nj > tj else tj - nj
+                    h = OCTILE_STRAIGHT * (di if di > dj else dj) + dd * (dj if di > dj else di)
+                    heappush(heap, ((ng + h) * h_span + h) * size + n)
+
+        self.expanded = expanded
+        return None
+
+    # --- Jump Point Search ---
+    def precompute_jump_table(self):
+        """Precalcula la tabla JPS+ de saltos rectos.
+
+        Para cada celda y cada dirección recta "pura" guarda la distancia al
+        siguiente punto de salto (-1 si no hay) y cuántas celdas libres siguen en
+        esa dirección. En 8 direcciones son las cuatro rectas; en 4 direcciones
+        solo las horizontales, porque el salto vertical también explora ramas.
+        """
+        rows, cols = self.rows + 2, self.cols + 2
+        grid = np.frombuffer(bytes(self.passable), dtype=np.uint8).reshape(rows, cols).astype(bool)
+        w = self.width
+
+        # Cada dirección se lleva al caso "hacia +j" volteando/trasponiendo
+        views = {
+            1: (lambda a: a, lambda a: a),
+            -1: (lambda a: a[:, ::-1], lambda a: a[:, ::-1]),
+        }
+        if self.diagonal:
+            views[w] = (lambda a: a.T, lambda a: a.T)
+            views[-w] = (lambda a: a.T[:, ::-1], lambda a: a[:, ::-1].T)
+
+        table = {}
+        for d, (to_view, from_view) in views.items():
+            jump, run = _ray_table(to_view(grid))
+            table[d] = (_int_array(from_view(jump)), _int_array(from_view(run)))
+        self.jump_table = table
+        return table
+
+    def _jump_straight(self, n, d, p, t):
+        """Salta desde `n` en la dirección recta `d` (perpendicular `p`)"""
+        passable = self.passable
+        table = self.jump_table
+        if table is not None and d in table:
+            jump, run = table[d]
+            limit = jump[n] if jump[n] >= 0 else run[n]
+            if limit < 0:
+                return -1
+            # El objetivo está sobre el rayo antes de la parada
+            k = (t - n) // d
+            if k * d == t - n and 0 <= k <= limit:
+                return t
+            return n + jump[n] * d if jump[n] >= 0 else -1
+
+        # Salto vertical en 4 direcciones: cada celda abre ramas horizontales
+        branches = not self.diagonal and p == 1
+        while True:
+            if not passable[n]:
+                return -1
+            if n == t:
+                return n
+            # Vecino forzado: lateral libre cuyo acceso por detrás está bloqueado
+            if ((passable[n + p] and not passable[n - d + p])
+                    or (passable[n - p] and not passable[n - d - p])):
+                return n
+            if branches and (self._jump_straight(n + 1, 1, self.width, t) >= 0
+                             or self._jump_straight(n - 1, -1, self.width, t) >= 0):
+                return n
+            n += d
+
+    def _jump_diagonal(self, n, dv, dh, t):
+        """Salta en diagonal (dv vertical, dh horizontal) sin cortar esquinas"""
+        passable = self.passable
+        w = self.width
+        while True:
+            if not passable[n]:
+                return -1
+            if n == t:
+                return n
+            if self._jump_straight(n + dh, dh, w, t) >= 0 or self._jump_straight(n + dv, dv, 1, t) >= 0:
+                return n
+            if not (passable[n + dv] and passable[n + dh]):
+                return -1
+            n += dv + dh
+
+    def _pruned_directions(self, c, parent):
+        """Direcciones (dv, dh) a explorar desde `c` según la poda de JPS"""
+        passable = self.passable
+        w = self.width
+        if parent < 0:
+            dirs = [(-w, 0), (w, 0), (0, -1), (0, 1)]
+            if self.diagonal:
+                dirs += [(dv, dh) for dv in (-w, w) for dh in (-1, 1)
+                         if passable[c + dv] and passable[c + dh]]
+            return dirs
+
+        ci, cj = divmod(c, w)
+        pi, pj = divmod(parent, w)
+        dv = w if ci > pi else -w if ci < pi else 0
+        dh = 1 if cj > pj else -1 if cj < pj else 0
+
+        if not self.diagonal:
+            if dh:
+                return [(-w, 0), (w, 0), (0, dh)]
+            return [(0, -1), (0, 1), (dv, 0)]
+
+        dirs = []
+        if dv and dh:
+            if passable[c + dv]:
+                dirs.append((dv, 0))
+            if passable[c + dh]:
+                dirs.append((0, dh))
+            if passable[c + dv] and passable[c + dh]:
+                dirs.append((dv, dh))
+        elif dh:
+            up, down = passable[c - w], passable[c + w]
+            if passable[c + dh]:
+                dirs.append((0, dh))
+                if up:
+                    dirs.append((-w, dh))
+                if down:
+                    dirs.append((w, dh))
+            if up:
+                dirs.append((-w, 0))
+            if down:
+                dirs.append((w, 0))
+        else:
+            left, right = passable[c - 1], passable[c + 1]
+            if passable[c + dv]:
+                dirs.append((dv, 0))
+                if left:
+                    dirs.append((dv, -1))
+                if right:
+                    dirs.append((dv, 1))
+            if left:
+                dirs.append((0, -1))
+            if right:
+                dirs.append((0, 1))
+        return dirs
+
+    def _jump_point_search(self, s, t):
+        gen = self._next_generation()
+        g, parent, stamp, closed = self.g, self.parent, self.stamp, self.closed
+        width, size, h_span = self.width, self.size, self.h_span
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        stamp[s] = gen
+        g[s] = 0
+        parent[s] = -1
+        h = self.heuristic(s, t)
+        heap = [(h * h_span + h) * size + s]
+        expanded = 0
+        record = self.trace.append if self.trace is not None else None
+
+        while heap:
+            current = heappop(heap) % size
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            expanded += 1
+            if record is not None:
+                record(current)
+
+            if current == t:
+                self.expanded = expanded
+                self.cost = g[t]
+                return self._expand_jumps(t, s)
+
+            gc = g[current]
+            ci, cj = divmod(current, width)
+            for dv, dh in self._pruned_directions(current, parent[current]):
+                if dv and dh:
+                    jp = self._jump_diagonal(current + dv + dh, dv, dh, t)
+                elif dh:
+                    jp = self._jump_straight(current + dh, dh, width, t)
+                else:
+                    jp = self._jump_straight(current + dv, dv, 1, t)
+                if jp < 0 or closed[jp] == gen:
+                    continue
+
+                ji, jj = divmod(jp, width)
+                step = (ji - ci if ji > ci else ci - ji, jj - cj if jj > cj else cj - jj)
+                if self.diagonal:
+                    ng = gc + octile(step, (0, 0))
+                else:
+                    ng = gc + step[0] + step[1]
+                if stamp[jp] != gen or ng < g[jp]:
+                    stamp[jp] = gen
+                    g[jp] = ng
+                    parent[jp] = current
+                    h = self.heuristic(jp, t)
+                    heappush(heap, ((ng + h) * h_span + h) * size + jp)
+
+        self.expanded = expanded
+        return None
+
+    def _expand_jumps(self, cell, start):
+        """Reconstruye el camino celda a celda entre puntos de salto"""
+        parent, width = self.parent, self.width
+        path = []
+        while cell != start:
+            prev = parent[cell]
+            ci, cj = divmod(cell, width)
+            pi, pj = divmod(prev, width)
+            di = (ci > pi) - (ci < pi)
+            dj = (cj > pj) - (cj < pj)
+            # Los saltos van en línea recta o diagonal pura
+            while (ci, cj) != (pi, pj):
+                path.append((ci - 1, cj - 1))
+                ci -= di
+                cj -= dj
+            cell = prev
+        path.reverse()
+        return path
+
+
+def a_star(start, end, grid, weighted=False):
+    """Camino de `start` a `end` en un mapa grid[y][x] (1 = obstáculo).
+
+    Con `weighted`, grid[y][x] es el coste de entrar en la casilla (0 =
+    bloqueada, como `world_chunks.terrain_costs`) y se busca el camino más
+    barato con `WeightedGridAStar`. Posiciones (x, y); devuelve la lista de
+    casillas sin incluir `start`, o None si no hay camino.
+    """
+    # grid se indexa como grid[y][x]; el motor usa posiciones (x, y)
+    grid = np.asarray(grid).T
+    if weighted:
+        return WeightedGridAStar(grid).find_path(start, end)
+    return GridAStar(grid != 1).find_path(start, end)
+
+
+def _int_array(values):
+    """Copia un array de NumPy a un array('i') plano (indexado escalar rápido)"""
+    buffer = array('i')
+    buffer.frombytes(np.ascontiguousarray(values, dtype=np.int32).tobytes())
+    return buffer
+
+
+def _ray_table(grid):
+    """Tabla de saltos rectos hacia +j para una cuadrícula con borde bloqueado.
+
+    Devuelve (jump, run): distancia al punto de salto (-1 si no hay) y número de
+    celdas libres que siguen a la celda en esa dirección (-1 si está bloqueada).
+    """
+    rows, cols = grid.shape
+    forced = np.zeros_like(grid)
+    # Vecino forzado: lateral libre cuya celda anterior en la fila está bloqueada
+    forced[1:-1, 1:] = ((grid[2:, 1:] & ~grid[2:, :-1])
+                        | (grid[:-2, 1:] & ~grid[:-2, :-1]))
+
+    jump = np.full((rows, cols), -1, dtype=np.int32)
+    run = np.full((rows, cols), -1, dtype=np.int32)
+    for j in range(cols - 2, 0, -1):
+        free, ahead = grid[:, j], grid[:, j + 1]
+        run[:, j] = np.where(free, np.where(ahead, run[:, j + 1] + 1, 0), -1)
+        chained = np.where(ahead & (jump[:, j + 1] >= 0), jump[:, j + 1] + 1, -1)
+        jump[:, j] = np.where(free, np.where(forced[:, j], 0, chained), -1)
+    return jump, run
+
+
+class FlowField:
+    """Campo de distancias hacia un único objetivo (Dijkstra inverso/BFS).
+
+    Una sola búsqueda en anchura desde el objetivo sobre la máscara de casillas
+    transitables deja, para cada celda, la siguiente celda del camino más corto.
+    Así cualquier número de perseguidores lee su siguiente paso en O(1).
+    """
+
+    def __init__(self, passable):
+        passable = np.asarray(passable, dtype=bool)
+        self.rows, self.cols = passable.shape
+        self.width = self.cols + 2
+
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=bool)
+        padded[1:-1, 1:-1] = passable
+        self.passable = padded.ravel()
+        self.size = self.passable.size
+
+        w = self.width
+        self.offsets = (-w, w, -1, 1)
+        self.dist = np.full(self.size, -1, dtype=np.int32)
+        self.next_cell = np.full(self.size, -1, dtype=np.int32)
+        self.goal = None
+        self.builds = 0
+
+    def cell(self, pos):
+        """Id plano de la celda (i, j)"""
+        return (pos[0] + 1) * self.width + pos[1] + 1
+
+    def position(self, cell):
+        """Posición (i, j) de un id plano"""
+        i, j = divmod(int(cell), self.width)
+        return (i - 1, j - 1)
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def set_passable(self, pos, value):
+        """Cambia la transitabilidad de una celda e invalida el campo"""
+        self.passable[self.cell(pos)] = bool(value)
+        self.goal = None
+
+    def update(self, goal):
+        """Reconstruye el campo solo si el objetivo cambió de casilla"""
+        goal = tuple(goal)
+        if goal == self.goal:
+            return False
+        self.build(goal)
+        return True
+
+    def build(self, goal):
+        """BFS vectorizado por frentes desde `goal`"""
+        self.goal = tuple(goal)
+        self.builds += 1
+        dist, next_cell, passable = self.dist, self.next_cell, self.passable
+        dist.fill(-1)
+        next_cell.fill(-1)
+        if not self.in_bounds(goal):
+            return
+
+        t = self.cell(goal)
+        if not passable[t]:
+            return
+        dist[t] = 0
+        next_cell[t] = t
+
+        frontier = np.array([t], dtype=np.int32)
+        d = 0
+        while frontier.size:
+            d += 1
+            reached = []
+            for offset in self.offsets:
+                candidates = frontier + offset
+                mask = passable[candidates] & (dist[candidates] < 0)
+                candidates = candidates[mask]
+                if candidates.size:
+                    dist[candidates] = d
+                    # Desde la celda nueva se avanza hacia la del frente que la alcanzó
+                    next_cell[candidates] = candidates - offset
+                    reached.append(candidates)
+            frontier = np.concatenate(reached) if reached else frontier[:0]
+
+    def distance(self, pos):
+        """Pasos hasta el objetivo, o -1 si es inalcanzable"""
+        if not self.in_bounds(pos):
+            return -1
+        return int(self.dist[self.cell(pos)])
+
+    def next_step(self, pos):
+        """Siguiente casilla hacia el objetivo, o None si no hay camino"""
+        if not self.in_bounds(pos):
+            return None
+        c = self.cell(pos)
+        n = self.next_cell[c]
+        if n < 0 or n == c:
+            return None
+        return self.position(n)
+
+    def next_steps(self, positions):
+        """Versión vectorizada de `next_step` para un array (N, 2) de posiciones.
+
+        Las posiciones sin camino (o ya en el objetivo) se devuelven sin cambios.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        cells = (positions[:, 0] + 1) * self.width + positions[:, 1] + 1
+        nxt = self.next_cell[cells].astype(np.int64)
+        nxt = np.where(nxt < 0, cells, nxt)
+        i, j = np.divmod(nxt, self.width)
+        return np.stack((i - 1, j - 1), axis=1)
+
+
+class WeightedGridAStar:
+    """A*/Dijkstra sobre una cuadrícula de costes enteros pequeños (4 vecinos).
+
+    `costs` es un array 2D uint8: 0 = bloqueada y 1..255 = coste de entrar en
+    la casilla. Con costes enteros entre m y C, el f de los nodos que se
+    sacan nunca baja y cada nodo nuevo entra como mucho C + m por encima del
+    actual (el coste del paso más lo que puede crecer la heurística,
+    Manhattan × m), así que en vez de un heap basta una cola de cubetas
+    circular de C + m + 1 cubetas (Dial; C + 1 sin heurística): insertar y
+    extraer son O(1). `queue="heap"` usa heapq sobre los mismos datos, como
+    referencia.
+    """
+
+    QUEUES = ("bucket", "heap")
+
+    def __init__(self, costs):
+        costs = np.asarray(costs, dtype=np.uint8)
+        self.rows, self.cols = costs.shape
+        self.width = self.cols + 2
+
+        padded = np.zeros((self.rows + 2, self.cols + 2), dtype=np.uint8)
+        padded[1:-1, 1:-1] = costs
+        self.costs = bytearray(padded.tobytes())
+        self.size = len(self.costs)
+        passable = costs[costs > 0]
+        self.max_cost = int(passable.max()) if passable.size else 1
+        # La heurística (Manhattan × coste mínimo) sigue siendo admisible y consistente
+        self.min_cost = int(passable.min()) if passable.size else 1
+
+        self.g = array('i', [0]) * self.size
+        self.parent = array('i', [-1]) * self.size
+        self.stamp = array('I', [0]) * self.size
+        self.closed = array('I', [0]) * self.size
+        self.generation = 0
+        w = self.width
+        self.offsets = (-w, w, -1, 1)
+
+        # Estadísticas de la última consulta
+        self.expanded = 0
+        self.cost = None
+
+    cell = GridAStar.cell
+    position = GridAStar.position
+    in_bounds = GridAStar.in_bounds
+    reconstruct = GridAStar.reconstruct
+    _next_generation = GridAStar._next_generation
+
+    def is_passable(self, pos):
+        return self.in_bounds(pos) and self.costs[self.cell(pos)] > 0
+
+    def set_cost(self, pos, cost):
+        """Cambia el coste de una casilla (0 = bloqueada)"""
+        cost = int(cost)
+        self.costs[self.cell(pos)] = cost
+        self.max_cost = max(self.max_cost, cost)
+        if cost:
+            self.min_cost = min(self.min_cost, cost)
+
+    def find_path(self, start, goal, queue="bucket"):
+        """Camino de menor coste de `start` a `goal` (sin incluir `start`).
+
+        Deja el coste total en `cost`. Devuelve [] si start == goal y None si
+        no hay camino.
+        """
+        if queue not in self.QUEUES:
+            raise ValueError(f"Cola de prioridad desconocida: {queue}")
+        self.expanded = 0
+        self.cost = None
+        if not (self.is_passable(start) and self.is_passable(goal)):
+            return None
+        s, t = self.cell(start), self.cell(goal)
+        search = self._bucket_search if queue == "bucket" else self._heap_search
+        if not search(s, t, self.min_cost):
+            return None
+        self.cost = self.g[t]
+        return self.reconstruct(t, s)
+
+    def distance_field(self, goal, queue="bucket"):
+        """Coste mínimo desde cada casilla hasta `goal` (Dijkstra), -1 si no llega.
+
+        Los movimientos son simétricos salvo por el coste, que se paga al
+        entrar; la búsqueda sale de `goal` por las aristas invertidas, así que
+        cada valor es el coste de ir de esa casilla a `goal`.
+        """
+        if queue not in self.QUEUES:
+            raise ValueError(f"Cola de prioridad desconocida: {queue}")
+        dist = np.full((self.rows, self.cols), -1, dtype=np.int32)
+        self.expanded = 0
+        if not self.is_passable(goal):
+            return dist
+        t = self.cell(goal)
+        search = self._bucket_search if queue == "bucket" else self._heap_search
+        search(t, -1, 0, reverse=True)
+
+        # Celdas alcanzadas en esta generación
+        padded = np.frombuffer(self.closed, dtype=np.uint32) == self.generation
+        g = np.frombuffer(self.g, dtype=np.int32)
+        reached = padded.reshape(self.rows + 2, self.width)[1:-1, 1:-1]
+        dist[reached] = g.reshape(self.rows + 2, self.width)[1:-1, 1:-1][reached]
+        return dist
+
+    def _bucket_search(self, s, t, h_scale, reverse=False):
+        """Búsqueda con cola de cubetas desde `s`; termina al cerrar `t` (-1: todo).
+
+        Con `reverse` cada arista cuesta lo que la casilla de la que sale
+        (para campos de distancia hacia `s`).
+        """
+        gen = self._next_generation()
+        costs, g, parent = self.costs, self.g, self.parent
+        stamp, closed, offsets = self.stamp, self.closed, self.offsets
+        width = self.width
+        ti, tj = divmod(t, width) if t >= 0 else (0, 0)
+        # Un paso sube f como mucho max_cost + h_scale: el anillo tiene que
+        # abarcar ese salto o las entradas nuevas darían la vuelta
+        nb = self.max_cost + h_scale + 1
+        buckets = [[] for _ in range(nb)]
+
+        stamp[s] = gen
+        g[s] = 0
+        parent[s] = -1
+        f = 0
+        if h_scale:
+            si, sj = divmod(s, width)
+            f = h_scale * (abs(si - ti) + abs(sj - tj))
+        buckets[f % nb].append(s)
+        pending = 1
+        expanded = 0
+
+        while pending:
+            bucket = buckets[f % nb]
+            if not bucket:
+                f += 1
+                continue
+            current = bucket.pop()
+            pending -= 1
+            if closed[current] == gen:
+                continue  # Entrada obsoleta (borrado perezoso)
+            closed[current] = gen
+            expanded += 1
+            if current == t:
+                self.expanded = expanded
+                return True
+
+            gc = g[current]
+            leave = costs[current]
+            for offset in offsets:
+                n = current + offset
+                cost = costs[n]
+                if not cost or closed[n] == gen:
+                    continue
+                ng = gc + (leave if reverse else cost)
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    if h_scale:
+                        ni, nj = divmod(n, width)
+                        di = ni - ti if ni > ti else ti - ni
+                        dj = nj - tj if nj > tj else tj - nj
+                        ng += h_scale * (di + dj)
+                    buckets[ng % nb].append(n)
+                    pending += 1
+
+        self.expanded = expanded
+        return False
+
+    def _heap_search(self, s, t, h_scale, reverse=False):
+        """Igual que `_bucket_search` pero con heapq (f y celda empaquetados en un entero)"""
+        gen = self._next_generation()
+        costs, g, parent = self.costs, self.g, self.parent
+        stamp, closed, offsets = self.stamp, self.closed, self.offsets
+        width, size = self.width, self.size
+        ti, tj = divmod(t, width) if t >= 0 else (0, 0)
+        heappush, heappop = heapq.heappush, heapq.heappop
+
+        stamp[s] = gen
+        g[s] = 0
+        parent[s] = -1
+        f = 0
+        if h_scale:
+            si, sj = divmod(s, width)
+            f = h_scale * (abs(si - ti) + abs(sj - tj))
+        heap = [f * size + s]
+        expanded = 0
+
+        while heap:
+            current = heappop(heap) % size
+            if closed[current] == gen:
+                continue
+            closed[current] = gen
+            expanded += 1
+            if current == t:
+                self.expanded = expanded
+                return True
+
+            gc = g[current]
+            leave = costs[current]
+            for offset in offsets:
+                n = current + offset
+                cost = costs[n]
+                if not cost or closed[n] == gen:
+                    continue
+                ng = gc + (leave if reverse else cost)
+                if stamp[n] != gen or ng < g[n]:
+                    stamp[n] = gen
+                    g[n] = ng
+                    parent[n] = current
+                    if h_scale:
+                        ni, nj = divmod(n, width)
+                        di = ni - ti if ni > ti else ti - ni
+                        dj = nj - tj if nj > tj else tj - nj
+                        ng += h_scale * (di + dj)
+                    heappush(heap, ng * size + n)
+
+        self.expanded = expanded
+        return False
+
+
+class CostField:
+    """Campo de flujo sobre costes de terreno: como FlowField, pero cada
+    enemigo baja por el campo de distancias ponderadas (Dijkstra con cola de
+    cubetas) hacia el objetivo, así que rodea las montañas si le compensa."""
+
+    def __init__(self, costs):
+        self.search = WeightedGridAStar(costs)
+        self.rows, self.cols = self.search.rows, self.search.cols
+        self.dist = None
+        self.goal = None
+        self.builds = 0
+
+    def in_bounds(self, pos):
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def update(self, goal):
+        """Recalcula el campo solo si el objetivo cambió de casilla"""
+        goal = tuple(goal)
+        if goal == self.goal:
+            return False
+        self.build(goal)
+        return True
+
+    def build(self, goal):
+        self.goal = tuple(goal)
+        self.builds += 1
+        self.dist = self.search.distance_field(self.goal)
+
+    def distance(self, pos):
+        """Coste hasta el objetivo, o -1 si es inalcanzable"""
+        if self.dist is None or not self.in_bounds(pos):
+            return -1
+        return int(self.dist[pos])
+
+    def next_step(self, pos):
+        """Vecino por el que baja el coste hasta el objetivo, o None"""
+        d = self.distance(pos)
+        if d <= 0:
+            return None
+        best, best_d = None, d
+        for di, dj in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            n = (pos[0] + di, pos[1] + dj)
+            nd = self.distance(n)
+            if 0 <= nd < best_d:
+                best, best_d = n, nd
+        return best
+
+
+if __name__ == "__main__":
+    # La cola de cubetas tiene que dar los mismos costes que heapq, también
+    # cuando el coste mínimo es mayor que 1 (la heurística crece más por paso)
+    rng = np.random.default_rng(0)
+    for low in (1, 2, 5):
+        for _ in range(100):
+            n = int(rng.integers(8, 40))
+            costs = rng.integers(low, low + 6, (n, n)).astype(np.uint8)
+            costs[rng.random((n, n)) < 0.2] = 0
+            finder = WeightedGridAStar(costs)
+            free = np.argwhere(costs > 0)
+            start, goal = (tuple(map(int, free[k])) for k in rng.integers(0, len(free), 2))
+            finder.find_path(start, goal, "bucket")
+            bucket_cost = finder.cost
+            finder.find_path(start, goal, "heap")
+            assert bucket_cost == finder.cost, (low, start, goal, bucket_cost, finder.cost)
+            assert (finder.distance_field(goal, "bucket") == finder.distance_field(goal, "heap")).all()
+    print("Cola de cubetas: mismos costes que heapq con costes mínimos 1, 2 y 5")
@@ -1,23 +1,20 @@
-import noise
-import numpy as np
 import matplotlib.pyplot as plt
 
+from terrain import fbm
+
 # Parámetros del mapa de ruido
 width = 100  # Ancho del mapa
 height = 100  # Alto del mapa
 scale = 20.0  # Escala del ruido
 
-# Crear una matriz para almacenar los valores de ruido
-mapa = np.zeros((width, height))
+def main():
+    # Generar Perlin Noise en 2D (fBm vectorizado, mismo resultado que noise.pnoise2)
+    mapa = fbm(width, height, scale, octaves=6, persistence=0.5, lacunarity=2.0)
 
-# Generar Perlin Noise en 2D
-for y in range(height):
-    for x in range(width):
-        nx = x / scale
-        ny = y / scale
-        mapa[x][y] = noise.pnoise2(nx, ny, octaves=6, persistence=0.5, lacunarity=2.0)
+    # Mostrar el mapa generado con colores más variados
+    plt.imshow(mapa, cmap="jet")  #"jet", "viridis", "plasma"
+    plt.colorbar()
+    plt.show()
 
-# Mostrar el mapa generado con colores más variados
-plt.imshow(mapa, cmap="jet")  #"jet", "viridis", "plasma"
-plt.colorbar()
-plt.show()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from connectivity import Connectivity
+from pathfinding import GridAStar
+
+# Servicio de búsqueda de caminos en un pool de procesos. El mapa se publica
+# una sola vez en memoria compartida: cada petición solo envía (inicio, meta)
+# y cada proceso mantiene su propio GridAStar, al que aplica las celdas que
+# cambiaron desde su última búsqueda. Las peticiones devuelven futures, así
+# que el bucle del juego nunca espera a una búsqueda. Las peticiones entre
+# componentes distintas ni siquiera llegan al pool: se resuelven al momento.
+
+# Celdas cambiadas que se recuerdan (anillo en la memoria compartida); un
+# proceso que se queda más atrás reconstruye su GridAStar entero
+CHANGE_LOG = 4096
+
+# Cabecera de la memoria compartida: un int64 con la versión del mapa (el
+# número de cambios) y el anillo de celdas cambiadas (ids planos, int64)
+_HEADER_BYTES = 8 * (1 + CHANGE_LOG)
+
+# Estado de cada proceso del pool (lo crea _init_worker)
+_worker = None
+
+
+def _shared_views(shm, shape):
+    """Vistas (versión, anillo de cambios, mapa) sobre el bloque de memoria compartida"""
+    version = np.ndarray((1,), dtype=np.int64, buffer=shm.buf)
+    log = np.ndarray((CHANGE_LOG,), dtype=np.int64, buffer=shm.buf, offset=8)
+    grid = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=_HEADER_BYTES)
+    return version, log, grid
+
+
+def _init_worker(name, shape, diagonal):
+    global _worker
+    shm = shared_memory.SharedMemory(name=name)
+    version, log, grid = _shared_views(shm, shape)
+    _worker = {"shm": shm, "version": version, "log": log, "grid": grid, "diagonal": diagonal,
+               "seen": None, "finder": None}
+
+
+def _sync(worker):
+    """Pone al día el GridAStar del proceso con el mapa compartido.
+
+    Solo se aplican las celdas del anillo desde la última versión vista (se
+    leen del mapa, así que repetir una es inocuo). Sin GridAStar, o si el
+    anillo ya se sobrescribió, se reconstruye entero.
+    """
+    version = int(worker["version"][0])
+    seen, finder = worker["seen"], worker["finder"]
+    if seen == version:
+        return
+    grid = worker["grid"]
+    if finder is not None and version - seen <= CHANGE_LOG:
+        log, cols = worker["log"], grid.shape[1]
+        for change in range(seen, version):
+            pos = divmod(int(log[change % CHANGE_LOG]), cols)
+            finder.set_passable(pos, grid[pos])
+        # Si mientras se leía se escribieron más de CHANGE_LOG cambios, parte
+        # del anillo leído ya era de otra vuelta
+        if int(worker["version"][0]) - seen <= CHANGE_LOG:
+            worker["seen"] = version
+            return
+        version = int(worker["version"][0])
+    worker["finder"] = GridAStar(grid != 0, diagonal=worker["diagonal"])
+    worker["seen"] = version
+
+
+def _find_path(start, goal, method):
+    """Tarea del pool: (camino, nodos expandidos) sobre el mapa compartido"""
+    worker = _worker
+    _sync(worker)
+    finder = worker["finder"]
+    path = finder.find_path(start, goal, method)
+    return path, finder.expanded
+
+
+class PlannerService:
+    """Pool de `workers` procesos (por defecto, uno por núcleo) que resuelve
+    búsquedas A* sobre `passable` sin bloquear al que las pide.
+
+    `submit` devuelve un `concurrent.futures.Future` con (camino, expandidos);
+    el camino es el de `GridAStar.find_path`. `Future.cancel()` descarta una
+    petición que aún no empezó (p. ej. porque el objetivo ya se movió).
+    Si inicio y meta están en componentes distintas, el future ya viene
+    resuelto con (None, 0).
+    """
+
+    def __init__(self, passable, workers=None, diagonal=False, method="astar"):
+        passable = np.asarray(passable, dtype=bool)
+        self.shape = passable.shape
+        self.method = method
+        self.workers = workers or os.cpu_count() or 1
+
+        self.shm = shared_memory.SharedMemory(create=True, size=_HEADER_BYTES + passable.size)
+        self.version, self.log, self.grid = _shared_views(self.shm, self.shape)
+        self.grid[:] = passable
+        self.version[0] = 0
+        # Componentes en este proceso (sin cortar esquinas, las diagonales no
+        # unen nada que los 4 vecinos no unan ya)
+        self.components = Connectivity(passable)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                        initargs=(self.shm.name, self.shape, diagonal))
+
+        # Estadísticas
+        self.submitted = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def submit(self, start, goal):
+        self.submitted += 1
+        start, goal = tuple(start), tuple(goal)
+        if start != goal and not self.components.connected(start, goal):
+            self.rejected += 1
+            future = Future()
+            future.set_result((None, 0))
+            return future
+        return self.pool.submit(_find_path, start, goal, self.method)
+
+    def cancel(self, future):
+        """Cancela `future` si aún no empezó; devuelve si se canceló"""
+        if future.cancel():
+            self.cancelled += 1
+            return True
+        return False
+
+    def set_passable(self, pos, value):
+        """Cambia una celda del mapa compartido (los procesos lo ven en su próxima búsqueda)"""
+        self.grid[pos] = 1 if value else 0
+        # La celda se anota antes de publicar la versión nueva
+        self.log[self.version[0] % CHANGE_LOG] = pos[0] * self.shape[1] + pos[1]
+        self.version[0] += 1
+        self.components.set_passable(pos, value)
+
+    def load(self, passable, labels=None):
+        """Sustituye el mapa entero por otro de la misma forma (p. ej. al
+        desplazarse la zona activa del juego). `labels` son las de
+        `label_components`, si ya se tienen.
+
+        Las peticiones en curso pueden terminar sobre el mapa viejo.
+        """
+        passable = np.asarray(passable, dtype=bool)
+        if passable.shape != self.shape:
+            raise ValueError(f"El mapa es {passable.shape} y el servicio es {self.shape}")
+        self.grid[:] = passable
+        # Un salto de más de CHANGE_LOG versiones hace que cada proceso
+        # reconstruya su GridAStar en vez de leer el anillo
+        self.version[0] += CHANGE_LOG + 1
+        self.components = Connectivity(passable, labels)
+
+    def close(self):
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        # Soltar las vistas antes de cerrar el bloque compartido
+        self.version = self.log = self.grid = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+if __name__ == "__main__":
+    # Búsquedas en el hilo principal frente al pool: tiempo total y tiempo
+    # que el que pide pasa bloqueado
+    import time
+
+    from world_chunks import WATER_LEVEL, generate_map
+
+    size, searches = 512, 64
+    passable = generate_map(size, size, seed=1) >= WATER_LEVEL
+    rng = np.random.default_rng(0)
+    free = np.argwhere(passable)
+    requests = [(tuple(map(int, a)), tuple(map(int, b)))
+                for a, b in free[rng.integers(0, len(free), (searches, 2))]]
+
+    finder = GridAStar(passable)
+    start = time.perf_counter()
+    expected = [finder.find_path(a, b) for a, b in requests]
+    serial = time.perf_counter() - start
+
+    with PlannerService(passable) as service:
+        service.submit(*requests[0]).result()  # Arrancar los procesos
+        start = time.perf_counter()
+        futures = [service.submit(a, b) for a, b in requests]
+        blocked = time.perf_counter() - start
+        paths = [f.result()[0] for f in futures]
+        pooled = time.perf_counter() - start
+
+        # Un muro que parte el mapa: los procesos aplican solo las celdas
+        # anotadas y deben dar los mismos caminos que un GridAStar nuevo
+        for col in range(size - 1):
+            service.set_passable((size // 2, col), False)
+        changed = [f.result()[0] for f in [service.submit(a, b) for a, b in requests]]
+        updated = GridAStar(service.grid != 0)
+        expected_changed = [updated.find_path(a, b) for a, b in requests]
+
+    lengths = lambda found: [len(p) if p is not None else -1 for p in found]
+    assert lengths(paths) == lengths(expected)
+    assert lengths(changed) == lengths(expected_changed) != lengths(expected)
+    print(f"{searches} búsquedas en {size}x{size}: en serie {serial:.2f} s, "
+          f"pool de {service.workers} procesos {pooled:.2f} s ({serial / pooled:.1f}x), "
+          f"bloqueado al enviar {blocked * 1000:.1f} ms")
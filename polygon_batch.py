@@ -0,0 +1,208 @@
+import math
+
+import numpy as np
+import pygame
+
+from sat import edge_normals, pad_polygons, sat_pairs
+
+# Tabla de seno/coseno con ANGLE_STEPS pasos por vuelta. Los giros del juego
+# son de grados enteros, así que casi nunca hace falta evaluar sin/cos.
+ANGLE_STEPS = 3600
+_TABLE_RADIANS = np.radians(np.arange(ANGLE_STEPS) * (360 / ANGLE_STEPS))
+_SIN_TABLE = np.sin(_TABLE_RADIANS)
+_COS_TABLE = np.cos(_TABLE_RADIANS)
+
+
+def sin_cos(angles):
+    """(sin, cos) de ángulos en grados, desde la tabla si caen en ella"""
+    if np.ndim(angles) == 0:
+        # Un solo ángulo (shapes.Polygon): sin pasar por arrays
+        steps = float(angles) * (ANGLE_STEPS / 360)
+        if steps.is_integer():
+            index = int(steps) % ANGLE_STEPS
+            return float(_SIN_TABLE[index]), float(_COS_TABLE[index])
+        rad = math.radians(angles)
+        return math.sin(rad), math.cos(rad)
+    angles = np.asarray(angles, dtype=np.float64)
+    steps = angles * (ANGLE_STEPS / 360)
+    index = np.rint(steps)
+    if np.all(index == steps):
+        index = index.astype(np.int64) % ANGLE_STEPS
+        return _SIN_TABLE[index], _COS_TABLE[index]
+    rad = np.radians(angles)
+    return np.sin(rad), np.cos(rad)
+
+
+def rotation_matrices(angles):
+    """Matrices de rotación antihoraria (..., 2, 2) para ángulos en grados"""
+    sin_a, cos_a = sin_cos(angles)
+    return np.stack([np.stack([cos_a, -sin_a], axis=-1),
+                     np.stack([sin_a, cos_a], axis=-1)], axis=-2)
+
+
+def rotate_points(points, angle, center):
+    """Rota un array de puntos (K, 2) `angle` grados en torno a `center`"""
+    center = np.asarray(center, dtype=np.float64)
+    return (np.asarray(points, dtype=np.float64) - center) @ rotation_matrices(angle).T + center
+
+
+def _transform(local, local_normals, positions, angles, world, normals, bounds):
+    """Pasa un bloque de polígonos de espacio local al mundo escribiendo en
+    `world`, `normals` y `bounds` (rotar no cambia la longitud de las normales)"""
+    sin_a, cos_a = sin_cos(angles)
+    # world = local @ R^T, con R^T = [[cos, sin], [-sin, cos]]
+    rotation = np.empty((len(angles), 2, 2))
+    rotation[:, 0, 0] = cos_a
+    rotation[:, 0, 1] = sin_a
+    rotation[:, 1, 0] = -sin_a
+    rotation[:, 1, 1] = cos_a
+    np.matmul(local, rotation, out=world)
+    world += positions[:, None, :]
+    np.matmul(local_normals, rotation, out=normals)
+
+    # El relleno repite un vértice real, así que no altera el min/max.
+    # Un vértice por iteración: reducir sobre el eje corto K es mucho más lento
+    low, high = bounds[:, :2], bounds[:, 2:]
+    low[:] = high[:] = world[:, 0]
+    for v in range(1, world.shape[1]):
+        np.minimum(low, world[:, v], out=low)
+        np.maximum(high, world[:, v], out=high)
+
+
+class PolygonBatch:
+    """Conjunto de N polígonos guardado como estructura de arrays.
+
+    - `local`: vértices en espacio local (N, K, 2), con relleno repitiendo el
+      primer vértice en los polígonos de menos de K vértices (`counts`), y
+      `local_normals`: sus normales unitarias, calculadas una sola vez.
+    - `positions` (N, 2) y `angles` (N,) en grados: la transformación de cada uno.
+    - `world` (N, K, 2), `normals` (N, K, 2) y `bounds` (N, 4): vértices,
+      normales y AABBs (min_x, min_y, max_x, max_y) en el mundo.
+
+    `move` y `rotate` solo marcan los cuerpos en `dirty`; `update` recalcula
+    únicamente esos (con un matmul por lotes) y deja los estáticos como están.
+    Si se modifican `positions` o `angles` directamente hay que llamar a
+    `invalidate`.
+    """
+
+    def __init__(self, local_vertices, positions=None, angles=None):
+        self.local, self.counts = pad_polygons([np.asarray(v, dtype=np.float64) for v in local_vertices])
+        self.local_normals, self.normal_valid = edge_normals(self.local, self.counts)
+        n = len(self.local)
+        self.positions = np.zeros((n, 2)) if positions is None else np.array(positions, dtype=np.float64)
+        self.angles = np.zeros(n) if angles is None else np.array(angles, dtype=np.float64)
+
+        self.world = np.empty_like(self.local)
+        self.normals = np.empty_like(self.local)
+        self.bounds = np.empty((n, 4))
+        self.dirty = np.ones(n, dtype=bool)
+        self.updated = 0  # Cuerpos recalculados en el último `update`
+        self.update()
+
+    @classmethod
+    def from_polygons(cls, polygons):
+        """Lote a partir de `shapes.Polygon`"""
+        return cls([p.local for p in polygons],
+                   positions=[p.center for p in polygons],
+                   angles=[p.rotation for p in polygons])
+
+    def __len__(self):
+        return len(self.local)
+
+    # --- Transformaciones (de todos los cuerpos o de un subconjunto) ---
+    def move(self, delta, index=slice(None)):
+        """Desplaza los cuerpos `index` por `delta` ((2,) o uno por cuerpo)"""
+        self.positions[index] += delta
+        self.dirty[index] = True
+
+    def rotate(self, angle, index=slice(None)):
+        """Rota los cuerpos `index` `angle` grados en sentido antihorario"""
+        self.angles[index] += angle
+        self.dirty[index] = True
+
+    def invalidate(self, index=slice(None)):
+        """Marca cuerpos cuya transformación se cambió a mano"""
+        self.dirty[index] = True
+
+    def update(self):
+        """Recalcula `world`, `normals` y `bounds` de los cuerpos modificados"""
+        changed = np.flatnonzero(self.dirty)
+        self.updated = len(changed)
+        if self.updated == len(self):
+            # Todos: directamente sobre los buffers
+            _transform(self.local, self.local_normals, self.positions, self.angles,
+                       self.world, self.normals, self.bounds)
+        elif self.updated:
+            world = np.empty((len(changed),) + self.local.shape[1:])
+            normals = np.empty_like(world)
+            bounds = np.empty((len(changed), 4))
+            _transform(self.local[changed], self.local_normals[changed], self.positions[changed],
+                       self.angles[changed], world, normals, bounds)
+            self.world[changed] = world
+            self.normals[changed] = normals
+            self.bounds[changed] = bounds
+        self.dirty[:] = False
+        return self.bounds
+
+    # --- Consultas ---
+    def vertices(self, i):
+        """Vértices en el mundo del cuerpo `i` (sin relleno)"""
+        return self.world[i, :self.counts[i]]
+
+    def collisions(self, broad_phase, return_mtv=False):
+        """Pares que colisionan según la fase amplia dada y el SAT por lotes.
+
+        Usa `world` y `bounds` tal como quedaron en el último `update`.
+        """
+        pairs = broad_phase.pairs(self.bounds)
+        normals = (self.normals, self.normal_valid)
+        if not return_mtv:
+            return pairs[sat_pairs(self.world, self.counts, pairs, normals=normals)]
+        hits, mtv = sat_pairs(self.world, self.counts, pairs, return_mtv=True, normals=normals)
+        return pairs[hits], mtv[hits]
+
+    def draw(self, screen, color):
+        for i in range(len(self)):
+            pygame.draw.polygon(screen, color, self.vertices(i), 2)
+
+
+if __name__ == "__main__":
+    # Comparación con transformar shapes.Polygon uno a uno
+    import time
+
+    from shapes import Polygon
+
+    rng = np.random.default_rng(0)
+    count, frames = 10_000, 30
+    quad = np.array([[-10.0, -10.0], [10.0, -10.0], [12.0, 10.0], [-8.0, 10.0]])
+    centers = rng.random((count, 2)) * 1000
+    polygons = [Polygon(c, quad + c) for c in centers]
+    batch = PolygonBatch([quad] * count, positions=centers)
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        for polygon in polygons:
+            polygon.move(1.0, 0.5)
+            polygon.rotate(3)
+            polygon.bounds()
+    loop_time = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        batch.move((1.0, 0.5))
+        batch.rotate(3)
+        batch.update()
+    batch_time = (time.perf_counter() - start) / frames
+
+    error = max(np.abs(batch.vertices(i) - p.vertices).max() for i, p in enumerate(polygons))
+    print(f"Error máximo: {error:.1e}; Polygon: {loop_time * 1000:.1f} ms/frame, "
+          f"PolygonBatch: {batch_time * 1000:.2f} ms/frame ({loop_time / batch_time:.0f}x)")
+
+    # Escena casi estática: solo se mueve el 1% de los cuerpos
+    moving = rng.choice(count, count // 100, replace=False)
+    start = time.perf_counter()
+    for _ in range(frames):
+        batch.move((1.0, 0.5), moving)
+        batch.update()
+    static_time = (time.perf_counter() - start) / frames
+    print(f"1% en movimiento: {static_time * 1000:.2f} ms/frame ({batch.updated} cuerpos recalculados)")
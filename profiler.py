@@ -0,0 +1,225 @@
+import csv
+import json
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+# Perfilador por fases de frame: temporizadores con nombre (`with
+# PROFILER.phase("update"):`) y contadores (`PROFILER.count("expanded", n)`).
+# Desactivado, `phase` devuelve siempre el mismo contexto vacío y `count`
+# retorna enseguida, así que la instrumentación puede quedarse en el código.
+
+# Frames que entran en los percentiles móviles del overlay
+WINDOW = 120
+# Fases individuales guardadas para exportar (las más antiguas se descartan)
+MAX_EVENTS = 200_000
+
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+class _NullPhase:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+class Profiler:
+    """Tiempos por fase y contadores por frame.
+
+    Cada `end_frame` cierra el frame: suma el tiempo de cada fase (una fase
+    puede abrirse varias veces por frame) y los contadores, y los añade a
+    ventanas móviles de `window` frames para los percentiles. Las fases
+    individuales se guardan además en `events` para exportarlas a CSV o al
+    formato de trazas de Chrome (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, enabled=False, window=WINDOW, max_events=MAX_EVENTS):
+        self.enabled = enabled
+        self.window = window
+        self.frame = 0
+        self.origin = time.perf_counter_ns()
+        self.history = {}           # fase -> deque de ms por frame
+        self.counter_history = {}   # contador -> deque de valores por frame
+        self.events = deque(maxlen=max_events)    # (frame, fase, inicio_ns, duración_ns)
+        self.counters = deque(maxlen=max_events)  # (frame, fin_ns, {contador: valor})
+        self._times = {}
+        self._counts = {}
+
+    # --- Instrumentación ---
+    def phase(self, name):
+        """Contexto que mide la fase `name` (no hace nada si está desactivado)"""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self._counts[name] = self._counts.get(name, 0) + n
+
+    def _record(self, name, start, end):
+        self._times[name] = self._times.get(name, 0) + (end - start)
+        self.events.append((self.frame, name, start - self.origin, end - start))
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        # Las fases y contadores que no aparecieron en este frame cuentan como 0
+        for name in self._times:
+            if name not in self.history:
+                self.history[name] = deque(maxlen=self.window)
+        for name, values in self.history.items():
+            values.append(self._times.get(name, 0) / 1e6)
+        for name in self._counts:
+            if name not in self.counter_history:
+                self.counter_history[name] = deque(maxlen=self.window)
+        for name, values in self.counter_history.items():
+            values.append(self._counts.get(name, 0))
+
+        if self._counts:
+            self.counters.append((self.frame, time.perf_counter_ns() - self.origin, self._counts))
+        self._times = {}
+        self._counts = {}
+        self.frame += 1
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self._times = {}
+        self._counts = {}
+        return self.enabled
+
+    def reset(self):
+        self.frame = 0
+        self.origin = time.perf_counter_ns()
+        self.history.clear()
+        self.counter_history.clear()
+        self.events.clear()
+        self.counters.clear()
+        self._times = {}
+        self._counts = {}
+
+    # --- Consultas ---
+    def summary(self):
+        """Lista de (nombre, p50, p99) de fases (ms) y contadores en la ventana"""
+        rows = []
+        for history in (self.history, self.counter_history):
+            for name, values in history.items():
+                p50, p99 = np.percentile(values, [50, 99]) if values else (0.0, 0.0)
+                rows.append((name, float(p50), float(p99)))
+        return rows
+
+    def draw(self, screen, font, position=(10, 10)):
+        """Overlay con p50/p99 de cada fase; devuelve el rectángulo dibujado"""
+        rows = [("fase", "p50", "p99")]
+        phases = len(self.history)
+        for i, (name, p50, p99) in enumerate(self.summary()):
+            if i < phases:
+                rows.append((name, f"{p50:.2f} ms", f"{p99:.2f} ms"))
+            else:
+                rows.append((name, f"{p50:.0f}", f"{p99:.0f}"))
+        cells = [[font.render(text, True, OVERLAY_COLOR) for text in row] for row in rows]
+
+        # Columnas alineadas (la fuente no tiene por qué ser monoespaciada)
+        widths = [max(row[c].get_width() for row in cells) + 12 for c in range(3)]
+        line = max(cell.get_height() for row in cells for cell in row)
+        rect = pygame.Rect(position, (sum(widths) + 8, line * len(cells) + 8))
+        screen.fill(OVERLAY_BACKGROUND, rect)
+        for r, row in enumerate(cells):
+            x = rect.x + 4
+            for c, cell in enumerate(row):
+                # Nombres a la izquierda, números a la derecha
+                offset = 0 if c == 0 else widths[c] - cell.get_width() - 12
+                screen.blit(cell, (x + offset, rect.y + 4 + r * line))
+                x += widths[c]
+        return rect
+
+    # --- Exportación ---
+    def export_csv(self, path):
+        """Una fila por fase medida y por contador: frame, tipo, nombre, inicio, valor"""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "kind", "name", "start_ms", "value"])
+            for frame, name, start, duration in self.events:
+                writer.writerow([frame, "phase", name, f"{start / 1e6:.4f}", f"{duration / 1e6:.4f}"])
+            for frame, end, counts in self.counters:
+                for name, value in counts.items():
+                    writer.writerow([frame, "counter", name, f"{end / 1e6:.4f}", value])
+
+    def export_trace(self, path):
+        """Trazas en el formato JSON de Chrome (eventos "X" y contadores "C")"""
+        events = [{"name": name, "ph": "X", "ts": start / 1e3, "dur": duration / 1e3,
+                   "pid": 0, "tid": 0, "args": {"frame": frame}}
+                  for frame, name, start, duration in self.events]
+        events += [{"name": name, "ph": "C", "ts": end / 1e3, "pid": 0, "args": {name: value}}
+                   for frame, end, counts in self.counters for name, value in counts.items()]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, path):
+        """Exporta según la extensión: .csv o .json (trazas de Chrome)"""
+        if path.endswith(".csv"):
+            self.export_csv(path)
+        elif path.endswith(".json"):
+            self.export_trace(path)
+        else:
+            raise ValueError(f"Formato de exportación desconocido: {path}")
+
+
+# Perfilador compartido por los scripts del juego
+PROFILER = Profiler()
+
+
+if __name__ == "__main__":
+    # Coste de la instrumentación desactivada frente a no instrumentar
+    calls = 1_000_000
+    profiler = Profiler()
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        pass
+    bare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(calls):
+        with profiler.phase("update"):
+            pass
+        profiler.count("expanded")
+    disabled = time.perf_counter() - start
+
+    profiler.enabled = True
+    start = time.perf_counter()
+    for i in range(calls):
+        with profiler.phase("update"):
+            pass
+        profiler.count("expanded")
+        if i % 100 == 99:
+            profiler.end_frame()
+    enabled = time.perf_counter() - start
+
+    print(f"Por fase + contador: desactivado {(disabled - bare) / calls * 1e9:.0f} ns, "
+          f"activado {(enabled - bare) / calls * 1e9:.0f} ns")
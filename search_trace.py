@@ -0,0 +1,264 @@
+"""Trazas de búsquedas A* y visor que las reproduce paso a paso.
+
+Una traza es la lista de celdas que expandió GridAStar, en orden, más el
+camino final; se guarda en un .npz compacto. El visor dibuja el mapa una sola
+vez en una superficie a resolución de celda y, al avanzar o retroceder la
+reproducción, solo repinta los píxeles de las celdas que cambian. Sin
+reproducción en marcha espera a eventos (no gasta CPU); reproduciendo, va a
+`--fps` fotogramas por segundo como mucho:
+
+    python search_trace.py --size 1000 --seed 3
+    python search_trace.py --size 1000 --save traza.npz --no-view
+    python search_trace.py --load traza.npz
+
+Teclas: espacio pausa/sigue, flechas izquierda/derecha retroceden/avanzan,
+arriba/abajo cambian la velocidad, Inicio/Fin saltan al principio/final.
+"""
+import argparse
+import sys
+from array import array
+
+import numpy as np
+import pygame
+
+from connectivity import label_components
+from pathfinding import GridAStar
+from world_chunks import WATER_LEVEL, generate_map
+
+# Tamaño máximo de la ventana (px); las celdas se escalan para llenarla
+MAX_WINDOW = 1000
+REPLAY_FPS = 30
+# Segundos que dura la reproducción completa a la velocidad inicial
+REPLAY_SECONDS = 10
+# Tamaño de celda (px) a partir del que se dibujan las líneas de la cuadrícula
+GRID_LINES_FROM = 8
+
+FREE = (169, 169, 169)
+BLOCKED = (0, 0, 255)
+# Las celdas expandidas van de EARLY (primeras) a LATE (últimas)
+EARLY = (255, 230, 140)
+LATE = (200, 60, 30)
+PATH = (255, 255, 0)
+START = (255, 0, 0)
+GOAL = (0, 255, 0)
+GRID_LINES = (0, 0, 0)
+
+
+class SearchTrace:
+    """Celdas expandidas (ids planos i * cols + j, int32) en orden de
+    expansión (el paso de cada una es su índice) y camino encontrado."""
+
+    def __init__(self, passable, start, goal, cells, path):
+        self.passable = np.asarray(passable, dtype=bool)
+        self.start, self.goal = tuple(start), tuple(goal)
+        self.cells = np.asarray(cells, dtype=np.int32)
+        # Camino completo desde `start` (None si no hay camino)
+        self.path = None if path is None else np.asarray(path, dtype=np.int32).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.cells)
+
+    def positions(self, first=0, last=None):
+        """(filas, columnas) de las celdas expandidas en los pasos [first, last)"""
+        return np.divmod(self.cells[first:last], self.passable.shape[1])
+
+    def save(self, path):
+        # El mapa va empaquetado en bits: la traza ocupa sobre todo las celdas
+        np.savez_compressed(path, shape=self.passable.shape, passable=np.packbits(self.passable),
+                            endpoints=[self.start, self.goal], cells=self.cells,
+                            path=self.path if self.path is not None else np.empty((0, 2), np.int32),
+                            found=self.path is not None)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            shape = tuple(data["shape"])
+            passable = np.unpackbits(data["passable"], count=shape[0] * shape[1]).reshape(shape)
+            start, goal = map(tuple, data["endpoints"].tolist())
+            return cls(passable, start, goal, data["cells"], data["path"] if data["found"] else None)
+
+
+def record_search(passable, start, goal, method="astar", diagonal=False):
+    """Busca con GridAStar guardando la traza de expansiones"""
+    finder = GridAStar(passable, diagonal=diagonal)
+    finder.trace = array('i')
+    path = finder.find_path(start, goal, method)
+    # Ids con borde de GridAStar -> ids sin borde
+    i, j = np.divmod(np.frombuffer(finder.trace, dtype=np.int32), finder.width)
+    cells = (i - 1) * finder.cols + (j - 1)
+    return SearchTrace(passable, start, goal, cells, None if path is None else [tuple(start)] + path)
+
+
+class TraceReplay:
+    """Reproduce una SearchTrace en una ventana de pygame.
+
+    `map_surface` tiene un píxel por celda (x = columna, y = fila) y se
+    actualiza con `seek` pintando solo las celdas entre el paso anterior y el
+    nuevo; en pantalla se escala a `cell_size` px por celda. El camino, el
+    inicio y la meta se dibujan encima al componer cada fotograma.
+    """
+
+    def __init__(self, trace, cell_size=None, fps=REPLAY_FPS, speed=None):
+        self.trace = trace
+        self.rows, self.cols = trace.passable.shape
+        self.cell_size = cell_size or max(1, MAX_WINDOW // max(self.rows, self.cols))
+        self.fps = fps
+        # Expansiones por fotograma
+        self.speed = speed or max(1, len(trace) // (fps * REPLAY_SECONDS))
+        self.shown = 0
+        self.playing = True
+
+        # Colores por celda sin expandir y por paso de expansión
+        self.base = np.where(trace.passable[..., None], FREE, BLOCKED).astype(np.uint8)
+        t = np.linspace(0.0, 1.0, len(trace))[:, None]
+        self.step_colors = ((1 - t) * EARLY + t * np.array(LATE)).astype(np.uint8)
+        self.map_surface = None
+        self.grid_lines = None
+
+    def _build_surfaces(self):
+        # Necesita el modo de vídeo ya creado (convert)
+        self.map_surface = pygame.Surface((self.cols, self.rows)).convert()
+        pygame.surfarray.blit_array(self.map_surface, self.base.transpose(1, 0, 2))
+        self.shown = 0
+        if self.cell_size >= GRID_LINES_FROM:
+            cs = self.cell_size
+            self.grid_lines = pygame.Surface((self.cols * cs, self.rows * cs), pygame.SRCALPHA)
+            for x in range(0, self.cols * cs + 1, cs):
+                pygame.draw.line(self.grid_lines, GRID_LINES, (x, 0), (x, self.rows * cs))
+            for y in range(0, self.rows * cs + 1, cs):
+                pygame.draw.line(self.grid_lines, GRID_LINES, (0, y), (self.cols * cs, y))
+
+    def seek(self, step):
+        """Lleva la reproducción al paso `step` repintando solo lo que cambia"""
+        step = max(0, min(len(self.trace), step))
+        if step == self.shown:
+            return False
+        pixels = pygame.surfarray.pixels3d(self.map_surface)
+        if step > self.shown:
+            i, j = self.trace.positions(self.shown, step)
+            pixels[j, i] = self.step_colors[self.shown:step]
+        else:
+            i, j = self.trace.positions(step, self.shown)
+            pixels[j, i] = self.base[i, j]
+        del pixels  # Suelta el bloqueo de la superficie
+        self.shown = step
+        return True
+
+    def _cell_rect(self, pos):
+        cs = self.cell_size
+        return pygame.Rect(pos[1] * cs, pos[0] * cs, cs, cs)
+
+    def render(self, screen):
+        cs = self.cell_size
+        if cs == 1:
+            screen.blit(self.map_surface, (0, 0))
+        else:
+            pygame.transform.scale(self.map_surface, screen.get_size(), screen)
+        if self.grid_lines is not None:
+            screen.blit(self.grid_lines, (0, 0))
+
+        path = self.trace.path
+        if self.shown == len(self.trace) and path is not None and len(path) > 1:
+            points = [(j * cs + cs // 2, i * cs + cs // 2) for i, j in path.tolist()]
+            pygame.draw.lines(screen, PATH, False, points, max(1, cs // 3))
+        for pos, color in ((self.trace.start, START), (self.trace.goal, GOAL)):
+            rect = self._cell_rect(pos)
+            # Al menos 5 px para que se vean en mapas grandes
+            screen.fill(color, rect.inflate(max(0, 5 - cs), max(0, 5 - cs)))
+
+        state = "▶" if self.playing and self.shown < len(self.trace) else "⏸"
+        pygame.display.set_caption(f"Traza A* {state} paso {self.shown}/{len(self.trace)} "
+                                   f"({self.speed} por fotograma)")
+
+    def handle(self, event):
+        """Aplica un evento; devuelve si hay que redibujar (None: salir)"""
+        if event.type == pygame.QUIT:
+            return None
+        if event.type == pygame.VIDEOEXPOSE or event.type == pygame.WINDOWEXPOSED:
+            return True
+        if event.type != pygame.KEYDOWN:
+            return False
+        key = event.key
+        if key == pygame.K_ESCAPE:
+            return None
+        if key == pygame.K_SPACE:
+            if self.shown == len(self.trace):
+                self.seek(0)
+            self.playing = not self.playing
+            return True
+        if key in (pygame.K_RIGHT, pygame.K_LEFT):
+            self.playing = False
+            self.seek(self.shown + (self.speed if key == pygame.K_RIGHT else -self.speed))
+            return True
+        if key == pygame.K_UP:
+            self.speed *= 2
+            return True
+        if key == pygame.K_DOWN:
+            self.speed = max(1, self.speed // 2)
+            return True
+        if key in (pygame.K_HOME, pygame.K_END):
+            self.seek(0 if key == pygame.K_HOME else len(self.trace))
+            return True
+        return False
+
+    def run(self):
+        pygame.init()
+        screen = pygame.display.set_mode((self.cols * self.cell_size, self.rows * self.cell_size))
+        self._build_surfaces()
+        clock = pygame.time.Clock()
+        dirty = True
+        running = True
+        while running:
+            animating = self.playing and self.shown < len(self.trace)
+            # Sin animación se bloquea hasta el siguiente evento
+            events = pygame.event.get() if animating else [pygame.event.wait()] + pygame.event.get()
+            for event in events:
+                changed = self.handle(event)
+                if changed is None:
+                    running = False
+                dirty = dirty or bool(changed)
+            if animating and self.playing:
+                dirty = self.seek(self.shown + self.speed) or dirty
+            if dirty:
+                self.render(screen)
+                pygame.display.flip()
+                dirty = False
+            if animating:
+                clock.tick(self.fps)
+        pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1000, help="lado del mapa Perlin")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--method", choices=("astar", "jps"), default="astar")
+    parser.add_argument("--load", help="reproducir una traza guardada (.npz)")
+    parser.add_argument("--save", help="guardar la traza en este .npz")
+    parser.add_argument("--fps", type=int, default=REPLAY_FPS)
+    parser.add_argument("--no-view", action="store_true", help="no abrir la ventana")
+    args = parser.parse_args(argv)
+
+    if args.load:
+        trace = SearchTrace.load(args.load)
+    else:
+        passable = generate_map(args.size, args.size, seed=args.seed) >= WATER_LEVEL
+        # Búsqueda entre las esquinas opuestas de la isla más grande
+        labels, _ = label_components(passable)
+        sizes = np.bincount(labels.ravel())
+        sizes[0] = 0
+        cells = np.argwhere(labels == sizes.argmax())
+        diagonal = cells.sum(axis=1)
+        start, goal = (tuple(map(int, cells[k])) for k in (diagonal.argmin(), diagonal.argmax()))
+        trace = record_search(passable, start, goal, args.method)
+    print(f"{len(trace)} expansiones, camino de {len(trace.path) - 1 if trace.path is not None else '-'} pasos")
+
+    if args.save:
+        trace.save(args.save)
+    if not args.no_view:
+        TraceReplay(trace, fps=args.fps).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+import pygame
+import numpy as np
+
+import ccd
+import gjk
+from polygon_batch import sin_cos
+
+# --- Algoritmo AABB (Bounding Box) ---
+class AABB:
+    def __init__(self, x, y, width, height):
+        self.x, self.y, self.width, self.height = x, y, width, height
+
+    def update_from_polygon(self, polygon):
+        """Actualiza la AABB basándose en el polígono (solo funciona si está alineado)."""
+        min_x, min_y, max_x, max_y = polygon.bounds()
+        self.x, self.y = min_x, min_y
+        self.width, self.height = max_x - min_x, max_y - min_y
+
+    def intersects(self, other):
+        """Verifica si dos AABB se superponen."""
+        return (self.x < other.x + other.width and
+                self.x + self.width > other.x and
+                self.y < other.y + other.height and
+                self.y + self.height > other.y)
+
+    def bounds(self):
+        """Límites (min_x, min_y, max_x, max_y) de la caja."""
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    def draw(self, screen, color):
+        """Dibuja el AABB en pantalla."""
+        pygame.draw.rect(screen, color, (self.x, self.y, self.width, self.height), 2)
+
+def check_aabb_collision(A, B):
+    """Detecta colisión entre dos AABB dadas como tuplas (x, y, ancho, alto).
+
+    A diferencia de `AABB.intersects`, tocarse cuenta como colisión.
+    """
+    return not (A[0] > B[0] + B[2] or A[0] + A[2] < B[0] or A[1] > B[1] + B[3] or A[1] + A[3] < B[1])
+
+# --- Algoritmo SAT (Separating Axis Theorem) ---
+class Polygon:
+    """Polígono convexo guardado en su espacio local.
+
+    La geometría canónica (`local` y sus normales) no cambia nunca; los
+    vértices, ejes y límites en el mundo se derivan de (`center`, `rotation`)
+    solo cuando la transformación cambió desde la última consulta. Así girar
+    muchas veces no acumula error y los polígonos quietos no recalculan nada.
+    """
+
+    # Estadística: ejes probados por check_collision (SAT) entre todos los polígonos
+    axes_tested = 0
+
+    def __init__(self, center, vertices):
+        self._center = np.array(center, dtype=np.float64)
+        self.local = np.array(vertices, dtype=np.float64) - self._center
+        edges = np.roll(self.local, -1, axis=0) - self.local
+        normals = np.stack([-edges[:, 1], edges[:, 0]], axis=1)  # Perpendicular
+        self.local_axes = normals / np.linalg.norm(normals, axis=1)[:, None]  # Normalizar
+        self._rotation = 0  # Ángulo de rotación en grados
+        self._dirty = True
+
+    # --- Transformación ---
+    @property
+    def center(self):
+        return self._center
+
+    @center.setter
+    def center(self, value):
+        self._center = np.array(value, dtype=np.float64)
+        self._dirty = True
+
+    @property
+    def rotation(self):
+        return self._rotation
+
+    @rotation.setter
+    def rotation(self, value):
+        self._rotation = value
+        self._dirty = True
+
+    def move(self, dx, dy):
+        """Mueve el polígono."""
+        self.center = self._center + (dx, dy)
+
+    def rotate(self, angle):
+        """Rota el polígono en sentido antihorario."""
+        self.rotation += angle  # Guardamos el ángulo de rotación total
+
+    # --- Geometría en el mundo (caché) ---
+    def _update(self):
+        if not self._dirty:
+            return
+        sin_a, cos_a = sin_cos(self._rotation)
+        rotation_t = np.array([[cos_a, sin_a], [-sin_a, cos_a]])
+        self._vertices = self.local @ rotation_t + self._center
+        self._axes = list(self.local_axes @ rotation_t)
+        self._bounds = (*self._vertices.min(axis=0), *self._vertices.max(axis=0))
+        self._dirty = False
+
+    @property
+    def vertices(self):
+        self._update()
+        return self._vertices
+
+    def bounds(self):
+        """Límites (min_x, min_y, max_x, max_y) del polígono."""
+        self._update()
+        return self._bounds
+
+    def get_axes(self):
+        """Obtiene los ejes perpendiculares de cada lado del polígono."""
+        self._update()
+        return self._axes
+
+    def project(self, axis):
+        """Proyecta los vértices sobre un eje."""
+        dots = np.dot(self.vertices, axis)
+        return dots.min(), dots.max()
+
+    def check_collision(self, other, method="sat"):
+        """Verifica colisión con otro polígono usando SAT o GJK ("sat"/"gjk")."""
+        if method == "gjk":
+            return gjk.intersects(self.vertices, other.vertices)
+        if method != "sat":
+            raise ValueError(f"Método de colisión desconocido: {method}")
+        for tested, axis in enumerate(self.get_axes() + other.get_axes(), 1):
+            minA, maxA = self.project(axis)
+            minB, maxB = other.project(axis)
+            if maxA < minB or maxB < minA:
+                Polygon.axes_tested += tested
+                return False  # No hay colisión
+        Polygon.axes_tested += tested
+        return True  # Hay colisión
+
+    def contact(self, other, cache=None):
+        """Contacto con otro polígono por GJK/EPA (normal, profundidad, puntos).
+
+        `cache` (un gjk.SimplexCache por par) reutiliza el trabajo del frame anterior.
+        """
+        return gjk.contact(self.vertices, other.vertices, cache)
+
+    def sweep(self, dx, dy, obstacles):
+        """Mueve el polígono (dx, dy) deteniéndose en el primer impacto.
+
+        A diferencia de `move`, no atraviesa obstáculos aunque el paso sea
+        grande. Devuelve (toi, normal, obstáculo) del impacto, o None si no
+        hubo contacto. Si conservative advancement no converge, el polígono solo
+        avanza hasta el instante seguro y tampoco se da el contacto por hecho.
+        """
+        box = AABB(0, 0, 0, 0)
+        box.update_from_polygon(self)
+        first = None
+        for other in obstacles:
+            other_box = AABB(0, 0, 0, 0)
+            other_box.update_from_polygon(other)
+            # Descarte rápido por cajas antes de la prueba exacta
+            if ccd.swept_aabb(box, (dx, dy), other_box) is None and not box.intersects(other_box):
+                continue
+            hit = ccd.conservative_advancement(self.vertices, other.vertices, (dx, dy))
+            if hit is not None and (first is None or hit[0] < first[0]):
+                first = (hit[0], hit[1], other, hit[3])
+        if first is None:
+            self.move(dx, dy)
+            return None
+        toi, normal, other, converged = first
+        self.move(dx * toi, dy * toi)
+        return (toi, normal, other) if converged else None
+
+    def draw(self, screen, color):
+        """Dibuja el polígono en pantalla."""
+        pygame.draw.polygon(screen, color, self.vertices, 2)
+
+def project_polygon(polygon, axis):
+    """Proyecta un polígono (array de vértices) sobre un eje"""
+    projections = np.dot(polygon, axis)
+    return [projections.min(), projections.max()]
+
+def check_sat_collision(polygon1, polygon2):
+    """Detecta colisión entre dos polígonos (arrays de vértices) usando SAT"""
+    for polygon in [polygon1, polygon2]:
+        for i in range(len(polygon)):
+            p1 = polygon[i]
+            p2 = polygon[(i + 1) % len(polygon)]
+            edge = np.array([p2[0] - p1[0], p2[1] - p1[1]])
+            axis = np.array([-edge[1], edge[0]])  # Eje perpendicular
+
+            projection1 = project_polygon(polygon1, axis)
+            projection2 = project_polygon(polygon2, axis)
+
+            if projection1[1] < projection2[0] or projection2[1] < projection1[0]:
+                return False  # No hay intersección en esta proyección
+    return True
@@ -0,0 +1,194 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from terrain import fbm
+
+# Altura por debajo de la cual una casilla es agua (no transitable)
+WATER_LEVEL = -0.1
+# Altura a partir de la cual el terreno es montaña
+MOUNTAIN_LEVEL = 0.2
+
+# Coste de entrar en una casilla: 1 en llano y, en la montaña,
+# MOUNTAIN_BASE_COST más MOUNTAIN_COST_SLOPE por unidad de altura sobre
+# MOUNTAIN_LEVEL (el agua es 0 = bloqueada)
+MOUNTAIN_BASE_COST = 3
+MOUNTAIN_COST_SLOPE = 20
+
+# Clases de terreno de `classify_terrain`
+TERRAIN_WATER = 0
+TERRAIN_GRASS = 1
+TERRAIN_MOUNTAIN = 2
+
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def generate_map(width, height, scale=20.0, seed=None):
+    """Mapa de alturas (width, height) indexado como [x][y], como `map_data` en juego.py"""
+    return fbm(width, height, scale, octaves=6, persistence=0.5, lacunarity=2.0, seed=seed)
+
+
+def classify_terrain(heights):
+    """Rejilla uint8 de clases de terreno (TERRAIN_WATER, TERRAIN_GRASS o TERRAIN_MOUNTAIN)"""
+    return np.digitize(heights, [WATER_LEVEL, MOUNTAIN_LEVEL]).astype(np.uint8)
+
+
+def terrain_costs(heights):
+    """Rejilla uint8 de costes de movimiento a partir de las alturas"""
+    heights = np.asarray(heights)
+    mountain = MOUNTAIN_BASE_COST + np.floor((heights - MOUNTAIN_LEVEL) * MOUNTAIN_COST_SLOPE)
+    costs = np.where(heights < MOUNTAIN_LEVEL, 1, np.clip(mountain, 1, 255))
+    costs[heights < WATER_LEVEL] = 0
+    return costs.astype(np.uint8)
+
+
+class ChunkStore:
+    """Almacén en disco de chunks ya generados, leídos con memmap.
+
+    Cada chunk es un .npy en un directorio propio de los parámetros del mundo,
+    así mundos distintos nunca comparten ficheros.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, cx, cy):
+        return os.path.join(self.directory, f"chunk_{cx}_{cy}.npy")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(*key))
+
+    def load(self, cx, cy):
+        """Chunk guardado como memmap de solo lectura, o None si no existe"""
+        path = self.path(cx, cy)
+        if not os.path.exists(path):
+            return None
+        return np.load(path, mmap_mode='r')
+
+    def save(self, cx, cy, data):
+        # Escritura atómica: otro proceso nunca ve un fichero a medias
+        path = self.path(cx, cy)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp, path)
+
+
+class ChunkedWorld:
+    """Mundo infinito de terreno generado por chunks bajo demanda.
+
+    Los chunks de `chunk_size` × `chunk_size` casillas se generan con
+    `terrain.fbm` al pedirlos, se guardan en una caché LRU limitada a
+    `cache_bytes` y, si hay `store_dir`, se vuelcan a disco para que las
+    visitas posteriores se lean con memmap en vez de regenerarse.
+    Las coordenadas son (x, y) de casilla, como `map_data[x][y]` en juego.py.
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE, scale=20.0, octaves=6, persistence=0.5,
+                 lacunarity=2.0, seed=None, cache_bytes=DEFAULT_CACHE_BYTES, store_dir=None,
+                 dtype=np.float32):
+        self.chunk_size = chunk_size
+        self.scale = scale
+        self.octaves = octaves
+        self.persistence = persistence
+        self.lacunarity = lacunarity
+        self.seed = seed
+        self.dtype = np.dtype(dtype)
+        self.cache_bytes = cache_bytes
+
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+        self.store = None
+        if store_dir is not None:
+            key = f"s{seed}_sc{scale}_o{octaves}_p{persistence}_l{lacunarity}_c{chunk_size}_{self.dtype.name}"
+            self.store = ChunkStore(os.path.join(store_dir, key))
+
+        # Estadísticas
+        self.hits = 0
+        self.generated = 0
+        self.loaded = 0
+        self.evicted = 0
+
+    # --- Chunks ---
+    def chunk_of(self, x, y):
+        return (x // self.chunk_size, y // self.chunk_size)
+
+    def _generate(self, cx, cy):
+        cs = self.chunk_size
+        return fbm(cs, cs, self.scale, self.octaves, self.persistence, self.lacunarity,
+                   seed=self.seed, origin=(cx * cs, cy * cs), dtype=self.dtype)
+
+    def chunk(self, cx, cy):
+        """Alturas del chunk (cx, cy), generándolo o leyéndolo si hace falta"""
+        key = (cx, cy)
+        data = self.cache.get(key)
+        if data is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return data
+
+        data = self.store.load(cx, cy) if self.store is not None else None
+        if data is not None:
+            self.loaded += 1
+        else:
+            data = self._generate(cx, cy)
+            self.generated += 1
+            if self.store is not None:
+                self.store.save(cx, cy, data)
+
+        self.cache[key] = data
+        self.cached_bytes += data.nbytes
+        # Expulsar los menos usados hasta respetar el presupuesto (nunca el nuevo)
+        while self.cached_bytes > self.cache_bytes and len(self.cache) > 1:
+            _, old = self.cache.popitem(last=False)
+            self.cached_bytes -= old.nbytes
+            self.evicted += 1
+        return data
+
+    def prefetch(self, positions, radius=1):
+        """Asegura en caché los chunks a `radius` chunks de cada posición.
+
+        Cada chunk se pide una sola vez aunque lo cubran varias posiciones
+        (las entidades cercanas comparten casi todo su vecindario).
+        """
+        keys = set()
+        for x, y in positions:
+            cx, cy = self.chunk_of(x, y)
+            for dx in range(-radius, radius + 1):
+                for dy in range(-radius, radius + 1):
+                    keys.add((cx + dx, cy + dy))
+        for cx, cy in keys:
+            self.chunk(cx, cy)
+
+    # --- Accesores por casilla ---
+    def height(self, x, y):
+        cs = self.chunk_size
+        return float(self.chunk(x // cs, y // cs)[x % cs, y % cs])
+
+    def is_passable(self, x, y):
+        return self.height(x, y) >= WATER_LEVEL
+
+    def region(self, x0, y0, width, height):
+        """Alturas de la ventana [x0, x0+width) × [y0, y0+height) como un array"""
+        cs = self.chunk_size
+        out = np.empty((width, height), dtype=self.dtype)
+        for cx in range(x0 // cs, (x0 + width - 1) // cs + 1):
+            for cy in range(y0 // cs, (y0 + height - 1) // cs + 1):
+                data = self.chunk(cx, cy)
+                # Intersección del chunk con la ventana, en coordenadas de mundo
+                ax, bx = max(x0, cx * cs), min(x0 + width, (cx + 1) * cs)
+                ay, by = max(y0, cy * cs), min(y0 + height, (cy + 1) * cs)
+                out[ax - x0:bx - x0, ay - y0:by - y0] = data[ax - cx * cs:bx - cx * cs,
+                                                               ay - cy * cs:by - cy * cs]
+        return out
+
+    def passable_region(self, x0, y0, width, height):
+        """Máscara de casillas transitables de una ventana (para los buscadores)"""
+        return self.region(x0, y0, width, height) >= WATER_LEVEL
+
+    def cost_region(self, x0, y0, width, height):
+        """Costes de movimiento (uint8, 0 = agua) de una ventana"""
+        return terrain_costs(self.region(x0, y0, width, height))
@@ -0,0 +1,189 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from connectivity import label_components
+from terrain import fbm
+from world_chunks import WATER_LEVEL, classify_terrain, terrain_costs
+
+# Instantáneas binarias de un mundo: alturas, terreno clasificado, máscara de
+# transitabilidad y tablas derivadas (costes, componentes conexas...) en un
+# solo fichero. Se leen con numpy.memmap sin copiar nada, así que un arranque
+# en caliente tarda milisegundos y varios procesos que abren el mismo fichero
+# comparten las páginas en la caché del sistema.
+#
+# Formato (little-endian):
+#   magic (8 bytes) | versión (uint32) | longitud de la cabecera (uint32)
+#   cabecera JSON: {"key": {...}, "tables": {nombre: {dtype, shape, offset}}}
+#   tablas, cada una alineada a SNAPSHOT_ALIGNMENT bytes
+
+SNAPSHOT_MAGIC = b"WSNAPSHT"
+# Subirla cuando cambie el formato o el contenido de las tablas: las
+# instantáneas viejas dejan de cargarse y `open_snapshot` las regenera
+SNAPSHOT_VERSION = 1
+# Alineación de cada tabla (una página: cada tabla empieza en su propia página)
+SNAPSHOT_ALIGNMENT = 4096
+
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def snapshot_key(seed, scale, octaves, width, height):
+    """Parámetros que identifican una instantánea"""
+    return {"seed": seed, "scale": float(scale), "octaves": int(octaves),
+            "width": int(width), "height": int(height)}
+
+
+def snapshot_path(directory, key):
+    name = f"world_s{key['seed']}_sc{key['scale']}_o{key['octaves']}_{key['width']}x{key['height']}.snap"
+    return os.path.join(directory, name)
+
+
+def build_tables(key, extra=None):
+    """Tablas de la instantánea de `key`, calculadas desde cero.
+
+    Las alturas son float32, como en ChunkedWorld, y están indexadas como
+    [x][y]. `extra` es un dict nombre -> función(tablas) con tablas derivadas
+    adicionales, por ejemplo de un buscador.
+    """
+    heights = fbm(key["width"], key["height"], key["scale"], key["octaves"],
+                  seed=key["seed"], dtype=np.float32)
+    return derive_tables(heights, extra)
+
+
+def derive_tables(heights, extra=None):
+    """Tablas de la instantánea a partir de unas alturas ya generadas"""
+    passable = heights >= WATER_LEVEL
+    components, _ = label_components(passable)
+    tables = {
+        "heights": heights,
+        "terrain": classify_terrain(heights),
+        "passable": passable,
+        "costs": terrain_costs(heights),
+        "components": components,
+    }
+    for name, build in (extra or {}).items():
+        tables[name] = np.asarray(build(tables))
+    return tables
+
+
+def save_snapshot(path, key, tables):
+    """Escribe la instantánea de forma atómica (nunca queda un fichero a medias)"""
+    layout = {}
+    offset = 0
+    for name, array in tables.items():
+        array = np.asarray(array)
+        layout[name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+        offset += -(-array.nbytes // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+    header = json.dumps({"key": key, "tables": layout}).encode()
+    # Los offsets de la cabecera son relativos al inicio de los datos
+    data_start = -(-(_PREAMBLE.size + len(header)) // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(header)))
+        f.write(header)
+        for name, array in tables.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp, path)
+
+
+class WorldSnapshot:
+    """Instantánea abierta: las tablas son vistas de solo lectura de un memmap.
+
+    `heights`, `terrain`, `passable`, `costs` y `components` son las tablas
+    estándar; `snapshot[nombre]` da cualquiera, también las extra.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            preamble = f.read(_PREAMBLE.size)
+            if len(preamble) < _PREAMBLE.size:
+                raise ValueError(f"Instantánea truncada: {path}")
+            magic, version, header_size = _PREAMBLE.unpack(preamble)
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"No es una instantánea de mundo: {path}")
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Versión de instantánea {version} (se esperaba {SNAPSHOT_VERSION}): {path}")
+            header = json.loads(f.read(header_size))
+        self.key = header["key"]
+
+        data_start = -(-(_PREAMBLE.size + header_size) // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+        self._map = np.memmap(path, dtype=np.uint8, mode="r")
+        self.tables = {}
+        for name, entry in header["tables"].items():
+            dtype = np.dtype(entry["dtype"])
+            shape = tuple(entry["shape"])
+            start = data_start + entry["offset"]
+            size = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            if start + size > len(self._map):
+                raise ValueError(f"Instantánea truncada: {path}")
+            self.tables[name] = self._map[start:start + size].view(dtype).reshape(shape)
+
+        self.heights = self.tables["heights"]
+        self.terrain = self.tables["terrain"]
+        self.passable = self.tables["passable"]
+        self.costs = self.tables["costs"]
+        self.components = self.tables["components"]
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+    def __contains__(self, name):
+        return name in self.tables
+
+
+def open_snapshot(directory, seed=None, scale=20.0, octaves=6, width=64, height=64, extra=None):
+    """Abre la instantánea de esos parámetros, creándola si no existe.
+
+    También la regenera si es de otra versión del formato, está dañada o le
+    falta alguna de las tablas de `extra` (ver `build_tables`).
+    """
+    key = snapshot_key(seed, scale, octaves, width, height)
+    path = snapshot_path(directory, key)
+    if os.path.exists(path):
+        try:
+            snapshot = WorldSnapshot(path)
+        except ValueError:
+            snapshot = None
+        if snapshot is not None and snapshot.key == key and all(name in snapshot for name in extra or ()):
+            return snapshot
+
+    os.makedirs(directory, exist_ok=True)
+    save_snapshot(path, key, build_tables(key, extra))
+    return WorldSnapshot(path)
+
+
+if __name__ == "__main__":
+    # Arranque en frío (generar y guardar) frente a en caliente (memmap)
+    import shutil
+    import tempfile
+    import time
+
+    from world_chunks import ChunkedWorld
+
+    size = 1024
+    directory = tempfile.mkdtemp()
+    try:
+        start = time.perf_counter()
+        cold = open_snapshot(directory, seed=1, width=size, height=size)
+        cold_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm = open_snapshot(directory, seed=1, width=size, height=size)
+        warm_time = time.perf_counter() - start
+
+        # La instantánea es la zona inicial (origen 0, 0) del mundo por chunks
+        # del juego: las mismas alturas que leer esa ventana de los chunks
+        world = ChunkedWorld(scale=20.0, seed=1)
+        assert np.array_equal(warm.heights, world.region(0, 0, size, size))
+        assert np.array_equal(warm.passable, world.passable_region(0, 0, size, size))
+        assert np.array_equal(warm.costs, world.cost_region(0, 0, size, size))
+        print(f"{size}x{size}: en frío {cold_time * 1000:.0f} ms, en caliente {warm_time * 1000:.2f} ms, "
+              f"{os.path.getsize(warm.path) / 2**20:.1f} MiB en disco")
+    finally:
+        shutil.rmtree(directory)